@@ -1,29 +1,24 @@
 #!/usr/bin/env python
 """
 QuickLIT ana çalıştırma dosyası
-Scopus uygulamasını çalıştırır
+Scopus uygulamasını bu süreç içinde çalıştırır (ayrı bir Python süreci başlatmaz)
 """
 
 import os
 import sys
-import subprocess
+
+SCOPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scopus')
+
 
 def main():
     """
-    Scopus uygulamasını çalıştırır
+    Scopus uygulamasını çalıştırır; komut satırı seçenekleri scopus/app/server.py'ye aktarılır
     """
     print("QuickLIT Scopus uygulaması başlatılıyor...")
-    
-    # Scopus dizinine git
-    os.chdir('scopus')
-    
-    # Uygulamayı çalıştır
-    try:
-        subprocess.run([sys.executable, 'run.py'], check=True)
-    except KeyboardInterrupt:
-        print("\nUygulama kapatıldı.")
-    except Exception as e:
-        print(f"Hata: {e}")
+    sys.path.insert(0, SCOPUS_DIR)
+
+    from app.server import main as serve
+    serve()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
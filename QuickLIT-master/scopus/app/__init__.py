@@ -1,13 +1,23 @@
 from flask import Flask, render_template, request, redirect, flash, jsonify, send_file, session
 import os
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+import logging
+import multiprocessing
+from firebase_admin import auth, firestore
 from .config import Config
 from .services.scopus_service import ScopusService
 from .services.pdf_service import PDFService
+from .services.http_client import HTTPClient
+from .services.cache_service import get_cache
+from .services.rate_limiter import rate_limiter, RateLimitExceeded
+from .services.firebase_service import get_firestore
+from .services.auth_service import AuthService
+from .services.saved_articles_service import SavedArticlesService, InvalidCursor
+from . import logging_setup, metrics
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 def create_app():
     app = Flask(__name__,
                 template_folder='templates',
@@ -24,30 +34,14 @@ def create_app():
     
     # Uygulama yapılandırması
     app.config.from_object(Config)
+    logging_setup.init_app(app)
+    metrics.init_app(app)
     Config.init_app(app)
     app.secret_key = Config.SECRET_KEY
 
-    # Firebase Admin SDK'yı başlat
-    try:
-        cred_dict = Config.get_firebase_credentials()
-        if cred_dict:
-            cred = credentials.Certificate(cred_dict)
-            firebase_admin.initialize_app(cred)
-            print("Firebase Admin SDK başarıyla başlatıldı")
-        else:
-            raise ValueError("Firebase credentials yüklenemedi")
-    except Exception as e:
-        print(f"Firebase Admin SDK başlatma hatası: {e}")
-
-    # Firestore veritabanı referansı
-    try:
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firestore bağlantı hatası: {e}")
-        db = None
-
     @app.route('/firebase_login', methods=['POST'])
     def firebase_login():
+        db = get_firestore()
         if not db:
             return redirect('/')
             
@@ -56,10 +50,10 @@ def create_app():
             return redirect('/')
             
         try:
-            # Firebase token'ını doğrula
-            decoded_token = auth.verify_id_token(id_token)
+            # Firebase token'ını doğrula (önbellekte yoksa)
+            decoded_token = AuthService.verify_id_token(id_token)
             user_id = decoded_token['uid']
-            user = auth.get_user(user_id)
+            user = AuthService.get_user(user_id)
             
             # Session'a kullanıcı bilgilerini kaydet
             session['user_id'] = user_id
@@ -68,11 +62,12 @@ def create_app():
             # Profil sayfasına yönlendir
             return redirect('/profile')
         except Exception as e:
-            print(f"Firebase token doğrulama hatası: {e}")
+            logger.warning("Firebase token doğrulama hatası: %s", e)
             return redirect('/')
 
     @app.route('/login', methods=['POST'])
     def login():
+        db = get_firestore()
         if not db:
             return jsonify({'success': False, 'message': 'Firebase bağlantısı kurulamadı'})
             
@@ -82,7 +77,8 @@ def create_app():
         
         try:
             # Firebase Authentication ile giriş yap
-            user = auth.get_user_by_email(email)
+            with metrics.track_call('firebase_auth'):
+                user = AuthService.remember_user(auth.get_user_by_email(email))
             session['user_id'] = user.uid
             session['email'] = user.email
             return jsonify({'success': True, 'user': {'email': user.email}})
@@ -91,6 +87,7 @@ def create_app():
 
     @app.route('/register', methods=['POST'])
     def register():
+        db = get_firestore()
         if not db:
             return jsonify({'success': False, 'message': 'Firebase bağlantısı kurulamadı'})
             
@@ -100,17 +97,18 @@ def create_app():
         
         try:
             # Firebase Authentication ile kullanıcı oluştur
-            user = auth.create_user(
-                email=email,
-                password=password
-            )
+            with metrics.track_call('firebase_auth'):
+                user = auth.create_user(
+                    email=email,
+                    password=password
+                )
             
             # Firestore'da kullanıcı verilerini kaydet
-            db.collection('users').document(user.uid).set({
-                'email': email,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'saved_articles': []
-            })
+            with metrics.track_call('firestore'):
+                db.collection('users').document(user.uid).set({
+                    'email': email,
+                    'created_at': firestore.SERVER_TIMESTAMP
+                })
             
             return jsonify({'success': True, 'user': {'email': email}})
         except Exception as e:
@@ -118,12 +116,13 @@ def create_app():
 
     @app.route('/check_login')
     def check_login():
+        db = get_firestore()
         if not db:
             return jsonify({'logged_in': False, 'message': 'Firebase bağlantısı kurulamadı'})
             
         if 'user_id' in session:
             try:
-                user = auth.get_user(session['user_id'])
+                user = AuthService.get_user(session['user_id'])
                 return jsonify({
                     'logged_in': True,
                     'user': {
@@ -138,64 +137,52 @@ def create_app():
 
     @app.route('/logout')
     def logout():
+        user_id = session.get('user_id')
         session.clear()
+        if user_id:
+            AuthService.invalidate_user(user_id)
         return redirect('/')
 
     @app.route('/profile')
     def profile():
+        db = get_firestore()
         if not db:
             flash('Veritabanı bağlantısı kurulamadı.', 'error')
             return redirect('/')
             
         if 'user_id' not in session:
-            print("Oturum bilgisi bulunamadı")
+            logger.debug("Oturum bilgisi bulunamadı")
             return redirect('/')
             
         try:
             user_id = session['user_id']
-            print(f"Profil verisi alınıyor - user_id: {user_id}")
+            logger.debug("Profil verisi alınıyor - user_id: %s", user_id)
             
-            user = auth.get_user(user_id)
-            print(f"Firebase kullanıcısı bulundu: {user.email}")
+            user = AuthService.get_user(user_id)
+            logger.debug("Firebase kullanıcısı bulundu: %s", user.email)
             
-            # Kullanıcının kaydedilmiş makalelerini getir
-            user_doc = db.collection('users').document(user_id).get()
+            # Kullanıcı belgesinden yalnızca profil alanları okunur (eski makale dizileri hariç)
+            user_ref = db.collection('users').document(user_id)
+            with metrics.track_call('firestore'):
+                user_doc = user_ref.get(field_paths=['displayName', 'created_at'])
             
             if not user_doc.exists:
-                print(f"Firestore'da kullanıcı verisi bulunamadı: {user_id}")
+                logger.info("Firestore'da kullanıcı verisi bulunamadı: %s", user_id)
                 # Kullanıcı Firestore'da yok, oluştur
-                db.collection('users').document(user_id).set({
-                    'email': user.email,
-                    'displayName': user.display_name or user.email.split('@')[0],
-                    'firstName': '',
-                    'lastName': '',
-                    'created_at': firestore.SERVER_TIMESTAMP,
-                    'savedArticles': []
-                })
-                saved_articles = []
+                with metrics.track_call('firestore'):
+                    user_ref.set({
+                        'email': user.email,
+                        'displayName': user.display_name or user.email.split('@')[0],
+                        'firstName': '',
+                        'lastName': '',
+                        'created_at': firestore.SERVER_TIMESTAMP
+                    })
                 display_name = user.display_name or user.email.split('@')[0]
                 registration_date = "Yeni Üye"
-                print(f"Yeni kullanıcı verisi oluşturuldu: {user_id}")
+                logger.info("Yeni kullanıcı verisi oluşturuldu: %s", user_id)
             else:
-                print(f"Firestore'dan kullanıcı verisi alındı: {user_id}")
-                # Kaydedilmiş makaleleri ve kullanıcı bilgilerini al
-                user_data = user_doc.to_dict()
-                
-                # Önceki veri yapısına uyumluluk için kontrol - her iki alanı da dene
-                if 'savedArticles' in user_data:
-                    saved_articles = user_data.get('savedArticles', [])
-                    print(f"'savedArticles' alanı bulundu, {len(saved_articles)} makale var")
-                elif 'saved_articles' in user_data:
-                    saved_articles = user_data.get('saved_articles', [])
-                    print(f"'saved_articles' alanı bulundu, {len(saved_articles)} makale var")
-                else:
-                    saved_articles = []
-                    print("Hiçbir makale alanı bulunamadı")
-                
-                # savedArticles alanının array olduğundan emin ol
-                if not isinstance(saved_articles, list):
-                    print(f"Profil sayfası uyarı: savedArticles array değil - {type(saved_articles)}")
-                    saved_articles = []
+                logger.debug("Firestore'dan kullanıcı verisi alındı: %s", user_id)
+                user_data = user_doc.to_dict() or {}
                 
                 # Kullanıcı adını getir
                 display_name = user_data.get('displayName', user.display_name) 
@@ -212,57 +199,41 @@ def create_app():
                 else:
                     registration_date = "Belirtilmemiş"
                 
-            # Güvenli JSON dönüşümü için değerleri temizle
-            cleaned_articles = []
-            for article in saved_articles:
-                if isinstance(article, dict) and article.get('id'):
-                    cleaned_article = {
-                        'id': article.get('id', ''),
-                        'title': article.get('title', 'Başlık yok'),
-                        'author': article.get('author', 'Yazar belirtilmemiş'),
-                        'savedAt': article.get('savedAt', ''),
-                        'notes': article.get('notes', None)
-                    }
-                    cleaned_articles.append(cleaned_article)
-            
-            print(f"Profil sayfası: {len(cleaned_articles)} makale temizlendi ve hazırlandı")
-            
-            # JSON dönüşümü testi
-            from flask import json
-            try:
-                # JSON dönüşümünü test et
-                articles_json = json.dumps(cleaned_articles)
-                print(f"JSON dönüşümü başarılı, boyut: {len(articles_json)} byte")
-                if len(articles_json) < 200:
-                    print(f"Makaleler JSON: {articles_json}")  # Küçükse tamamını logla
-                else:
-                    print(f"Makaleler JSON (ilk 200 karakter): {articles_json[:200]}...")
-            except Exception as json_err:
-                print(f"JSON dönüşüm hatası: {json_err}")
-                cleaned_articles = []  # Hata durumunda boş liste gönder
+            # Yalnızca gösterilen ilk sayfa okunur; sonrakiler /get_saved_articles ile gelir
+            saved_page = SavedArticlesService.page(db, user_id)
+            article_count = SavedArticlesService.count(db, user_id)
+            logger.debug("Profil sayfası: %d makale yüklendi", len(saved_page['articles']))
                 
             return render_template('profile.html', 
                                 email=user.email,
                                 display_name=display_name,
                                 registration_date=registration_date,
-                                saved_articles=cleaned_articles)
+                                saved_articles=saved_page['articles'],
+                                next_cursor=saved_page['next_cursor'],
+                                article_count=article_count)
         except Exception as e:
-            print(f"Profil sayfası hatası: {e}")
-            import traceback
-            traceback.print_exc()  # Hatanın stack trace'ini yazdır
+            logger.exception("Profil sayfası hatası: %s", e)
             session.clear()  # Hata durumunda session'ı temizle
             return redirect('/')
 
     @app.route('/get_saved_articles')
     def get_saved_articles():
+        db = get_firestore()
         if not db:
             return jsonify({'success': False, 'message': 'Firebase bağlantısı kurulamadı'})
             
         if 'user_id' in session:
             try:
-                user_doc = db.collection('users').document(session['user_id']).get()
-                saved_articles = user_doc.get('saved_articles', []) if user_doc.exists else []
-                return jsonify({'success': True, 'articles': saved_articles})
+                saved_page = SavedArticlesService.page(
+                    db,
+                    session['user_id'],
+                    limit=request.args.get('limit', type=int),
+                    cursor=request.args.get('cursor')
+                )
+                return jsonify({'success': True, 'articles': saved_page['articles'],
+                                'next_cursor': saved_page['next_cursor']})
+            except InvalidCursor:
+                return jsonify({'success': False, 'message': 'Geçersiz sayfa imleci'}), 400
             except Exception as e:
                 return jsonify({'success': False, 'message': str(e)})
         return jsonify({'success': False, 'message': 'Not logged in'})
@@ -279,7 +250,18 @@ def create_app():
     # API durumu kontrolü
     @app.route('/api/health')
     def health_check():
-        return jsonify({"status": "ok"})
+        report = metrics.health(probe_hosts=request.args.get('probe') == '1')
+        report.update({
+            "http_pool": HTTPClient.stats(),
+            "cache": get_cache().stats(),
+            "rate_limits": rate_limiter.status()
+        })
+        return jsonify(report)
+
+    # Prometheus metrikleri
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return metrics.REGISTRY.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
     # Ana sayfa route'u
     @app.route('/', methods=['GET', 'POST'])
@@ -290,14 +272,20 @@ def create_app():
         per_page = 10
         query = request.form.get('query', request.args.get('query', ''))
         
+        status_code = 200
+        headers = {}
         if request.method == 'POST' or query:
             try:
                 start = (page - 1) * per_page
-                results = ScopusService.search_articles(
+                results = ScopusService.search_articles_cached(
                     query,
                     per_page,
                     start
                 )
+            except RateLimitExceeded as e:
+                error = f"API istek limiti aşıldı. Lütfen {e.retry_after} saniye sonra tekrar deneyin."
+                status_code = 429
+                headers['Retry-After'] = str(e.retry_after)
             except Exception as e:
                 error = str(e)
 
@@ -305,7 +293,7 @@ def create_app():
                              results=results, 
                              error=error,
                              current_page=page,
-                             query=query)
+                             query=query), status_code, headers
 
     # PDF indirme route'u
     @app.route('/download_pdf/<scopus_id>')
@@ -326,7 +314,7 @@ def create_app():
                     "message": result.get("message", "PDF indirilemedi.")
                 })
             
-            pdf_path = os.path.join(Config.ARTICLES_FOLDER, result["filename"])
+            pdf_path = result["path"]
             
             if os.path.exists(pdf_path):
                 return send_file(
@@ -341,8 +329,10 @@ def create_app():
                     "message": "PDF dosyası bulunamadı. Lütfen tekrar deneyin."
                 })
                 
+        except RateLimitExceeded:
+            raise
         except Exception as e:
-            app.logger.error(f"PDF indirme hatası: {str(e)}")
+            logger.exception("PDF indirme hatası: %s", e)
             return jsonify({
                 "status": "error",
                 "message": f"Beklenmeyen bir hata oluştu: {str(e)}"
@@ -352,4 +342,13 @@ def create_app():
     from .routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    # Geliştirme sunucusu (run.py --dev, flask run --debug): reloader'ın çalıştırdığı
+    # süreçte gunicorn/ASGI kancaları olmadığından arka plan işleri burada başlar.
+    # Ortam değişkeni multiprocessing alt süreçlerine (ör. metin çıkarma havuzu) de
+    # geçer; onlarda arka plan işi başlatılmaz.
+    if (os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+            and multiprocessing.current_process().name == 'MainProcess'):
+        from .server import start_background
+        start_background()
+
     return app
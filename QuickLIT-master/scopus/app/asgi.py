@@ -0,0 +1,543 @@
+"""
+QuickLIT ASGI (asyncio) sunum modu.
+
+Upstream'e bağlı route'lar (`/`, `/api/latest_articles`, `/download_pdf/<id>`,
+`/summarize`, `/summarize/<id>`) Elsevier/Cohere çağrılarını event loop
+üzerinde async istemciyle yapar; böylece tek bir süreç yüzlerce upstream
+isteğini aynı anda bekletebilir.
+Diğer tüm route'lar ve HTML üretimi, aynı `create_app()` ile oluşturulan Flask
+uygulamasına devredilir; Flask görünümleri sabit boyutlu bir thread havuzunda
+(`--threads`) çalışır.
+
+Async katman çoğu durumda yanıtı kendisi üretmez: upstream sonucunu senkron
+modun kullandığı önbelleğe / PDF deposuna yazar ve isteği Flask'a devreder;
+Flask görünümü sonucu önbellekten anında sunar. Böylece iki mod aynı iş
+mantığını ve aynı yanıt biçimini paylaşır. Önbelleğe, PDF deposuna ve diske
+dokunan senkron çağrılar event loop'u bekletmemek için varsayılan thread
+havuzunda çalışır (`_run_blocking`).
+"""
+import asyncio
+import io
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+import httpx
+from . import create_app, metrics
+from .config import Config
+from .server import start_background
+from .services.discover_service import DiscoverService
+from .services.articles import SearchPage, dumps, loads
+from .services.async_http_client import AsyncHTTPClient
+from .services.pdf_service import (PDFService, PDFDownloadSink, PDFDownloadAborted, PDFEndpointUnavailable,
+                                   is_transient_status)
+from .services.pdf_store import get_pdf_store
+from .services.rate_limiter import RateLimitExceeded, rate_limiter
+from .services.scopus_service import ScopusService
+from .services.single_flight import AsyncSingleFlight
+from .services.summarize_service import SummarizeService, SummarizeError
+
+logger = logging.getLogger(__name__)
+
+HOME_PER_PAGE = 10  # home() görünümündeki sayfa boyutu ile aynı olmalı
+_DOWNLOAD_PDF_RE = re.compile(r'^/download_pdf/([^/]+)$')
+_SUMMARIZE_STORED_RE = re.compile(r'^/summarize/([^/]+)$')
+
+
+class QuickLitASGI:
+    def __init__(self, flask_app, on_shutdown=None, threads=None):
+        self.flask_app = flask_app
+        self.wsgi = ThreadPoolWSGI(flask_app, threads or Config.SERVER_THREADS)
+        self.client = AsyncHTTPClient()
+        self.on_shutdown = on_shutdown
+        # Aynı anda gelen özdeş istekler tek upstream çağrısını paylaşır
+        self.search_flight = AsyncSingleFlight('scopus_search')
+        self.latest_articles_flight = AsyncSingleFlight('latest_articles')
+        self.download_flight = AsyncSingleFlight('pdf_download')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        handler, args = self._match(scope['method'], scope['path'])
+        if handler is None:
+            return await self.wsgi(scope, await _read_body(receive), send)
+
+        # Async katmanda geçen süre (Flask'a devredilen kısım Flask tarafında ayrıca ölçülür)
+        route = 'asgi' + handler.__name__.replace('_', '.', 1)
+        started = time.perf_counter()
+        metrics.http_requests_in_flight.inc(route=route)
+        status = 'delegated'
+        try:
+            body = await _read_body(receive)
+            try:
+                response = await handler(scope, body, *args)
+            except RateLimitExceeded as e:
+                response = ({
+                    'error': 'API istek limiti aşıldı. Lütfen birkaç saniye sonra tekrar deneyin.',
+                    'retry_after': e.retry_after
+                }, 429, {'Retry-After': str(e.retry_after)})
+            if response is not None:
+                status = response[1] if len(response) > 1 else 200
+        except Exception:
+            status = 500
+            raise
+        finally:
+            metrics.http_requests_in_flight.dec(route=route)
+            metrics.http_request_duration.observe(time.perf_counter() - started,
+                                                  route=route, method=scope['method'], status=status)
+
+        if response is None:
+            return await self.wsgi(scope, body, send)
+        if hasattr(response[0], '__aiter__'):
+            return await _send_events(send, *response)
+        await _send_json(send, *response)
+
+    def _match(self, method, path):
+        if path == '/' and method in ('GET', 'POST'):
+            return self._home, ()
+        if path == '/api/latest_articles' and method == 'POST':
+            return self._latest_articles, ()
+        if path == '/summarize' and method == 'POST':
+            return self._summarize, ()
+        match = _DOWNLOAD_PDF_RE.match(path)
+        if match and method == 'GET':
+            return self._download_pdf, (match.group(1),)
+        match = _SUMMARIZE_STORED_RE.match(path)
+        if match and method == 'POST':
+            return self._summarize_stored, (match.group(1),)
+        return None, ()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # uvicorn asgi:app gibi doğrudan başlatmalarda after_fork çağrılmaz
+                start_background()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.client.aclose()
+                await asyncio.get_running_loop().run_in_executor(None, self.wsgi.shutdown)
+                if self.on_shutdown is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.on_shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _home(self, scope, body):
+        args = parse_qs(scope['query_string'].decode('latin-1'))
+        form = parse_qs(body.decode('utf-8', 'replace')) if scope['method'] == 'POST' else {}
+        query = (form.get('query') or args.get('query') or [''])[0]
+        try:
+            page = int((args.get('page') or ['1'])[0])
+        except ValueError:
+            page = 1
+
+        if not query:
+            return None
+
+        start = (page - 1) * HOME_PER_PAGE
+        if await _run_blocking(ScopusService.get_cached_search, query, HOME_PER_PAGE, start) is None:
+            await self.search_flight.do((ScopusService.normalize_query(query), start), self._fetch_search, query, start)
+        return None
+
+    async def _fetch_search(self, query, start):
+        try:
+            url, headers, params = ScopusService.build_search_request(query, HOME_PER_PAGE, start)
+            response = await self.client.get(url, headers=headers, params=params, upstream='scopus_search')
+            response.raise_for_status()
+            await _run_blocking(ScopusService.store_search_results, query, HOME_PER_PAGE, start,
+                                SearchPage.from_response(loads(response.content)))
+        except RateLimitExceeded as e:
+            # 429'lu index.html sayfasını (Retry-After ile) Flask görünümü üretir
+            logger.info("Async arama limite takıldı: %s", e)
+        except (httpx.HTTPError, ValueError) as e:
+            # Hata sayfasını Flask görünümü üretir
+            logger.warning("Async arama hatası: %s", e)
+
+    async def _latest_articles(self, scope, body):
+        data = _parse_json(body)
+        category = data.get('category', '')
+        if await _run_blocking(DiscoverService.get_cached, category):
+            return None
+        return await self.latest_articles_flight.do(category, self._fetch_latest_articles, category)
+
+    async def _fetch_latest_articles(self, category):
+        url, headers, params = DiscoverService.build_request(category)
+        try:
+            response = await self.client.get(url, headers=headers, params=params, upstream='scopus_search')
+        except httpx.HTTPError as e:
+            return {'error': str(e)}, 500
+
+        if response.status_code == 429:
+            # İstemci 429'un Retry-After'ını limitleyiciye işledi; senkron görünümle aynı değer
+            retry_after = rate_limiter.retry_after('scopus_search')
+            return {
+                'error': 'API istek limiti aşıldı. Lütfen birkaç dakika bekleyin.',
+                'retry_after': retry_after
+            }, 429, {'Retry-After': str(retry_after)}
+        if response.status_code >= 400:
+            return {'error': f"Scopus API hatası (Kod: {response.status_code})"}, 500
+
+        await _run_blocking(DiscoverService.store, category, DiscoverService.parse(loads(response.content)))
+        return None
+
+    async def _summarize(self, scope, body):
+        data = _parse_json(body)
+        job, error = SummarizeService.prepare(data)
+        if error:
+            return error
+        return await self._summary_response(scope, data, job)
+
+    async def _summarize_stored(self, scope, body, scopus_id):
+        data = _parse_json(body)
+        try:
+            target, pending = await _run_blocking(SummarizeService.locate_pdf_text, scopus_id)
+            if pending is not None:
+                try:
+                    # shield: istemci ayrılırsa diğer isteklerin beklediği çıkarma iptal edilmez
+                    await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)),
+                                           Config.TEXT_EXTRACTION_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise SummarizeError('PDF metni hâlâ çıkarılıyor, lütfen biraz sonra tekrar deneyin', 503)
+                except Exception as e:
+                    raise SummarizeService.extraction_error(e)
+        except SummarizeError as e:
+            return {'error': e.message}, e.status
+
+        job, error = await _run_blocking(SummarizeService.prepare_text_file, scopus_id, target, data)
+        if error:
+            return error
+        return await self._summary_response(scope, data, job)
+
+    async def _summary_response(self, scope, data, job):
+        events = SummarizeService.iter_events_async(self.client, job)
+        if SummarizeService.wants_stream(data, _header(scope, b'accept')):
+            return events, 200
+
+        try:
+            async for event, payload in events:
+                if event == 'final':
+                    return ({**payload, 'source': job.source} if job.source else payload), 200
+        except SummarizeError as e:
+            return {'error': e.message}, e.status
+        finally:
+            await events.aclose()
+
+    async def _download_pdf(self, scope, body, scopus_id):
+        if await _run_blocking(_is_stored, scopus_id):
+            return None
+        return await self.download_flight.do(scopus_id, self._fetch_pdf, scopus_id)
+
+    async def _fetch_pdf(self, scopus_id):
+        # Önceki indirme, bu istek depoya bakıp buraya gelene kadar bitmiş olabilir
+        if await _run_blocking(_is_stored, scopus_id):
+            return None
+
+        metadata = await _run_blocking(PDFService.get_cached_metadata, scopus_id)
+        if metadata is None:
+            url, headers = PDFService.build_metadata_request(scopus_id)
+            try:
+                response = await self.client.get(url, headers=headers, timeout=30, upstream='scopus_abstract')
+                if response.status_code != 200:
+                    return {
+                        "status": "error",
+                        "message": f"Scopus API'den makale bilgileri alınamadı (Kod: {response.status_code})"
+                    }, 200
+                metadata = await _run_blocking(PDFService.store_metadata, scopus_id, loads(response.content))
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Async meta veri hatası (%s): %s", scopus_id, e)
+                return {"status": "error", "message": f"PDF indirme hatası: {str(e)}"}, 200
+
+        endpoints = await _run_blocking(PDFService.candidate_endpoints, scopus_id, metadata)
+        if Config.PDF_RACE_ENDPOINTS and len(endpoints) > 1:
+            winner, download, definitive = await self._race_endpoints(endpoints)
+        else:
+            winner, download, definitive = None, None, True
+            for endpoint in endpoints:
+                try:
+                    download = await self._fetch_endpoint(endpoint)
+                except (PDFEndpointUnavailable, httpx.HTTPError) as e:
+                    definitive = False
+                    logger.warning("Endpoint hatası (%s): %s", endpoint['url'], e)
+                    continue
+                if download is not None:
+                    winner = endpoint
+                    break
+
+        try:
+            if winner is not None:
+                await _run_blocking(PDFService.save_download, scopus_id, metadata, winner['name'], download)
+            else:
+                result = await _run_blocking(PDFService.redirect_result, scopus_id, metadata, definitive)
+                if not definitive:
+                    # Negatif sonuç kaydedilmedi; Flask'a devredilirse indirmeyi baştan dener
+                    return result, 200
+        except Exception as e:
+            return {"status": "error", "message": f"PDF indirme hatası: {str(e)}"}, 200
+
+        # Dosya artık depoda (ya da negatif sonuç kayıtlı); yanıtı Flask üretir
+        return None
+
+    async def _fetch_endpoint(self, endpoint):
+        """
+        PDFService._fetch_endpoint'in async karşılığı: kesin olarak PDF yoksa
+        None döner; 429/5xx'te PDFEndpointUnavailable, bağlantı hatalarında
+        httpx hatası fırlatır.
+        """
+        sink = None
+        try:
+            async with self.client.stream('GET', endpoint['url'], headers=endpoint['headers'],
+                                          timeout=30, upstream='scopus_article') as response:
+                if is_transient_status(response.status_code):
+                    raise PDFEndpointUnavailable(f"HTTP {response.status_code}")
+                if response.status_code != 200:
+                    return None
+                content_length = response.headers.get('Content-Length')
+                if content_length and content_length.isdigit() and int(content_length) > Config.PDF_MAX_BYTES:
+                    return None
+
+                sink = PDFDownloadSink()
+                async for chunk in response.aiter_bytes(Config.PDF_CHUNK_SIZE):
+                    sink.write(chunk)
+                return sink.finish()
+        except PDFDownloadAborted as e:
+            logger.info("İndirme bırakıldı (%s): %s", endpoint['name'], e)
+        except BaseException:
+            if sink is not None:
+                sink.discard()
+            raise
+        if sink is not None:
+            sink.discard()
+        return None
+
+    async def _race_endpoints(self, endpoints):
+        """PDFService._race_endpoints gibi (kazanan, indirme, kesin) döndürür"""
+        async def attempt(endpoint):
+            try:
+                return endpoint, await self._fetch_endpoint(endpoint), True
+            except (PDFEndpointUnavailable, httpx.HTTPError) as e:
+                logger.warning("Endpoint hatası (%s): %s", endpoint['url'], e)
+                return endpoint, None, False
+
+        tasks = [asyncio.ensure_future(attempt(endpoint)) for endpoint in endpoints]
+        rate_limit_error = None
+        definitive = True
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    endpoint, download, answered = await next_done
+                except RateLimitExceeded as e:
+                    rate_limit_error = e
+                    continue
+                definitive = definitive and answered
+                if download is not None:
+                    return endpoint, download, True
+        finally:
+            # İptal edilen kaybedenlerin geçici dosyaları _fetch_endpoint içinde silinir
+            for task in tasks:
+                task.cancel()
+
+        if rate_limit_error is not None:
+            raise rate_limit_error
+        return None, None, definitive
+
+
+async def _run_blocking(func, *args):
+    """Senkron çağrıyı (önbellek, SQLite, disk) varsayılan thread havuzunda bekler"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _is_stored(scopus_id):
+    """PDF depoda ya da negatif sonuç kayıtlıysa yanıtı doğrudan Flask üretebilir"""
+    return PDFService.find_stored_pdf(scopus_id) is not None or get_pdf_store().get_negative(scopus_id) is not None
+
+
+class ThreadPoolWSGI:
+    """
+    Flask'ı (WSGI) sabit boyutlu bir thread havuzunda çalıştıran ASGI köprüsü.
+
+    asgiref'in WsgiToAsgi'si WSGI uygulamasını thread-sensitive modda tek bir
+    thread'de çalıştırır: Flask'a devredilen istekler sıraya girer ve yük
+    altında "CurrentThreadExecutor already quit or is broken" hatası oluşur.
+    Yanıt parçaları (send_file, zip akışı) üretildikçe event loop'a gönderilir;
+    istemci yavaşsa worker thread'i bekler, yanıt bellekte biriktirilmez.
+    """
+
+    def __init__(self, wsgi_app, threads):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, body, send):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._run, scope, body, send, loop)
+
+    def _run(self, scope, body, send, loop):
+        def sync_send(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['start'] = {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+            }
+
+        iterable = self.wsgi_app(_build_environ(scope, body), start_response)
+        try:
+            for chunk in iterable:
+                if not response.get('started'):
+                    sync_send(response['start'])
+                    response['started'] = True
+                if chunk:
+                    sync_send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not response.get('started'):
+                sync_send(response['start'])
+            sync_send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    def shutdown(self):
+        # Süren isteklerin tamamlanmasını bekler
+        self.executor.shutdown(wait=True)
+
+
+def _build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    script_name = scope.get('root_path', '').encode('utf-8').decode('latin-1')
+    path_info = scope['path'].encode('utf-8').decode('latin-1')
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+def _parse_json(body):
+    try:
+        data = loads(body or b'{}')
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def _send_json(send, payload, status=200, headers=None):
+    body = dumps(payload)
+    raw_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        (b'access-control-allow-origin', b'*')
+    ]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode('latin-1'), str(value).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _header(scope, name):
+    for raw_name, raw_value in scope.get('headers', []):
+        if raw_name == name:
+            return raw_value.decode('latin-1')
+    return None
+
+
+async def _send_events(send, events, status=200, headers=None):
+    """
+    SummarizeService olaylarını SSE olarak akıtır. Olaylar ayrı bir görevde
+    üretilir; `SUMMARIZE_KEEPALIVE` saniye olay gelmezse ping gönderilir.
+    """
+    raw_headers = [
+        (b'content-type', b'text/event-stream; charset=utf-8'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+        (b'access-control-allow-origin', b'*')
+    ]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode('latin-1'), str(value).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+
+    queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for item in events:
+                await queue.put(item)
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await events.aclose()
+
+    task = asyncio.ensure_future(pump())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), Config.SUMMARIZE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                item = ('ping', None)
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                if not isinstance(item, (RateLimitExceeded, SummarizeError)):
+                    logger.error("Özetleme hatası: %s", item)
+                await send({'type': 'http.response.body', 'body': SummarizeService.error_event(item),
+                            'more_body': True})
+                break
+            await send({'type': 'http.response.body', 'body': SummarizeService.sse(*item), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        # İstemci bağlantıyı kapatırsa bekleyen Cohere çağrıları iptal edilir
+        task.cancel()
+
+
+def create_asgi_app(flask_app=None, on_shutdown=None, threads=None):
+    """Senkron modla aynı create_app() yapılandırmasını kullanan ASGI uygulaması"""
+    return QuickLitASGI(flask_app or create_app(), on_shutdown=on_shutdown, threads=threads)
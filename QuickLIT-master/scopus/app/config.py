@@ -1,22 +1,182 @@
 import os
 import json
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _parse_sample_rates(value):
+    """'main.get_latest_articles=0.1,download_pdf=0.5' biçimindeki route örnekleme oranları"""
+    rates = {}
+    for item in (value or '').split(','):
+        route, _, rate = item.partition('=')
+        if route.strip() and rate.strip():
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+def _parse_counts(value):
+    """'medicine=10,physics=3' biçimindeki kategori bazında makale sayıları"""
+    counts = {}
+    for item in (value or '').split(','):
+        category, _, count = item.partition('=')
+        if category.strip() and count.strip():
+            counts[category.strip()] = int(count)
+    return counts
+
+
 class Config:
     API_KEY = os.getenv('SCOPUS_API_KEY')  # Scopus API Anahtarı
-    SCOPUS_BASE_URL = "https://api.elsevier.com/content/search/scopus"
+    # Upstream adresleri (benchmark/test için yerel sahte sunuculara yönlendirilebilir)
+    ELSEVIER_API_URL = os.getenv('ELSEVIER_API_URL', 'https://api.elsevier.com').rstrip('/')
+    SCOPUS_BASE_URL = f"{ELSEVIER_API_URL}/content/search/scopus"
+    COHERE_API_URL = os.getenv('COHERE_API_URL', 'https://api.cohere.ai').rstrip('/')
+    COHERE_API_KEY = os.getenv('COHERE_API_KEY')  # Cohere API Anahtarı
+    # Scopus isteklerinde yalnızca uygulamanın kullandığı alanları iste (field=); false: tam görünüm
+    SCOPUS_FIELD_SELECTION = os.getenv('SCOPUS_FIELD_SELECTION', 'true').lower() == 'true'
     
     # Mutlak yol kullanarak articles klasörünü belirle
     BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
-    ARTICLES_FOLDER = os.path.join(BASE_DIR, 'articles')
+    ARTICLES_FOLDER = os.getenv('ARTICLES_FOLDER', os.path.join(BASE_DIR, 'articles'))
     
     # Uygulama başlangıcında klasörün oluşturulduğundan emin ol
     os.makedirs(ARTICLES_FOLDER, exist_ok=True)
     
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
-    
+
+    # HTTP bağlantı havuzu yapılandırması (Elsevier ve Cohere için)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))  # Havuzda tutulacak host sayısı
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))  # Host başına açık tutulacak bağlantı sayısı
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))  # saniye
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))  # saniye
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', 200))  # ASGI modunda eşzamanlı upstream bağlantısı
+
+    # Önbellek yapılandırması
+    # 'memory': süreç içi önbellek, 'sqlite': tüm worker'ların paylaştığı dosya tabanlı önbellek
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', os.path.join(BASE_DIR, 'cache', 'cache.sqlite3'))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 2000))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 3600))  # saniye
+    CACHE_SWEEP_INTERVAL = int(os.getenv('CACHE_SWEEP_INTERVAL', 60))  # süresi dolan kayıtların taranma aralığı
+
+    # Yerel makale meta veri deposu (arama ve abstract yanıtlarından doldurulur)
+    METADATA_STORE_PATH = os.getenv('METADATA_STORE_PATH', os.path.join(BASE_DIR, 'cache', 'metadata.sqlite3'))
+    METADATA_STORE_TTL = int(os.getenv('METADATA_STORE_TTL', 30 * 24 * 3600))  # DOI/PII/başlık nadiren değişir
+    METADATA_STORE_MAX_ENTRIES = int(os.getenv('METADATA_STORE_MAX_ENTRIES', 500000))
+    METADATA_PREFETCH_WORKERS = int(os.getenv('METADATA_PREFETCH_WORKERS', 2))  # Profilde eksik kayıtların arka plan isteği
+
+    # Ana sayfa arama sonuçları önbelleği (stale-while-revalidate)
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 900))  # Bu süre boyunca sonuç taze kabul edilir
+    SEARCH_STALE_TTL = int(os.getenv('SEARCH_STALE_TTL', 3600))  # Bu süre boyunca bayat sonuç döner, arka planda yenilenir
+    SEARCH_PREFETCH_NEXT_PAGE = os.getenv('SEARCH_PREFETCH_NEXT_PAGE', 'true').lower() == 'true'
+    SEARCH_PREFETCH_WORKERS = int(os.getenv('SEARCH_PREFETCH_WORKERS', 2))
+    SEARCH_BATCH_MAX_QUERIES = int(os.getenv('SEARCH_BATCH_MAX_QUERIES', 20))  # /api/search_batch istek başına
+    SEARCH_BATCH_DEFAULT_COUNT = int(os.getenv('SEARCH_BATCH_DEFAULT_COUNT', 25))  # Sorgu başına sonuç
+    SEARCH_BATCH_MAX_COUNT = int(os.getenv('SEARCH_BATCH_MAX_COUNT', 200))  # Scopus sayfa sınırı
+    SEARCH_BATCH_WORKERS = int(os.getenv('SEARCH_BATCH_WORKERS', 4))  # Aynı anda çalışan sorgu
+
+    # /discover kategori akışları: arka planda TTL dolmadan yenilenir
+    DISCOVER_CATEGORY_COUNT = int(os.getenv('DISCOVER_CATEGORY_COUNT', 5))  # Kategori başına makale sayısı
+    DISCOVER_CATEGORY_COUNTS = _parse_counts(os.getenv('DISCOVER_CATEGORY_COUNTS', ''))  # Kategori bazında sayı
+    DISCOVER_CACHE_TTL = int(os.getenv('DISCOVER_CACHE_TTL', 3600))  # Bu süre boyunca sonuç taze kabul edilir
+    DISCOVER_STALE_TTL = int(os.getenv('DISCOVER_STALE_TTL', 6 * 3600))  # Yenileme başarısızsa bayat sonuç sunulur
+    DISCOVER_REFRESH_ENABLED = os.getenv('DISCOVER_REFRESH_ENABLED', 'true').lower() == 'true'
+    DISCOVER_REFRESH_AFTER = int(os.getenv('DISCOVER_REFRESH_AFTER', 2700))  # Bu yaştaki kategori yenilenir
+    DISCOVER_REFRESH_RETRY = int(os.getenv('DISCOVER_REFRESH_RETRY', 60))  # Başarısız yenilemeden sonra bekleme
+    DISCOVER_FETCH_WORKERS = int(os.getenv('DISCOVER_FETCH_WORKERS', 4))  # /api/latest_articles/all eksikleri paralel çeker
+
+    # Upstream istek bütçeleri: (saniyedeki istek sayısı, anlık patlama kapasitesi)
+    RATE_LIMITS = {
+        'scopus_search': (float(os.getenv('RATE_SCOPUS_SEARCH', 5)), int(os.getenv('RATE_SCOPUS_SEARCH_BURST', 10))),
+        'scopus_abstract': (float(os.getenv('RATE_SCOPUS_ABSTRACT', 5)), int(os.getenv('RATE_SCOPUS_ABSTRACT_BURST', 10))),
+        'scopus_article': (float(os.getenv('RATE_SCOPUS_ARTICLE', 5)), int(os.getenv('RATE_SCOPUS_ARTICLE_BURST', 10))),
+        'cohere': (float(os.getenv('RATE_COHERE', 1)), int(os.getenv('RATE_COHERE_BURST', 5)))
+    }
+    RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 0.5))  # Kullanıcı isteği en fazla bu kadar bekler
+    RATE_LIMIT_BACKGROUND_MAX_WAIT = float(os.getenv('RATE_LIMIT_BACKGROUND_MAX_WAIT', 30))  # Arka plan işleri için
+    RATE_LIMIT_DEFAULT_BACKOFF = float(os.getenv('RATE_LIMIT_DEFAULT_BACKOFF', 60))  # Upstream süre bildirmezse
+
+    # PDF indirme yapılandırması
+    # True ise DOI/PII/scopus_id endpoint'leri sırayla değil aynı anda denenir
+    PDF_RACE_ENDPOINTS = os.getenv('PDF_RACE_ENDPOINTS', 'false').lower() == 'true'
+    PDF_RACE_WORKERS = int(os.getenv('PDF_RACE_WORKERS', 8))
+    PDF_ENDPOINT_STATS_TTL = int(os.getenv('PDF_ENDPOINT_STATS_TTL', 30 * 24 * 3600))  # Kazanan endpoint istatistikleri
+    PDF_CHUNK_SIZE = int(os.getenv('PDF_CHUNK_SIZE', 64 * 1024))  # Akış halinde indirmede parça boyutu
+    PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', 100 * 1024 * 1024))  # Bu boyutu aşan PDF'ler indirilmez
+
+    # İçerik adresli PDF deposu (ARTICLES_FOLDER/pdf altında)
+    PDF_STORE_INDEX_PATH = os.getenv('PDF_STORE_INDEX_PATH', os.path.join(ARTICLES_FOLDER, 'pdf_index.sqlite3'))
+    PDF_STORE_MAX_BYTES = int(os.getenv('PDF_STORE_MAX_BYTES', 5 * 1024 * 1024 * 1024))  # Disk kotası
+    PDF_NEGATIVE_TTL = int(os.getenv('PDF_NEGATIVE_TTL', 6 * 3600))  # "PDF yok" sonucunun saklanma süresi (geçici hatalar saklanmaz)
+
+    # PDF metin çıkarma (süreç havuzu; pypdf gerekir)
+    TEXT_EXTRACTION_WORKERS = int(os.getenv('TEXT_EXTRACTION_WORKERS', max(1, min(4, (os.cpu_count() or 2) // 2))))
+    TEXT_EXTRACTION_MAX_PAGES = int(os.getenv('TEXT_EXTRACTION_MAX_PAGES', 1000))  # Bu sayfadan sonrası okunmaz
+    TEXT_EXTRACTION_TASKS_PER_CHILD = int(os.getenv('TEXT_EXTRACTION_TASKS_PER_CHILD', 50))  # Alt süreç yenileme
+    TEXT_EXTRACTION_POOL_IDLE = int(os.getenv('TEXT_EXTRACTION_POOL_IDLE', 300))  # Boşta kalan havuz kapatılır
+    TEXT_EXTRACTION_TIMEOUT = float(os.getenv('TEXT_EXTRACTION_TIMEOUT', 120))  # /summarize/<id> bekleme sınırı
+
+    # Yerel tam metin arama dizini (/api/local_search)
+    LOCAL_SEARCH_ENABLED = os.getenv('LOCAL_SEARCH_ENABLED', 'true').lower() == 'true'
+    LOCAL_SEARCH_INDEX_PATH = os.getenv('LOCAL_SEARCH_INDEX_PATH', os.path.join(ARTICLES_FOLDER, 'search_index.sqlite3'))
+    LOCAL_SEARCH_MAX_RESULTS = int(os.getenv('LOCAL_SEARCH_MAX_RESULTS', 100))  # ?limit= üst sınırı
+    LOCAL_SEARCH_RETRY_AFTER = int(os.getenv('LOCAL_SEARCH_RETRY_AFTER', 6 * 3600))  # Metni çıkarılamayan PDF
+    LOCAL_SEARCH_CLAIM_TIMEOUT = int(os.getenv('LOCAL_SEARCH_CLAIM_TIMEOUT', 600))  # Yarım kalan dizinleme
+
+    # Uzun metin özetleme (/summarize, parçalı map-reduce)
+    SUMMARIZE_MAX_CHARS = int(os.getenv('SUMMARIZE_MAX_CHARS', 500000))  # Kabul edilen en uzun metin
+    SUMMARIZE_CHUNK_CHARS = int(os.getenv('SUMMARIZE_CHUNK_CHARS', 12000))  # Tek Cohere çağrısındaki metin
+    SUMMARIZE_CHUNK_LENGTH = os.getenv('SUMMARIZE_CHUNK_LENGTH', 'medium')  # Parça özetlerinin uzunluğu
+    SUMMARIZE_CONCURRENCY = int(os.getenv('SUMMARIZE_CONCURRENCY', 4))  # İstek başına eşzamanlı parça
+    SUMMARIZE_WORKERS = int(os.getenv('SUMMARIZE_WORKERS', 8))  # Parça çağrıları thread havuzu (senkron mod)
+    SUMMARIZE_RATE_MAX_WAIT = float(os.getenv('SUMMARIZE_RATE_MAX_WAIT', 20))  # Parçaların token bekleme sınırı
+    SUMMARIZE_TIMEOUT = float(os.getenv('SUMMARIZE_TIMEOUT', 30))  # Tek Cohere çağrısı (saniye)
+    SUMMARIZE_KEEPALIVE = float(os.getenv('SUMMARIZE_KEEPALIVE', 10))  # SSE akışında ping aralığı
+
+    # Özet sonuç önbelleği (normalize metin + seçenekler -> sonuç; CACHE_BACKEND'den bağımsız, diskte)
+    SUMMARY_CACHE_ENABLED = os.getenv('SUMMARY_CACHE_ENABLED', 'true').lower() == 'true'
+    SUMMARY_CACHE_PATH = os.getenv('SUMMARY_CACHE_PATH', os.path.join(BASE_DIR, 'cache', 'summaries.sqlite3'))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', 20000))
+    SUMMARY_CACHE_MAX_BYTES = int(os.getenv('SUMMARY_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+    SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', 30 * 24 * 3600))  # saniye
+
+    # Toplu PDF indirme işleri
+    PDF_BATCH_WORKERS = int(os.getenv('PDF_BATCH_WORKERS', 4))
+    PDF_BATCH_MAX_ITEMS = int(os.getenv('PDF_BATCH_MAX_ITEMS', 50))  # Tek işte en fazla makale sayısı
+    PDF_BATCH_MAX_RETRIES = int(os.getenv('PDF_BATCH_MAX_RETRIES', 3))  # İstek limiti aşılınca yeniden deneme
+    PDF_BATCH_JOB_TTL = int(os.getenv('PDF_BATCH_JOB_TTL', 24 * 3600))  # İş durumunun saklanma süresi
+    # İş durumları CACHE_BACKEND'den bağımsız olarak bu SQLite dosyasında tutulur (tüm worker'lar okur)
+    PDF_BATCH_JOBS_PATH = os.getenv('PDF_BATCH_JOBS_PATH', os.path.join(BASE_DIR, 'cache', 'pdf_batch.sqlite3'))
+    PDF_BATCH_MAX_JOBS = int(os.getenv('PDF_BATCH_MAX_JOBS', 1000))  # Saklanan en fazla iş sayısı
+
+    # Toplu Scopus sonuç aktarımı (python -m app.harvest)
+    HARVEST_PAGE_SIZE = int(os.getenv('HARVEST_PAGE_SIZE', 200))  # Scopus STANDARD görünümde en fazla 200
+    HARVEST_PREFETCH = int(os.getenv('HARVEST_PREFETCH', 2))  # Yazılmayı bekleyen en fazla sayfa
+    HARVEST_MAX_RETRIES = int(os.getenv('HARVEST_MAX_RETRIES', 5))  # Sayfa başına yeniden deneme
+    HARVEST_PARQUET_PART_ROWS = int(os.getenv('HARVEST_PARQUET_PART_ROWS', 50000))  # Parquet parça dosyası boyutu
+
+    # Loglama yapılandırması
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'text' veya 'json'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # Dolunca yeni kayıtlar düşürülür
+    LOG_SAMPLE_DEFAULT = float(os.getenv('LOG_SAMPLE_DEFAULT', 1.0))  # WARNING altı kayıtlar için istek örnekleme oranı
+    LOG_SAMPLE_RATES = _parse_sample_rates(os.getenv('LOG_SAMPLE_RATES', ''))  # Route (endpoint) bazında oran
+
+    # Sunucu yapılandırması (python run.py)
+    SERVER_HOST = os.getenv('HOST', '127.0.0.1')
+    SERVER_PORT = int(os.getenv('PORT', 3000))
+    SERVER_WORKERS = int(os.getenv('WEB_WORKERS', min(2 * (os.cpu_count() or 1) + 1, 8)))  # gunicorn worker süreci
+    SERVER_THREADS = int(os.getenv('WEB_THREADS', 4))  # Worker başına istek thread'i
+    SERVER_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 120))  # Yanıt vermeyen worker bu süre sonra yeniden başlatılır
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))  # Kapanışta süren isteklere tanınan süre
+    SERVER_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() == 'true'  # Uygulama fork'tan önce bir kez yüklenir
+    SERVER_WARMUP = os.getenv('WEB_WARMUP', 'true').lower() == 'true'  # Başlangıçta önbellekleri doldur
+
     # Firebase yapılandırması
     FIREBASE_CONFIG = {
         "apiKey": os.getenv('FIREBASE_API_KEY'),
@@ -28,6 +188,14 @@ class Config:
         "measurementId": os.getenv('FIREBASE_MEASUREMENT_ID')
     }
     
+    # Firebase kimlik doğrulama önbelleği
+    AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 300))  # Kullanıcı kaydı (saniye); çıkışta silinir
+    AUTH_TOKEN_EXPIRY_MARGIN = int(os.getenv('AUTH_TOKEN_EXPIRY_MARGIN', 30))  # Token exp'ten bu kadar önce düşer
+
+    # Kaydedilen makaleler (users/{uid}/savedArticles) sayfalama
+    SAVED_ARTICLES_PAGE_SIZE = int(os.getenv('SAVED_ARTICLES_PAGE_SIZE', 20))  # Profil sayfasında ilk sayfa
+    SAVED_ARTICLES_MAX_PAGE_SIZE = int(os.getenv('SAVED_ARTICLES_MAX_PAGE_SIZE', 100))  # ?limit= üst sınırı
+
     # Firebase Admin SDK yapılandırması
     CREDENTIALS_PATH = os.path.join(BASE_DIR, 'firebase-credentials.json')
     
@@ -37,7 +205,7 @@ class Config:
             with open(Config.CREDENTIALS_PATH, 'r') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"Firebase credentials yüklenirken hata: {e}")
+            logger.error("Firebase credentials yüklenirken hata: %s", e)
             return None
     
     @staticmethod
@@ -46,9 +214,9 @@ class Config:
         if not os.path.exists(Config.ARTICLES_FOLDER):
             try:
                 os.makedirs(Config.ARTICLES_FOLDER)
-                print(f"Ana articles klasörü oluşturuldu: {Config.ARTICLES_FOLDER}")
+                logger.info("Ana articles klasörü oluşturuldu: %s", Config.ARTICLES_FOLDER)
             except Exception as e:
-                print(f"Articles klasörü oluşturma hatası: {e}")
+                logger.error("Articles klasörü oluşturma hatası: %s", e)
         
         # Alt klasörleri oluştur
         subfolders = ['pdf', 'other']
@@ -57,6 +225,6 @@ class Config:
             if not os.path.exists(folder_path):
                 try:
                     os.makedirs(folder_path)
-                    print(f"Alt klasör oluşturuldu: {folder_path}")
+                    logger.info("Alt klasör oluşturuldu: %s", folder_path)
                 except Exception as e:
-                    print(f"Alt klasör oluşturma hatası ({folder}): {e}")
+                    logger.error("Alt klasör oluşturma hatası (%s): %s", folder, e)
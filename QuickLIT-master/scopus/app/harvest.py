@@ -0,0 +1,50 @@
+"""
+Bir Scopus sorgusunun tüm sonuçlarını NDJSON/CSV/Parquet dosyasına aktarır.
+Kesilirse aynı komut `--resume` ile kaldığı yerden sürdürülür.
+
+    python -m app.harvest 'TITLE-ABS-KEY("machine learning")' -o sonuclar.ndjson
+    python -m app.harvest 'TITLE-ABS-KEY("machine learning")' -o sonuclar.csv --resume
+    python -m app.harvest 'AUTHKEY(covid)' -o sonuclar.parquet --max-records 20000
+"""
+import argparse
+import logging
+import sys
+from . import logging_setup
+from .services.harvest_service import FORMATS, HarvestError, HarvestService
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scopus sorgusunun tüm sonuçlarını dosyaya aktar')
+    parser.add_argument('query', help='Scopus arama sorgusu')
+    parser.add_argument('-o', '--output', required=True,
+                        help='Çıktı dosyası (.ndjson/.csv) ya da Parquet dizini (.parquet)')
+    parser.add_argument('--format', choices=FORMATS, help='Çıktı biçimi (varsayılan: uzantıdan)')
+    parser.add_argument('--resume', action='store_true', help='Checkpoint varsa kaldığı yerden devam et')
+    parser.add_argument('--max-records', type=int, help='En fazla bu kadar kayıt yaz')
+    parser.add_argument('--page-size', type=int, help='Sayfa başına kayıt (varsayılan: HARVEST_PAGE_SIZE)')
+    args = parser.parse_args(argv)
+
+    logging_setup.configure_logging()
+
+    def progress(written, total):
+        logger.info("%d / %s kayıt yazıldı", written, total if total is not None else '?')
+
+    try:
+        result = HarvestService.run(args.query, args.output, format=args.format, resume=args.resume,
+                                    max_records=args.max_records, page_size=args.page_size, progress=progress)
+    except HarvestError as e:
+        print(f'Harvest tamamlanamadı: {e}', file=sys.stderr)
+        print('Kaldığı yerden devam etmek için aynı komutu --resume ile çalıştırın', file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print('Harvest durduruldu; devam etmek için --resume kullanın', file=sys.stderr)
+        return 130
+
+    print(f"{result['written']} kayıt yazıldı ({result['total']} sonuç, {result['pages']} sayfa): {result['output']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
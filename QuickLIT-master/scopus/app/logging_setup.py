@@ -0,0 +1,207 @@
+"""
+Uygulama genelinde loglama.
+
+Kayıtlar istek thread'inde yalnızca bir kuyruğa eklenir; biçimlendirme ve
+stdout'a yazma ayrı bir dinleyici thread'inde yapılır (QueueHandler /
+QueueListener). Her kayda istek kimliği (X-Request-ID) eklenir. WARNING
+altındaki kayıtlar route bazında örneklenebilir: bir istek örneklenmediyse o
+isteğin INFO/DEBUG kayıtlarının hiçbiri yazılmaz.
+
+Büyük yükler (API yanıtları vb.) `LazyJSON` ile loglanır; böylece yalnızca
+ilgili seviye gerçekten açıkken JSON'a çevrilir:
+
+    logger.debug("API yanıtı: %s", LazyJSON(data))
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from .config import Config
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+route_var = contextvars.ContextVar('route', default='-')
+sampled_var = contextvars.ContextVar('sampled', default=True)
+
+_REQUEST_ID_RE = re.compile(r'^[\w.\-]{1,64}$')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+
+_lock = threading.Lock()
+_state = {'pid': None, 'listener': None, 'handler': None, 'stream_handler': None}
+
+
+class LazyJSON:
+    """Yalnızca kayıt gerçekten yazılırken JSON'a çevrilen log argümanı"""
+
+    __slots__ = ('data', 'indent')
+
+    def __init__(self, data, indent=None):
+        self.data = data
+        self.indent = indent
+
+    def __str__(self):
+        try:
+            return json.dumps(self.data, indent=self.indent, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return repr(self.data)
+
+
+class RequestContextFilter(logging.Filter):
+    """Kayda istek kimliğini ve route'u ekler, örneklenmeyen isteklerin ayrıntı kayıtlarını eler"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.route = route_var.get()
+        return record.levelno >= logging.WARNING or sampled_var.get()
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'route': getattr(record, 'route', '-'),
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Kuyruk doluysa bekleyip isteği yavaşlatmak yerine kaydı düşürür"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Aynı süreç içindeki kuyruk: biçimlendirme dinleyici thread'ine bırakılır
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+
+def configure_logging():
+    """
+    Kök logger'ı kuyruk tabanlı handler ile yapılandırır. Birden çok kez
+    çağrılabilir; fork sonrası çocuk süreçte dinleyici thread'i yeniden başlatılır.
+    """
+    with _lock:
+        if _state['pid'] == os.getpid():
+            return
+        if _state['handler'] is None:
+            _install_handler()
+        _start_listener()
+
+
+def _install_handler():
+    stream_handler = logging.StreamHandler()
+    if Config.LOG_FORMAT == 'json':
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL)
+    root.addHandler(handler)
+    # Erişim kayıtlarını istek kimliği ve süreyle 'app.access' yazar
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    _state['handler'] = handler
+    _state['stream_handler'] = stream_handler
+    atexit.register(_stop_listener)
+
+
+def _start_listener():
+    listener = QueueListener(_state['handler'].queue, _state['stream_handler'], respect_handler_level=True)
+    listener.start()
+    _state['listener'] = listener
+    _state['pid'] = os.getpid()
+
+
+def _stop_listener():
+    listener = _state.get('listener')
+    if listener is not None and _state['pid'] == os.getpid():
+        listener.stop()  # Kuyruktaki kayıtlar yazıldıktan sonra döner
+        _state['listener'] = None
+
+
+def _after_fork_in_child():
+    # Dinleyici thread'i fork ile çocuk sürece geçmez
+    if _state['handler'] is not None:
+        _state['handler'].queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _start_listener()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def sample_rate(route):
+    return Config.LOG_SAMPLE_RATES.get(route, Config.LOG_SAMPLE_DEFAULT)
+
+
+def begin_request(route, request_id=None):
+    """İstek bağlamını başlatır; teardown'da `end_request`'e verilecek token'ları döndürür"""
+    rate = sample_rate(route)
+    return (
+        request_id_var.set(request_id or uuid.uuid4().hex[:16]),
+        route_var.set(route),
+        sampled_var.set(rate >= 1 or random.random() < rate)
+    )
+
+
+def end_request(tokens):
+    request_id_token, route_token, sampled_token = tokens
+    request_id_var.reset(request_id_token)
+    route_var.reset(route_token)
+    sampled_var.reset(sampled_token)
+
+
+def init_app(app):
+    """Flask uygulamasına istek kimliği ve örnekleme bağlamını ekler"""
+    from flask import g, request
+
+    configure_logging()
+    access_logger = logging.getLogger('app.access')
+
+    @app.before_request
+    def _begin_request_logging():
+        request_id = request.headers.get('X-Request-ID', '')
+        g.log_tokens = begin_request(request.endpoint or request.path,
+                                     request_id if _REQUEST_ID_RE.match(request_id) else None)
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _add_request_id(response):
+        response.headers['X-Request-ID'] = request_id_var.get()
+        started = g.get('request_started')
+        if started is not None and access_logger.isEnabledFor(logging.INFO):
+            access_logger.info("%s %s %s %.1fms", request.method, request.path, response.status_code,
+                               (time.perf_counter() - started) * 1000)
+        return response
+
+    @app.teardown_request
+    def _end_request_logging(exc):
+        tokens = g.pop('log_tokens', None)
+        if tokens is not None:
+            end_request(tokens)
+
+
+def dropped_records():
+    return _NonBlockingQueueHandler.dropped
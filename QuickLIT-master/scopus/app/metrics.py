@@ -0,0 +1,493 @@
+"""
+Süreç içi metrikler ve Prometheus metin biçiminde dışa aktarım.
+
+Route gecikmeleri, upstream çağrı süreleri (Scopus, Cohere, Firebase), istek
+bütçesi beklemeleri ve eşzamanlı istek sayıları burada tutulur. Önbellek, HTTP
+havuzu ve rate limiter durumları ise `/metrics` okunurken ilgili servislerin
+`stats()` çıktılarından toplanır.
+
+Metrikler worker süreci başınadır; gunicorn ile birden fazla worker
+çalışıyorsa her kazıma (scrape) yanıtı veren worker'ın değerlerini döndürür
+(`pid` etiketiyle ayırt edilebilir).
+"""
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from .config import Config
+
+# Saniye cinsinden histogram kovaları
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 5, 10, 30)
+
+# Upstream -> erişilebilirlik yoklamasında kullanılacak varsayılan host
+UPSTREAM_HOSTS = {
+    'scopus_search': urlsplit(Config.ELSEVIER_API_URL).netloc,
+    'scopus_abstract': urlsplit(Config.ELSEVIER_API_URL).netloc,
+    'scopus_article': urlsplit(Config.ELSEVIER_API_URL).netloc,
+    'cohere': urlsplit(Config.COHERE_API_URL).netloc,
+    'firebase_auth': 'identitytoolkit.googleapis.com',
+    'firestore': 'firestore.googleapis.com'
+}
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        result = []
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                result.append((self.name + '_bucket', key + (_format_value(bound),), cumulative))
+            result.append((self.name + '_bucket', key + ('+Inf',), count))
+            result.append((self.name + '_count', key, count))
+            result.append((self.name + '_sum', key, total))
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def add_collector(self, collector):
+        """
+        `collector()` her okumada (name, type, help, [(labels_dict, value), ...])
+        demetleri üretir; durumu başka bir serviste tutulan değerler için.
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample_name, key, value in metric.samples():
+                names = metric.labelnames + (('le',) if sample_name.endswith('_bucket') else ())
+                lines.append(f"{sample_name}{_format_labels(dict(zip(names, key)))} {_format_value(value)}")
+
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                continue  # Bir servisin hatası /metrics'i bozmasın
+            for name, metric_type, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+
+http_request_duration = Histogram(
+    'quicklit_http_request_duration_seconds', 'Route başına istek süresi',
+    ('route', 'method', 'status')
+)
+http_requests_in_flight = Gauge(
+    'quicklit_http_requests_in_flight', 'İşlenmekte olan istek sayısı', ('route',)
+)
+upstream_request_duration = Histogram(
+    'quicklit_upstream_request_duration_seconds', 'Upstream çağrı süresi (yanıt başlıklarına kadar)',
+    ('upstream', 'status')
+)
+upstream_requests_in_flight = Gauge(
+    'quicklit_upstream_requests_in_flight', 'Süren upstream çağrısı sayısı', ('upstream',)
+)
+rate_limit_wait = Histogram(
+    'quicklit_rate_limit_wait_seconds', 'İstek bütçesinden token alınırken beklenen süre',
+    ('upstream',), buckets=WAIT_BUCKETS
+)
+rate_limit_rejections = Counter(
+    'quicklit_rate_limit_rejections_total', 'İstek bütçesi yetmediği için reddedilen çağrılar', ('upstream',)
+)
+singleflight_calls = Counter(
+    'quicklit_singleflight_calls_total',
+    "Birleştirilen çağrılar (leader: upstream'e giden, follower: süren çağrının sonucunu paylaşan)",
+    ('flight', 'role')
+)
+
+
+class UpstreamHealth:
+    """Upstream'lerin son çağrı sonuçlarından çıkarılan (pasif) erişilebilirlik bilgisi"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def record(self, upstream, host, status, duration):
+        ok = status != 'error' and int(status) < 500
+        now = time.time()
+        with self._lock:
+            state = self._state.setdefault(upstream, {
+                'host': host,
+                'last_status': None,
+                'last_success': None,
+                'last_failure': None,
+                'consecutive_failures': 0,
+                'last_duration': None
+            })
+            state['host'] = host or state['host']
+            state['last_status'] = status
+            state['last_duration'] = round(duration, 4)
+            if ok:
+                state['last_success'] = now
+                state['consecutive_failures'] = 0
+            else:
+                state['last_failure'] = now
+                state['consecutive_failures'] += 1
+
+    def snapshot(self):
+        now = time.time()
+        result = {}
+        with self._lock:
+            items = {name: dict(state) for name, state in self._state.items()}
+        for name, state in items.items():
+            failures = state['consecutive_failures']
+            state['reachable'] = failures < 3
+            for field in ('last_success', 'last_failure'):
+                value = state.pop(field)
+                state[f"{field}_age"] = round(now - value, 1) if value is not None else None
+            result[name] = state
+        return result
+
+    def host(self, upstream):
+        with self._lock:
+            state = self._state.get(upstream)
+        return (state and state['host']) or UPSTREAM_HOSTS.get(upstream)
+
+
+upstream_health = UpstreamHealth()
+
+
+class _UpstreamCall:
+    __slots__ = ('status',)
+
+    def __init__(self):
+        self.status = 'error'
+
+
+@contextmanager
+def track_upstream(upstream, url=None):
+    """
+    Bir upstream çağrısını süre, eşzamanlılık ve erişilebilirlik açısından
+    kaydeder. Çağıran, yanıt gelince `call.status`'u HTTP koduna ayarlar;
+    ayarlanmazsa (istisna) çağrı 'error' olarak sayılır.
+    """
+    call = _UpstreamCall()
+    host = urlsplit(url).netloc if url else None
+    upstream_requests_in_flight.inc(upstream=upstream)
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        duration = time.perf_counter() - started
+        upstream_requests_in_flight.dec(upstream=upstream)
+        upstream_request_duration.observe(duration, upstream=upstream, status=call.status)
+        upstream_health.record(upstream, host, call.status, duration)
+
+
+# Firebase Admin SDK hata kodlarından istemci kaynaklı olanlar (upstream arızası sayılmaz)
+_CLIENT_ERROR_CODES = {'INVALID_ARGUMENT', 'NOT_FOUND', 'ALREADY_EXISTS', 'UNAUTHENTICATED',
+                       'PERMISSION_DENIED', 'FAILED_PRECONDITION'}
+
+
+@contextmanager
+def track_call(upstream):
+    """HTTP dışı upstream çağrıları (Firebase Admin SDK) için `track_upstream`"""
+    with track_upstream(upstream) as call:
+        try:
+            yield
+        except Exception as e:
+            if isinstance(e, ValueError) or getattr(e, 'code', None) in _CLIENT_ERROR_CODES:
+                call.status = 400
+            raise
+        call.status = 200
+
+
+def probe(host, port=443, timeout=1.0):
+    """Host'a TCP bağlantısı açılabiliyor mu (istek bütçesi harcamadan)"""
+    name, _, explicit_port = host.rpartition(':')
+    if name and explicit_port.isdigit():
+        host, port = name, int(explicit_port)
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return {'reachable': True, 'connect_ms': round((time.perf_counter() - started) * 1000, 1)}
+    except OSError as e:
+        return {'reachable': False, 'error': str(e)}
+
+
+def init_app(app):
+    """Route gecikmesi ve eşzamanlı istek sayısı ölçümünü uygulamaya ekler"""
+    from flask import g, request
+
+    if _service_collector not in REGISTRY._collectors:
+        REGISTRY.add_collector(_service_collector)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_route = request.endpoint or 'unmatched'
+        g.metrics_started = time.perf_counter()
+        http_requests_in_flight.inc(route=g.metrics_route)
+
+    @app.teardown_request
+    def _observe_request(exc):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        route = g.pop('metrics_route')
+        http_requests_in_flight.dec(route=route)
+        status = getattr(g, 'metrics_status', 500 if exc is not None else 200)
+        http_request_duration.observe(time.perf_counter() - started,
+                                      route=route, method=request.method, status=status)
+
+    @app.after_request
+    def _remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+
+def saturation():
+    """Kaynak kullanım oranları; 1'e yaklaşan değerler darboğaza işaret eder"""
+    from .config import Config
+    from .services.cache_service import get_cache
+    from .services.pdf_store import get_pdf_store
+    from .services.rate_limiter import rate_limiter
+
+    in_flight = sum(value for _, _, value in http_requests_in_flight.samples())
+    result = {
+        'requests': {
+            'in_flight': in_flight,
+            'threads': Config.SERVER_THREADS,
+            'utilization': round(in_flight / Config.SERVER_THREADS, 3) if Config.SERVER_THREADS else None
+        },
+        'upstreams': {}
+    }
+
+    for name, limit in rate_limiter.status().items():
+        upstream_in_flight = upstream_requests_in_flight.get(upstream=name)
+        result['upstreams'][name] = {
+            'in_flight': upstream_in_flight,
+            'pool_utilization': round(upstream_in_flight / Config.HTTP_POOL_MAXSIZE, 3),
+            'token_utilization': round(1 - limit['tokens'] / limit['capacity'], 3),
+            'queued': limit['queued'],
+            'blocked_for': limit['blocked_for'],
+            'saturated': limit['blocked_for'] > 0 or (limit['tokens'] < 1 and limit['queued'] > 0)
+                         or upstream_in_flight >= Config.HTTP_POOL_MAXSIZE
+        }
+
+    cache = get_cache().stats()
+    if cache.get('max_bytes'):
+        result['cache_utilization'] = round(cache.get('bytes', 0) / cache['max_bytes'], 3)
+    store = get_pdf_store().stats()
+    result['pdf_store_utilization'] = round(store['bytes'] / store['max_bytes'], 3) if store['max_bytes'] else None
+    return result
+
+
+def health(probe_hosts=False):
+    """
+    /api/health gövdesi. Erişilebilirlik normalde son çağrıların sonuçlarından
+    çıkarılır; `probe_hosts` ile upstream host'larına ayrıca TCP bağlantısı
+    denenir (istek bütçesi harcanmaz).
+    """
+    upstreams = upstream_health.snapshot()
+    if probe_hosts:
+        probes = {}
+        for name in UPSTREAM_HOSTS:
+            host = upstream_health.host(name)
+            if host not in probes:
+                probes[host] = probe(host)
+            upstreams.setdefault(name, {'host': host})['probe'] = probes[host]
+
+    load = saturation()
+    degraded = (
+        any(not state.get('reachable', True) or not state.get('probe', {}).get('reachable', True)
+            for state in upstreams.values())
+        or any(state['saturated'] for state in load['upstreams'].values())
+    )
+    return {
+        'status': 'degraded' if degraded else 'ok',
+        'upstreams': upstreams,
+        'saturation': load
+    }
+
+
+def _service_collector():
+    """Önbellek, HTTP havuzu, rate limiter, PDF ve meta veri depoları ile log kuyruğu durumları"""
+    from .config import Config
+    from .logging_setup import dropped_records
+    from .services.cache_service import get_cache
+    from .services.http_client import HTTPClient
+    from .services.local_search import LocalSearchService
+    from .services.metadata_store import get_metadata_store
+    from .services.pdf_store import get_pdf_store
+    from .services.rate_limiter import rate_limiter
+    from .services.summarize_service import get_summary_cache
+
+    cache = get_cache().stats()
+    namespaces = cache.get('namespaces', {})
+    yield ('quicklit_cache_hits_total', 'counter', 'Önbellek isabetleri (anahtar ön ekine göre)',
+           [({'namespace': name}, values['hits']) for name, values in namespaces.items()])
+    yield ('quicklit_cache_misses_total', 'counter', 'Önbellek ıskaları (anahtar ön ekine göre)',
+           [({'namespace': name}, values['misses']) for name, values in namespaces.items()])
+    yield ('quicklit_cache_hit_ratio', 'gauge', 'Önbellek isabet oranı',
+           [({'namespace': name}, values['hit_ratio']) for name, values in namespaces.items()]
+           + [({'namespace': 'all'}, cache['hit_ratio'])])
+    yield ('quicklit_cache_evictions_total', 'counter', 'Sınır aşımıyla çıkarılan kayıtlar', [({}, cache['evictions'])])
+    yield ('quicklit_cache_entries', 'gauge', 'Önbellekteki kayıt sayısı', [({}, cache.get('entries', 0))])
+    yield ('quicklit_cache_bytes', 'gauge', 'Önbellek boyutu', [({}, cache.get('bytes', 0))])
+
+    if Config.SUMMARY_CACHE_ENABLED:
+        summaries = get_summary_cache().stats()
+        yield ('quicklit_summary_cache_lookups_total', 'counter', 'Özet önbelleği aramaları',
+               [({'result': 'hit'}, summaries['hits']), ({'result': 'miss'}, summaries['misses'])])
+        yield ('quicklit_summary_cache_evictions_total', 'counter', 'Boyut sınırı nedeniyle silinen özetler',
+               [({}, summaries['evictions'])])
+        yield ('quicklit_summary_cache_entries', 'gauge', 'Önbellekteki özet sayısı', [({}, summaries['entries'])])
+        yield ('quicklit_summary_cache_bytes', 'gauge', 'Özet önbelleğinin disk kullanımı', [({}, summaries['bytes'])])
+
+    pool = HTTPClient.stats()
+    yield ('quicklit_http_pool_requests_total', 'counter', 'Havuz üzerinden yapılan istekler',
+           [({'host': host}, values['requests']) for host, values in pool.items()])
+    yield ('quicklit_http_pool_new_connections_total', 'counter', 'Açılan yeni TCP/TLS bağlantıları',
+           [({'host': host}, values['new_connections']) for host, values in pool.items()])
+
+    limits = rate_limiter.status()
+    yield ('quicklit_rate_limit_tokens', 'gauge', 'Upstream istek bütçesinde kalan token',
+           [({'upstream': name}, values['tokens']) for name, values in limits.items()])
+    yield ('quicklit_rate_limit_queued', 'gauge', 'Token bekleyen istekler',
+           [({'upstream': name}, values['queued']) for name, values in limits.items()])
+    yield ('quicklit_rate_limit_blocked_seconds', 'gauge', "Upstream'in bildirdiği kalan bekleme süresi",
+           [({'upstream': name}, values['blocked_for']) for name, values in limits.items()])
+
+    store = get_pdf_store().stats()
+    yield ('quicklit_pdf_store_bytes', 'gauge', 'PDF deposunun disk kullanımı', [({}, store['bytes'])])
+    yield ('quicklit_pdf_store_blobs', 'gauge', 'Depodaki PDF dosyası sayısı', [({}, store['blobs'])])
+
+    articles = get_metadata_store().stats()
+    yield ('quicklit_metadata_store_lookups_total', 'counter', 'Meta veri deposu aramaları',
+           [({'result': 'hit'}, articles['hits']), ({'result': 'miss'}, articles['misses'])])
+    yield ('quicklit_metadata_store_upserts_total', 'counter', 'Meta veri deposuna yazılan kayıtlar',
+           [({}, articles['upserts'])])
+    yield ('quicklit_metadata_store_entries', 'gauge', 'Meta veri deposundaki makaleler (abstract alınmış olanlar ayrı)',
+           [({'source': 'all'}, articles['entries']), ({'source': 'abstract'}, articles['with_abstract'])])
+
+    index = LocalSearchService.stats()
+    yield ('quicklit_local_search_documents', 'gauge', 'Yerel arama dizinindeki PDF\'ler (duruma göre)',
+           [({'status': status}, index[status]) for status in ('documents', 'pending', 'failed')])
+    yield ('quicklit_local_search_pages', 'gauge', 'Dizinlenmiş sayfa sayısı', [({}, index['pages'])])
+
+    yield ('quicklit_log_dropped_total', 'counter', 'Kuyruk dolduğu için düşürülen log kayıtları',
+           [({}, dropped_records())])
+
+
+def _process_collector():
+    yield ('quicklit_process_info', 'gauge', 'Metrikleri üreten worker süreci', [({'pid': os.getpid()}, 1)])
+
+
+REGISTRY.add_collector(_process_collector)
@@ -0,0 +1,56 @@
+"""
+Kaydedilen makaleleri kullanıcı belgesindeki eski dizi alanlarından
+(`savedArticles`, `saved_articles`) `users/{uid}/savedArticles` alt
+koleksiyonuna taşır. Tekrar çalıştırılması güvenlidir: taşınmış kullanıcılar
+ve alt koleksiyonda zaten bulunan makaleler atlanır.
+
+    python -m app.migrate_saved_articles --dry-run
+    python -m app.migrate_saved_articles --uid <kullanıcı_id>
+"""
+import argparse
+import logging
+import sys
+from . import logging_setup
+from .services.firebase_service import get_firestore
+from .services.saved_articles_service import SavedArticlesService
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Kaydedilen makaleleri alt koleksiyona taşı')
+    parser.add_argument('--uid', action='append', default=[], help='Yalnızca bu kullanıcı (tekrarlanabilir)')
+    parser.add_argument('--dry-run', action='store_true', help='Yazmadan, taşınacak makale sayısını göster')
+    parser.add_argument('--keep-legacy', action='store_true',
+                        help='Eski dizi alanlarını silme (geri dönüş için)')
+    args = parser.parse_args(argv)
+
+    logging_setup.configure_logging()
+    db = get_firestore()
+    if db is None:
+        print('Firestore bağlantısı kurulamadı', file=sys.stderr)
+        return 1
+
+    users = db.collection('users')
+    refs = [users.document(uid) for uid in args.uid] if args.uid else users.list_documents()
+
+    migrated_users = migrated_articles = failed = 0
+    for ref in refs:
+        try:
+            count = SavedArticlesService.migrate_user(db, ref, dry_run=args.dry_run, keep_legacy=args.keep_legacy)
+        except Exception as e:
+            failed += 1
+            logger.error("Kullanıcı taşınamadı (%s): %s", ref.id, e)
+            continue
+        if count:
+            migrated_users += 1
+            migrated_articles += count
+            logger.info("%s: %d makale %s", ref.id, count, 'taşınacak' if args.dry_run else 'taşındı')
+
+    verb = 'taşınacak' if args.dry_run else 'taşındı'
+    print(f'{migrated_users} kullanıcı, {migrated_articles} makale {verb}; {failed} hata')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,26 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory, Blueprint
+from flask import Flask, render_template, request, jsonify, send_from_directory, Blueprint, Response, stream_with_context, url_for
 from flask_cors import CORS
 import requests
-import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from .config import Config
-import time
+from .services.rate_limiter import rate_limiter, RateLimitExceeded
+from .services.pdf_batch import PDFBatchService
+from .services.pdf_service import PDFService
+from .services.articles import Article
+from .services.discover_service import DiscoverService
+from .services.local_search import LocalSearchService, InvalidQuery
+from .services.search_batch import SearchBatchService
+from .services.summarize_service import SummarizeService, SummarizeError
 from functools import lru_cache
-import json
+import logging
 
 app = Flask(__name__)
 CORS(app)
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Blueprint oluştur
 main = Blueprint('main', __name__)
 
@@ -20,40 +28,6 @@ main = Blueprint('main', __name__)
 SCOPUS_API_KEY = Config.API_KEY
 SCOPUS_BASE_URL = Config.SCOPUS_BASE_URL
 
-# Cohere API anahtarı
-COHERE_API_KEY = os.getenv('COHERE_API_KEY')
-
-# Cache süresi (saniye)
-CACHE_DURATION = 3600  # 1 saat
-
-# Cache için sözlük
-cache = {}
-
-# Son istek zamanını takip etmek için
-last_request_time = 0
-MIN_REQUEST_INTERVAL = 2  # İstekler arası minimum süre (saniye)
-
-def get_cached_data(cache_key):
-    if cache_key in cache:
-        timestamp, data = cache[cache_key]
-        if time.time() - timestamp < CACHE_DURATION:
-            return data
-    return None
-
-def set_cached_data(cache_key, data):
-    cache[cache_key] = (time.time(), data)
-
-def wait_for_rate_limit():
-    global last_request_time
-    current_time = time.time()
-    time_since_last_request = current_time - last_request_time
-    
-    if time_since_last_request < MIN_REQUEST_INTERVAL:
-        sleep_time = MIN_REQUEST_INTERVAL - time_since_last_request
-        time.sleep(sleep_time)
-    
-    last_request_time = time.time()
-
 @main.route('/')
 def home():
     return render_template('index.html')
@@ -68,175 +42,196 @@ def get_latest_articles():
         data = request.get_json()
         category = data.get('category', '')  # Seçilen kategori
 
-        # Cache key oluştur
-        cache_key = f"category_{category}"
-        
-        # Cache'den veriyi kontrol et
-        cached_data = get_cached_data(cache_key)
+        # Cache'den veriyi kontrol et (arka plan yenileyicisi taze tutar)
+        cached_data = DiscoverService.get_cached(category)
         if cached_data:
             return jsonify(cached_data)
 
-        # Rate limiting için bekle
-        wait_for_rate_limit()
-
-        # Kategori bazlı sorgu oluştur
-        category_mapping = {
-            'computer_science': 'TITLE-ABS-KEY("artificial intelligence" OR "machine learning" OR "deep learning" OR "computer science")',
-            'medicine': 'TITLE-ABS-KEY("medicine" OR "health" OR "clinical" OR "medical research")',
-            'engineering': 'TITLE-ABS-KEY("engineering" OR "mechanical" OR "electrical" OR "civil engineering")',
-            'physics': 'TITLE-ABS-KEY("physics" OR "quantum" OR "mechanics" OR "physical science")',
-            'chemistry': 'TITLE-ABS-KEY("chemistry" OR "chemical" OR "molecular" OR "biochemistry")',
-            'biology': 'TITLE-ABS-KEY("biology" OR "genetics" OR "molecular biology" OR "biotechnology")',
-            'mathematics': 'TITLE-ABS-KEY("mathematics" OR "algebra" OR "calculus" OR "statistics")',
-            'social_sciences': 'TITLE-ABS-KEY("social science" OR "sociology" OR "psychology" OR "anthropology")'
-        }
-
-        # Scopus API isteği için parametreler
-        params = {
-            'query': category_mapping.get(category, ''),
-            'apiKey': SCOPUS_API_KEY,
-            'httpAccept': 'application/json',
-            'count': 5,  # Her kategoride 5 makale
-            'sort': 'date'  # En yeni makaleler
-        }
-
-        headers = {
-            'Accept': 'application/json'
-        }
-
-        print("API İsteği Parametreleri:", params)  # Debug log
-        response = requests.get(SCOPUS_BASE_URL, headers=headers, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        print("API Yanıtı:", json.dumps(data, indent=2))  # Debug log
-        
-        articles = []
-
-        if 'search-results' in data and 'entry' in data['search-results']:
-            for entry in data['search-results']['entry']:
-                print("İşlenen Makale:", json.dumps(entry, indent=2))  # Debug log
-                
-                # Scopus URL'ini bul
-                scopus_url = ''
-                for link in entry.get('link', []):
-                    if link.get('@ref') == 'scopus':
-                        scopus_url = link.get('@href', '')
-                        break
-
-                # Yazar bilgisini daha detaylı işle
-                author = entry.get('dc:creator', '')
-                if isinstance(author, list):
-                    author = ', '.join(author)
-                elif not author:
-                    author = 'Yazar belirtilmemiş'
-
-                # Başlık kontrolü
-                title = entry.get('dc:title', '')
-                if not title:
-                    title = 'Başlık yok'
-
-                # Dergi kontrolü
-                journal = entry.get('prism:publicationName', '')
-                if not journal:
-                    journal = 'Dergi belirtilmemiş'
-
-                # Tarih kontrolü
-                pub_date = entry.get('prism:coverDate', '')
-                if not pub_date:
-                    pub_date = 'Tarih belirtilmemiş'
-
-                article = {
-                    'id': entry.get('dc:identifier', '').split(':')[-1],
-                    'title': title,
-                    'author': author,
-                    'publicationDate': pub_date,
-                    'journal': journal,
-                    'scopusUrl': scopus_url
-                }
-                print("İşlenmiş Makale:", json.dumps(article, indent=2))  # Debug log
-                articles.append(article)
-
-        result = {'articles': articles}
-        
-        # Sonuçları cache'e kaydet
-        set_cached_data(cache_key, result)
-        
-        return jsonify(result)
+        return jsonify(DiscoverService.fetch(category))
 
+    except RateLimitExceeded:
+        raise
     except requests.exceptions.RequestException as e:
-        print("API Hatası:", str(e))  # Debug log
+        logger.warning("Scopus API hatası: %s", e)
         if '429' in str(e):
+            retry_after = rate_limiter.retry_after('scopus_search')
             return jsonify({
                 'error': 'API istek limiti aşıldı. Lütfen birkaç dakika bekleyin.',
-                'retry_after': 60
-            }), 429
+                'retry_after': retry_after
+            }), 429, {'Retry-After': str(retry_after)}
         return jsonify({'error': str(e)}), 500
     except Exception as e:
-        print("Genel Hata:", str(e))  # Debug log
+        logger.exception("Son makaleler alınamadı: %s", e)
         return jsonify({'error': str(e)}), 500
 
-@main.route('/article/<article_id>')
+@main.route('/api/latest_articles/all')
+def get_all_latest_articles():
+    categories, errors = DiscoverService.get_all()
+    if not categories:
+        retry_after = max((e.get('retry_after', 0) for e in errors.values()), default=0)
+        if retry_after:
+            return jsonify({'error': 'API istek limiti aşıldı. Lütfen birkaç dakika bekleyin.', 'errors': errors,
+                            'retry_after': retry_after}), 429, {'Retry-After': str(retry_after)}
+        return jsonify({'error': 'Kategoriler alınamadı', 'errors': errors}), 500
+
+    response = {'categories': categories}
+    if errors:
+        response['errors'] = errors
+    return jsonify(response)
+
+@main.route('/api/search_batch', methods=['POST'])
+def search_batch():
+    """Birden çok sorguyu paralel çalıştırır; sonuçları EID/DOI'ye göre birleştirir"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('queries')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'queries boş olmayan bir liste olmalı'}), 400
+    if len(items) > Config.SEARCH_BATCH_MAX_QUERIES:
+        return jsonify({'error': f'Tek seferde en fazla {Config.SEARCH_BATCH_MAX_QUERIES} sorgu çalıştırılabilir'}), 400
+
+    queries, error = SearchBatchService.parse_queries(items)
+    if error:
+        return jsonify({'error': error}), 400
+
+    statuses, articles = SearchBatchService.run(queries)
+    failed = [status for status in statuses if status['status'] == 'error']
+    response = {'queries': statuses, 'articles': articles, 'unique': len(articles)}
+    if len(failed) == len(statuses):
+        retry_after = max((status.get('retry_after', 0) for status in failed), default=0)
+        if retry_after:
+            response.update(error='API istek limiti aşıldı. Lütfen birkaç dakika bekleyin.', retry_after=retry_after)
+            return jsonify(response), 429, {'Retry-After': str(retry_after)}
+        response['error'] = 'Sorguların hiçbiri çalıştırılamadı'
+        return jsonify(response), 502
+    return jsonify(response)
+
+@main.route('/api/local_search')
+def local_search():
+    """İndirilmiş PDF'lerin tam metninde arama (Scopus'a istek yapmaz)"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Arama sorgusu (q) gerekli'}), 400
+    limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    try:
+        result = LocalSearchService.search(query, limit, offset)
+    except InvalidQuery as e:
+        return jsonify({'error': f'Geçersiz arama sorgusu: {e}'}), 400
+    result['index'] = LocalSearchService.stats()
+    return jsonify(result)
+
+@main.route('/article/<path:article_id>')
 def get_article(article_id):
-    # Scopus API'den makale detaylarını al
-    # Bu örnek için basit bir yanıt döndürüyoruz
+    """
+    Makale meta verisi; kimlik Scopus ID, EID, DOI ya da PII olabilir. Yerel
+    meta veri deposunda yoksa Scopus abstract retrieval'dan alınır.
+    """
+    article_id = article_id.strip()
+    metadata, status_code = PDFService.lookup_metadata(PDFService.identifier_type(article_id), article_id)
+    if metadata is None:
+        if status_code == 404:
+            return jsonify({'error': 'Makale bulunamadı'}), 404
+        return jsonify({'error': f"Scopus API'den makale bilgileri alınamadı (Kod: {status_code})"}), 502
+
+    article = dict(zip(Article.__slots__, metadata.to_row()))
+    article['author'] = metadata.authors
+    return jsonify(article)
+
+@main.route('/api/pdf_batch', methods=['POST'])
+def create_pdf_batch():
+    data = request.get_json(silent=True) or {}
+    scopus_ids = data.get('scopus_ids')
+
+    if not isinstance(scopus_ids, list) or not scopus_ids:
+        return jsonify({'error': 'scopus_ids boş olmayan bir liste olmalı'}), 400
+
+    if len(scopus_ids) > Config.PDF_BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Tek seferde en fazla {Config.PDF_BATCH_MAX_ITEMS} makale indirilebilir'}), 400
+
+    job = PDFBatchService.create_job(scopus_ids)
     return jsonify({
-        'title': 'Makale Başlığı',
-        'author': 'Yazar Adı'
-    })
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'status_url': url_for('main.get_pdf_batch', job_id=job['job_id']),
+        'zip_url': url_for('main.download_pdf_batch', job_id=job['job_id'])
+    }), 202
+
+@main.route('/api/pdf_batch/<job_id>')
+def get_pdf_batch(job_id):
+    job = PDFBatchService.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+
+    # Sunucudaki dosya yollarını istemciye gösterme
+    for item in job['items']:
+        item.pop('path', None)
+    return jsonify(job)
+
+@main.route('/api/pdf_batch/<job_id>/zip')
+def download_pdf_batch(job_id):
+    job = PDFBatchService.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+
+    return Response(
+        stream_with_context(PDFBatchService.iter_zip(job)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=articles_{job_id}.zip'}
+    )
 
 @main.route('/summarize', methods=['GET', 'POST'])
 def summarize():
     if request.method == 'GET':
         return render_template('summarize.html')
-        
+
+    data = request.get_json(silent=True) or {}
+    job, error = SummarizeService.prepare(data)
+    if error:
+        return jsonify(error[0]), error[1]
+    return summary_response(job, data)
+
+@main.route('/summarize/<scopus_id>', methods=['POST'])
+def summarize_stored(scopus_id):
+    """Depodaki PDF'i özetler; gövde /summarize ile aynıdır ama `text` içermez"""
+    data = request.get_json(silent=True) or {}
+    job, error = SummarizeService.prepare_stored(scopus_id, data)
+    if error:
+        return jsonify(error[0]), error[1]
+    return summary_response(job, data)
+
+def summary_response(job, data):
+    """Özetleme olaylarını SSE olarak akıtır ya da son özeti JSON döndürür"""
+    if SummarizeService.wants_stream(data, request.headers.get('Accept')):
+        def generate():
+            try:
+                for event, payload in SummarizeService.iter_events(job):
+                    yield SummarizeService.sse(event, payload)
+            except Exception as e:
+                if not isinstance(e, (RateLimitExceeded, SummarizeError)):
+                    logger.exception("Özetleme hatası: %s", e)
+                yield SummarizeService.error_event(e)
+
+        return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
     try:
-        data = request.get_json()
-        text = data.get('text')
-        length = data.get('length', 'medium')
-        format = data.get('format', 'paragraph')
-        prompt = data.get('prompt')
-
-        if not text or not text.strip():
-            return jsonify({'error': 'Metin boş olamaz'}), 400
-
-        if len(text) > 100000:
-            return jsonify({'error': 'Metin çok uzun (max: 100,000 karakter)'}), 400
-
-        # API key kontrolü
-        if not COHERE_API_KEY:
-            return jsonify({'error': 'Cohere API anahtarı bulunamadı'}), 500
-
-        # Cohere API isteği
-        response = requests.post(
-            'https://api.cohere.ai/v1/summarize',
-            json={
-                'text': text,
-                'length': length,
-                'format': format,
-                'model': 'summarize-xlarge',
-                'prompt': prompt,
-                'temperature': 0.7,
-                'additional_command': f'Focus on: {prompt}' if prompt else None
-            },
-            headers={
-                'Authorization': f'Bearer {COHERE_API_KEY}',
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            },
-            timeout=30
-        )
-
-        response.raise_for_status()
-        return jsonify(response.json())
-
-    except requests.Timeout:
-        return jsonify({'error': 'Zaman aşımı: API yanıt vermedi. Lütfen tekrar deneyin.'}), 408
-    except requests.RequestException as e:
-        error_msg = e.response.json().get('message') if e.response else str(e)
-        return jsonify({'error': error_msg}), e.response.status_code if e.response else 500
+        for event, payload in SummarizeService.iter_events(job):
+            if event == 'final':
+                return jsonify({**payload, 'source': job.source} if job.source else payload)
+    except RateLimitExceeded:
+        raise
+    except SummarizeError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
+        logger.exception("Özetleme hatası: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@main.app_errorhandler(RateLimitExceeded)
+def rate_limit_exceeded(error):
+    return jsonify({
+        'error': 'API istek limiti aşıldı. Lütfen birkaç saniye sonra tekrar deneyin.',
+        'retry_after': error.retry_after
+    }), 429, {'Retry-After': str(error.retry_after)}
+
 # Blueprint'i kaydet
 app.register_blueprint(main) 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+QuickLIT sunucu giriş noktası.
+
+    python run.py                      # gunicorn (varsa): çok süreçli, preload + warm-up
+    python run.py --workers 4 --threads 8
+    python run.py --asgi               # upstream'e bağlı route'lar asyncio üzerinde
+    python run.py --dev                # eski Werkzeug debug sunucusu (reloader açık)
+
+gunicorn kurulu değilse (ör. Windows) uygulama tek süreçte, sınırlı boyutlu bir
+thread havuzuyla sunulur. Her iki durumda da SIGTERM/SIGINT süren isteklerin
+bitmesini bekleyen düzenli bir kapanış başlatır.
+"""
+import argparse
+import logging
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer
+from .config import Config
+from .logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='QuickLIT Scopus sunucusu')
+    parser.add_argument('--host', default=Config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=Config.SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=Config.SERVER_WORKERS,
+                        help='Worker süreç sayısı (yalnızca gunicorn ile)')
+    parser.add_argument('--threads', type=int, default=Config.SERVER_THREADS,
+                        help='Worker başına istek thread sayısı')
+    parser.add_argument('--timeout', type=int, default=Config.SERVER_TIMEOUT)
+    parser.add_argument('--graceful-timeout', type=int, default=Config.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument('--preload', dest='preload', action='store_true', default=Config.SERVER_PRELOAD,
+                        help="Uygulamayı fork'tan önce ana süreçte bir kez yükle")
+    parser.add_argument('--no-preload', dest='preload', action='store_false')
+    parser.add_argument('--warmup', dest='warmup', action='store_true', default=Config.SERVER_WARMUP,
+                        help='Başlangıçta önbellekleri doldur')
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false')
+    parser.add_argument('--asgi', action='store_true', help='ASGI (asyncio) modunda çalıştır')
+    parser.add_argument('--dev', action='store_true', help='Werkzeug debug sunucusu (geliştirme için)')
+    return parser
+
+
+def load_app(asgi=False, warmup=True, threads=None):
+    """Uygulamayı oluşturur ve isteğe bağlı olarak ısıtır"""
+    from . import create_app
+    flask_app = create_app()
+    if warmup:
+        warm_up(flask_app)
+    if asgi:
+        from .asgi import create_asgi_app
+        return create_asgi_app(flask_app, on_shutdown=shutdown, threads=threads)
+    return flask_app
+
+
+def warm_up(app):
+    """
+    Şablonları derler, önbellek ve PDF deposunu açar, /discover kategorilerini
+    önbelleğe alır. Preload ile ana süreçte çalıştığında sonuçlar fork ile
+    tüm worker'lara kopyalanır. Hatalar başlatmayı durdurmaz.
+    """
+    from .services.cache_service import get_cache
+    from .services.discover_service import DiscoverService
+    from .services.pdf_store import get_pdf_store
+
+    for template in ('index.html', 'discover.html', 'profile.html', '404.html', '500.html'):
+        try:
+            app.jinja_env.get_template(template)
+        except Exception as e:
+            logger.warning("Warm-up: şablon yüklenemedi (%s): %s", template, e)
+
+    get_cache()
+    get_pdf_store()
+
+    try:
+        DiscoverService.refresh_due()
+    except Exception as e:
+        logger.warning("Warm-up: kategoriler alınamadı: %s", e)
+    logger.info("Warm-up tamamlandı")
+
+
+def start_background():
+    """
+    Kategori yenileyicisini ve yerel arama dizinleyicisini bu süreçte başlatır.
+    Her ikisi de süreç başına bir kez çalışır; tekrar çağrılması zararsızdır.
+    """
+    from .services.discover_service import DiscoverService
+    from .services.local_search import LocalSearchService
+    DiscoverService.start_refresher()
+    LocalSearchService.start()
+
+
+def after_fork(workers=1):
+    """
+    Worker süreci fork edildikten sonra ana süreçten kalan bağlantıları bırakır
+    ve upstream istek bütçesinden bu worker'ın payını ayırır.
+    """
+    from .services.http_client import HTTPClient
+    from .services.rate_limiter import rate_limiter
+    HTTPClient.reset()
+    rate_limiter.divide(workers)
+    start_background()
+
+
+def shutdown():
+    """Arka plan işlerini düzenli şekilde kapatır"""
+    from .services.http_client import HTTPClient
+    from .services.pdf_batch import PDFBatchService
+    from .services.search_batch import SearchBatchService
+    from .services.pdf_service import PDFService
+    from .services.discover_service import DiscoverService
+    from .services.local_search import LocalSearchService
+    from .services.scopus_service import ScopusService
+    from .services.summarize_service import SummarizeService
+
+    DiscoverService.shutdown()
+    LocalSearchService.shutdown()
+    SummarizeService.shutdown()
+    ScopusService.shutdown()
+    PDFService.shutdown()
+    PDFBatchService.shutdown()
+    SearchBatchService.shutdown()
+    HTTPClient.reset()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging()
+
+    if args.dev:
+        from . import create_app
+        create_app().run(debug=True, host=args.host, port=args.port)
+        return
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        if args.workers > 1:
+            logger.warning("gunicorn bulunamadı; uygulama tek süreçte çalıştırılıyor")
+        run_single_process(args)
+    else:
+        run_gunicorn(args)
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class QuickLitApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            self.application = None
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # preload açıkken ana süreçte bir kez, kapalıyken her worker'da çağrılır
+            if self.application is None:
+                self.application = load_app(asgi=args.asgi, warmup=args.warmup, threads=args.threads)
+            return self.application
+
+    QuickLitApplication({
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'uvicorn.workers.UvicornWorker' if args.asgi else 'gthread',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'preload_app': args.preload,
+        'post_fork': lambda server, worker: after_fork(server.cfg.workers),
+        'worker_exit': lambda server, worker: shutdown()
+    }).run()
+
+
+def run_single_process(args):
+    app = load_app(asgi=args.asgi, warmup=args.warmup, threads=args.threads)
+    start_background()
+
+    if args.asgi:
+        # Kapanış ASGI lifespan olayında shutdown() ile yapılır
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port, lifespan='on',
+                    timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    server = _PooledWSGIServer(args.host, args.port, app, args.threads)
+
+    def stop(signum, frame):
+        # serve_forever bu thread'de çalıştığı için kapanış ayrı thread'den istenir
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("QuickLIT http://%s:%s adresinde çalışıyor (%d thread)", args.host, args.port, args.threads)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        shutdown()
+        logger.info("Uygulama kapatıldı.")
+
+
+class _PooledWSGIServer(BaseWSGIServer):
+    """İstekleri sabit boyutlu bir thread havuzunda işleyen Werkzeug sunucusu"""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='http')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        # Kabul edilmiş isteklerin tamamlanmasını bekle
+        self._pool.shutdown(wait=True)
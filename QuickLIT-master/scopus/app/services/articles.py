@@ -0,0 +1,176 @@
+"""
+Scopus yanıtlarının ortak normalizasyon katmanı.
+
+Arama ve abstract retrieval istekleri `field=` ile yalnızca uygulamanın
+kullandığı alanları ister; yanıt tek geçişte `Article` kayıtlarına çevrilir.
+Ana sayfa, /api/latest_articles ve PDFService aynı kaydı kullanır.
+
+Scopus bağlantısı `link` listesi istenmeden EID'den üretilir (sunucu alan
+seçimini yok sayıp `link` döndürürse o kullanılır). Kayıtlar önbellekte JSON
+uyumlu satırlar (`to_row()`) olarak tutulur. `orjson` kuruluysa yanıtlar onunla
+çözülür; kurulu değilse standart `json` kullanılır.
+"""
+import json
+from ..config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Search API: index.html, /discover ve toplu işlemlerin kullandığı alanlar
+SEARCH_FIELDS = (
+    'dc:identifier', 'eid', 'dc:title', 'dc:creator', 'prism:publicationName', 'prism:coverDate',
+    'prism:volume', 'prism:issueIdentifier', 'prism:pageRange', 'prism:doi', 'pii'
+)
+# Abstract Retrieval API: PDF indirme için gereken alanlar
+ABSTRACT_FIELDS = ('dc:identifier', 'eid', 'dc:title', 'prism:doi', 'pii', 'dc:publisher', 'link')
+
+SCOPUS_RECORD_URL = 'https://www.scopus.com/inward/record.uri?eid='
+
+
+def loads(data):
+    """JSON gövdesini (bytes/str) çözer"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """JSON'u bytes olarak üretir"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def field_param(fields):
+    """`field=` parametresi; alan seçimi kapalıysa None (tam görünüm)"""
+    return ','.join(fields) if Config.SCOPUS_FIELD_SELECTION else None
+
+
+class Article:
+    """Scopus kaydının uygulamanın kullandığı alanları"""
+
+    __slots__ = ('scopus_id', 'eid', 'title', 'authors', 'journal', 'cover_date', 'volume', 'issue', 'pages',
+                 'doi', 'pii', 'publisher', 'scopus_url')
+
+    def __init__(self, scopus_id='', eid='', title='', authors='', journal='', cover_date='', volume='', issue='',
+                 pages='', doi=None, pii=None, publisher=None, scopus_url=None):
+        self.scopus_id = scopus_id
+        self.eid = eid
+        self.title = title
+        self.authors = authors
+        self.journal = journal
+        self.cover_date = cover_date
+        self.volume = volume
+        self.issue = issue
+        self.pages = pages
+        self.doi = doi
+        self.pii = pii
+        self.publisher = publisher
+        self.scopus_url = scopus_url
+
+    @classmethod
+    def from_entry(cls, entry):
+        """Search API `entry` öğesinden kayıt oluşturur"""
+        get = entry.get
+        scopus_id = get('dc:identifier', '').rpartition(':')[2]
+        eid = get('eid') or (f'2-s2.0-{scopus_id}' if scopus_id else '')
+        authors = get('dc:creator') or ''
+        if isinstance(authors, list):
+            authors = ', '.join(authors)
+        links = get('link')
+        return cls(
+            scopus_id, eid, get('dc:title') or '', authors, get('prism:publicationName') or '',
+            get('prism:coverDate') or '', get('prism:volume') or '', get('prism:issueIdentifier') or '',
+            get('prism:pageRange') or '', get('prism:doi'), get('pii'), None,
+            (links and _link(links, '@ref')) or _record_url(eid)
+        )
+
+    @classmethod
+    def from_abstract(cls, response_json):
+        """Abstract Retrieval yanıtından kayıt oluşturur"""
+        abstract_data = response_json.get('abstracts-retrieval-response') or {}
+        coredata = abstract_data.get('coredata') or {}
+        get = coredata.get
+        scopus_id = get('dc:identifier', '').rpartition(':')[2]
+        eid = get('eid') or (f'2-s2.0-{scopus_id}' if scopus_id else '')
+        # Bağlantılar coredata altında ya da yanıtın kökünde gelebilir
+        scopus_url = _link(get('link'), '@rel') or _link(abstract_data.get('link'), '@rel') or _record_url(eid)
+        return cls(
+            scopus_id, eid, get('dc:title') or 'Unknown Title', '', get('prism:publicationName') or '',
+            get('prism:coverDate') or '', doi=get('prism:doi'), pii=get('pii'), publisher=get('dc:publisher'),
+            scopus_url=scopus_url
+        )
+
+    def to_row(self):
+        """Önbellek için JSON uyumlu satır"""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row):
+        """to_row() çıktısından kayıt; biçim uyuşmazsa (eski önbellek girdisi) None"""
+        if not isinstance(row, list) or len(row) != len(cls.__slots__):
+            return None
+        return cls(*row)
+
+    def to_discover(self):
+        """/discover sayfasının beklediği makale sözlüğü"""
+        return {
+            'id': self.scopus_id,
+            'title': self.title or 'Başlık yok',
+            'author': self.authors or 'Yazar belirtilmemiş',
+            'publicationDate': self.cover_date or 'Tarih belirtilmemiş',
+            'journal': self.journal or 'Dergi belirtilmemiş',
+            'scopusUrl': self.scopus_url or ''
+        }
+
+    def __repr__(self):
+        return f'Article({self.scopus_id!r}, {self.title!r})'
+
+
+class SearchPage:
+    """Bir arama sonuç sayfası: toplam sonuç sayısı ve sayfadaki kayıtlar"""
+
+    __slots__ = ('total', 'start', 'articles')
+
+    def __init__(self, total, start, articles):
+        self.total = total
+        self.start = start
+        self.articles = articles
+
+    @classmethod
+    def from_response(cls, data):
+        search_results = (data or {}).get('search-results') or {}
+        try:
+            total = int(search_results.get('opensearch:totalResults') or 0)
+            start = int(search_results.get('opensearch:startIndex') or 0)
+        except (TypeError, ValueError):
+            total, start = 0, 0
+        entries = search_results.get('entry') or []
+        # Sonuç yoksa Scopus tek bir {"error": "Result set was empty"} öğesi döndürür
+        articles = [Article.from_entry(entry) for entry in entries if 'error' not in entry]
+        return cls(total, start, articles)
+
+    def to_cache(self):
+        return {'total': self.total, 'start': self.start, 'rows': [article.to_row() for article in self.articles]}
+
+    @classmethod
+    def from_cache(cls, data):
+        """to_cache() çıktısından sayfa; eski biçimdeki önbellek girdileri için None"""
+        if not isinstance(data, dict) or 'rows' not in data:
+            return None
+        return cls(data['total'], data['start'], [Article(*row) for row in data['rows']])
+
+
+def _link(links, key):
+    if not isinstance(links, list):
+        return None
+    for link in links:
+        if isinstance(link, dict) and link.get(key) == 'scopus':
+            return link.get('@href')
+    return None
+
+
+def _record_url(eid):
+    return f'{SCOPUS_RECORD_URL}{eid}&origin=inward' if eid else None
@@ -0,0 +1,75 @@
+from contextlib import asynccontextmanager
+import httpx
+from ..config import Config
+from .. import metrics
+from .rate_limiter import rate_limiter, PRIORITY_INTERACTIVE
+
+
+class AsyncHTTPClient:
+    """
+    ASGI modunda kullanılan, HTTPClient'ın asyncio karşılığı.
+
+    Tek bir httpx.AsyncClient bağlantı havuzunu paylaşır; yüzlerce upstream
+    isteği aynı anda tek bir event loop üzerinde bekleyebilir. İstek bütçesi
+    senkron istemciyle aynı RateLimiter üzerinden harcanır.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=Config.ASYNC_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_POOL_MAXSIZE
+                ),
+                timeout=httpx.Timeout(Config.HTTP_READ_TIMEOUT, connect=Config.HTTP_CONNECT_TIMEOUT)
+            )
+        return self._client
+
+    async def request(self, method, url, upstream=None, priority=PRIORITY_INTERACTIVE, max_wait=None, **kwargs):
+        if upstream:
+            await rate_limiter.acquire_async(upstream, priority=priority, max_wait=max_wait)
+        with metrics.track_upstream(upstream or 'untagged', url) as call:
+            response = await self._get_client().request(method, url, **_drop_empty_headers(kwargs))
+            call.status = response.status_code
+        if upstream:
+            rate_limiter.observe(upstream, response)
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method, url, upstream=None, priority=PRIORITY_INTERACTIVE, max_wait=None, **kwargs):
+        """Yanıt gövdesini parça parça okumak için istek açar"""
+        if upstream:
+            await rate_limiter.acquire_async(upstream, priority=priority, max_wait=max_wait)
+        client = self._get_client()
+        with metrics.track_upstream(upstream or 'untagged', url) as call:
+            request = client.build_request(method, url, **_drop_empty_headers(kwargs))
+            response = await client.send(request, stream=True)
+            call.status = response.status_code
+        try:
+            if upstream:
+                rate_limiter.observe(upstream, response)
+            yield response
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _drop_empty_headers(kwargs):
+    """requests gibi değeri None olan başlıkları göndermez (httpx bunları reddeder)"""
+    headers = kwargs.get('headers')
+    if headers:
+        kwargs['headers'] = {name: value for name, value in headers.items() if value is not None}
+    return kwargs
@@ -0,0 +1,101 @@
+"""
+Firebase kimlik doğrulama önbelleği.
+
+- Doğrulanmış ID token'ları `exp` anına kadar önbellekte tutulur (anahtar
+  token'ın SHA-256 özeti); aynı token ikinci kez Firebase'e gitmez.
+- Kullanıcı kayıtları AUTH_USER_CACHE_TTL boyunca tutulur ve çıkışta
+  (`invalidate_user`) silinir. Bellek içi önbellekte silme yalnızca isteği
+  alan worker'da geçerlidir; diğerlerinde kayıt TTL sonunda düşer.
+- Google'ın imza anahtarlarını firebase_admin kendisi, yanıttaki
+  Cache-Control süresince süreç içinde önbelleğe alır (CertificateFetchRequest);
+  token önbelleği sayesinde bu anahtarlara da token başına bir kez bakılır.
+
+Aynı anda gelen özdeş istekler (ör. check_login yoklamaları) tek bir Firebase
+çağrısını paylaşır.
+"""
+import hashlib
+import logging
+import time
+from firebase_admin import auth
+from ..config import Config
+from .. import metrics
+from .cache_service import get_cache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AuthUser:
+    """Route'ların kullandığı Firebase kullanıcı alanları"""
+
+    __slots__ = ('uid', 'email', 'display_name', 'disabled')
+
+    def __init__(self, uid, email=None, display_name=None, disabled=False):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+        self.disabled = disabled
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record.uid, record.email, record.display_name, bool(getattr(record, 'disabled', False)))
+
+    def to_row(self):
+        return [self.uid, self.email, self.display_name, self.disabled]
+
+
+class AuthService:
+    _token_flight = SingleFlight('firebase_verify_token')
+    _user_flight = SingleFlight('firebase_get_user')
+
+    @staticmethod
+    def verify_id_token(id_token):
+        """auth.verify_id_token'ın önbellekli hali; çözülmüş claim'leri döndürür"""
+        cache_key = AuthService._token_cache_key(id_token)
+        decoded = get_cache().get(cache_key)
+        if decoded is not None and decoded.get('exp', 0) > time.time():
+            return decoded
+        return AuthService._token_flight.do(cache_key, AuthService._verify, cache_key, id_token)
+
+    @staticmethod
+    def _verify(cache_key, id_token):
+        with metrics.track_call('firebase_auth'):
+            decoded = auth.verify_id_token(id_token)
+
+        ttl = int(decoded.get('exp', 0) - time.time()) - Config.AUTH_TOKEN_EXPIRY_MARGIN
+        if ttl > 0:
+            get_cache().set(cache_key, decoded, ttl=ttl)
+        return decoded
+
+    @staticmethod
+    def get_user(uid):
+        """auth.get_user'ın önbellekli hali; AuthUser döndürür"""
+        row = get_cache().get(AuthService._user_cache_key(uid))
+        if row is not None:
+            return AuthUser(*row)
+        return AuthService._user_flight.do(uid, AuthService._fetch_user, uid)
+
+    @staticmethod
+    def _fetch_user(uid):
+        with metrics.track_call('firebase_auth'):
+            record = auth.get_user(uid)
+        return AuthService.remember_user(record)
+
+    @staticmethod
+    def remember_user(record):
+        """Başka bir çağrıdan (ör. get_user_by_email) gelen kullanıcı kaydını önbelleğe yazar"""
+        user = AuthUser.from_record(record)
+        get_cache().set(AuthService._user_cache_key(user.uid), user.to_row(), ttl=Config.AUTH_USER_CACHE_TTL)
+        return user
+
+    @staticmethod
+    def invalidate_user(uid):
+        get_cache().delete(AuthService._user_cache_key(uid))
+
+    @staticmethod
+    def _token_cache_key(id_token):
+        return f"auth_token:{hashlib.sha256(id_token.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _user_cache_key(uid):
+        return f"auth_user:{uid}"
@@ -0,0 +1,314 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from ..config import Config
+
+
+def _namespace(key):
+    """'search:10:0:...' -> 'search', 'category_medicine' -> 'category'"""
+    key = str(key)
+    separator = ':' if ':' in key else '_'
+    return key.split(separator, 1)[0]
+
+
+def _hit_ratio(counters):
+    lookups = counters['hits'] + counters['misses']
+    return round(counters['hits'] / lookups, 4) if lookups else 0.0
+
+
+class CacheBackend:
+    """
+    Önbellek arka uçları için ortak arayüz.
+
+    Değerler JSON'a dönüştürülebilir olmalıdır; boyut sınırları değerin JSON
+    gösteriminin bayt uzunluğu üzerinden hesaplanır.
+    """
+
+    def __init__(self, max_entries, max_bytes, default_ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._stats_lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+        self._namespaces = {}  # Anahtar ön ekine göre isabet/ıska sayaçları
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _count_lookup(self, key, hit):
+        name = 'hits' if hit else 'misses'
+        namespace = _namespace(key)
+        with self._stats_lock:
+            self._counters[name] += 1
+            counters = self._namespaces.setdefault(namespace, {'hits': 0, 'misses': 0})
+            counters[name] += 1
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self._counters)
+            namespaces = {name: dict(values) for name, values in self._namespaces.items()}
+        counters['hit_ratio'] = _hit_ratio(counters)
+        for values in namespaces.values():
+            values['hit_ratio'] = _hit_ratio(values)
+        counters['namespaces'] = namespaces
+        return counters
+
+
+class MemoryCache(CacheBackend):
+    """
+    Süreç içi, thread-safe LRU+TTL önbellek.
+
+    Süresi dolan kayıtlar okunurken (lazy) ve her `sweep_interval` saniyede bir
+    yapılan taramayla (periyodik) silinir. Kayıt sayısı veya toplam boyut sınırı
+    aşıldığında en uzun süredir kullanılmayan kayıtlar çıkarılır.
+    """
+
+    def __init__(self, max_entries, max_bytes, default_ttl, sweep_interval=60):
+        super().__init__(max_entries, max_bytes, default_ttl)
+        self.sweep_interval = sweep_interval
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            item = self._data.get(key)
+            if item is None:
+                self._count_lookup(key, False)
+                return None
+            expires_at, size, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self._bytes -= size
+                self._count('expirations')
+                self._count_lookup(key, False)
+                return None
+            self._data.move_to_end(key)
+        self._count_lookup(key, True)
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        size = len(json.dumps(value, default=str).encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (now + ttl, size, value)
+            self._bytes += size
+            self._maybe_sweep(now)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._count('evictions')
+        self._count('sets')
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _maybe_sweep(self, now):
+        # Çağıran self._lock'u tutuyor olmalı
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        expired = [key for key, (expires_at, _, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            self._bytes -= self._data.pop(key)[1]
+        if expired:
+            self._count('expirations', len(expired))
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats.update({
+                'backend': 'memory',
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            })
+        return stats
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Tek bir SQLite dosyası üzerinden birden fazla worker sürecinin paylaştığı
+    LRU+TTL önbellek.
+
+    WAL modu sayesinde okuyucular yazıcıları bloklamaz. Her thread kendi
+    bağlantısını kullanır. İsabet/ıska sayaçları süreç başınadır, kayıt sayısı
+    ve toplam boyut ise paylaşılan dosyadan okunur.
+    """
+
+    def __init__(self, path, max_entries, max_bytes, default_ttl, sweep_interval=60):
+        super().__init__(max_entries, max_bytes, default_ttl)
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._last_sweep = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache(expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        self._maybe_sweep(conn, now)
+        row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count_lookup(key, False)
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            self._count('expirations')
+            self._count_lookup(key, False)
+            return None
+        conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+        self._count_lookup(key, True)
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        payload = json.dumps(value, default=str)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, size, now + ttl, now)
+        )
+        self._count('sets')
+        self._maybe_sweep(conn, now)
+        self._evict(conn)
+        return True
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+    def _evict(self, conn):
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY last_access ASC"):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            entries -= 1
+            total -= size
+            evicted += 1
+        conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self._count('evictions', evicted)
+
+    def _maybe_sweep(self, conn, now):
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        cursor = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        if cursor.rowcount > 0:
+            self._count('expirations', cursor.rowcount)
+
+    def stats(self):
+        stats = super().stats()
+        entries, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        stats.update({
+            'backend': 'sqlite',
+            'entries': entries,
+            'bytes': total,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes
+        })
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def create_cache(backend=None, path=None, max_entries=None, max_bytes=None, default_ttl=None):
+    """Config değerleriyle (veya verilen değerlerle) yeni bir önbellek oluşturur"""
+    backend = backend or Config.CACHE_BACKEND
+    max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+    max_bytes = max_bytes or Config.CACHE_MAX_BYTES
+    default_ttl = default_ttl or Config.CACHE_DEFAULT_TTL
+
+    if backend == 'sqlite':
+        return SQLiteCache(
+            path or Config.CACHE_SQLITE_PATH,
+            max_entries, max_bytes, default_ttl,
+            sweep_interval=Config.CACHE_SWEEP_INTERVAL
+        )
+    if backend == 'memory':
+        return MemoryCache(max_entries, max_bytes, default_ttl, sweep_interval=Config.CACHE_SWEEP_INTERVAL)
+    raise ValueError(f"Bilinmeyen önbellek arka ucu: {backend}")
+
+
+def get_cache():
+    """Uygulama genelinde paylaşılan önbelleği döndürür"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
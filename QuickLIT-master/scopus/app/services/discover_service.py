@@ -0,0 +1,296 @@
+"""
+/discover kategori akışları.
+
+Kategori sorguları (sort=date) tüm kullanıcılar için aynıdır. Arka plan
+yenileyicisi her kategoriyi önbellek süresi dolmadan, arka plan önceliğiyle
+yeniden çeker; etkileşimli istekler istek bütçesinde önce gelir ve kullanıcı
+soğuk çekim gecikmesi yaşamaz. Yenileme başarısız olursa son sonuç
+DISCOVER_STALE_TTL boyunca sunulmaya devam eder.
+
+Önbellek SQLite ise (tüm worker'lar ortak) yenilemeyi dosya kilidini alan tek
+bir süreç yapar; bellek içi önbellekte her worker kendi kopyasını yeniler.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ..config import Config
+from ..logging_setup import LazyJSON
+from .http_client import HTTPClient
+from .cache_service import get_cache
+from .executors import shutdown_executor
+from .rate_limiter import RateLimitExceeded, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .single_flight import SingleFlight
+from .scopus_service import ScopusService
+from .articles import SearchPage, SEARCH_FIELDS, field_param, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: her süreç kendi yenilemesini yapar
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Kategori bazlı sorgular
+CATEGORY_MAPPING = {
+    'computer_science': 'TITLE-ABS-KEY("artificial intelligence" OR "machine learning" OR "deep learning" OR "computer science")',
+    'medicine': 'TITLE-ABS-KEY("medicine" OR "health" OR "clinical" OR "medical research")',
+    'engineering': 'TITLE-ABS-KEY("engineering" OR "mechanical" OR "electrical" OR "civil engineering")',
+    'physics': 'TITLE-ABS-KEY("physics" OR "quantum" OR "mechanics" OR "physical science")',
+    'chemistry': 'TITLE-ABS-KEY("chemistry" OR "chemical" OR "molecular" OR "biochemistry")',
+    'biology': 'TITLE-ABS-KEY("biology" OR "genetics" OR "molecular biology" OR "biotechnology")',
+    'mathematics': 'TITLE-ABS-KEY("mathematics" OR "algebra" OR "calculus" OR "statistics")',
+    'social_sciences': 'TITLE-ABS-KEY("social science" OR "sociology" OR "psychology" OR "anthropology")'
+}
+
+
+class DiscoverService:
+    # Soğuk bir kategoriyi aynı anda açan kullanıcılar tek bir Scopus çağrısını paylaşır
+    _flight = SingleFlight('latest_articles')
+    _lock = threading.Lock()
+    _executor = None
+    _refresher = {'pid': None, 'thread': None, 'stop': None, 'lock_file': None}
+
+    @staticmethod
+    def category_count(category):
+        return Config.DISCOVER_CATEGORY_COUNTS.get(category, Config.DISCOVER_CATEGORY_COUNT)
+
+    @staticmethod
+    def build_request(category):
+        """Kategori için Scopus isteğinin (url, headers, params) üçlüsünü döndürür"""
+        params = {
+            'query': CATEGORY_MAPPING.get(category, ''),
+            'apiKey': Config.API_KEY,
+            'httpAccept': 'application/json',
+            'count': DiscoverService.category_count(category),
+            'sort': 'date'  # En yeni makaleler
+        }
+        fields = field_param(SEARCH_FIELDS)
+        if fields:
+            params['field'] = fields
+
+        headers = {
+            'Accept': 'application/json'
+        }
+        return Config.SCOPUS_BASE_URL, headers, params
+
+    @staticmethod
+    def parse(data):
+        """
+        Scopus arama yanıtını /discover sayfasının beklediği makale listesine
+        çevirir; kayıtlar meta veri deposuna da yazılır.
+        """
+        page = SearchPage.from_response(data)
+        ScopusService.remember_articles(page.articles)
+        return {'articles': [article.to_discover() for article in page.articles]}
+
+    @staticmethod
+    def _cache_key(category):
+        return f"category:{category}"
+
+    @staticmethod
+    def _get_entry(category):
+        return get_cache().get(DiscoverService._cache_key(category))
+
+    @staticmethod
+    def get_cached(category):
+        """
+        Önbellekteki kategori sonucunu döndürür (yoksa None). Sonuç bayatsa yine
+        döner ve arka planda yenilemesi başlatılır.
+        """
+        entry = DiscoverService._get_entry(category)
+        if entry is None:
+            return None
+        # Yenileyici bu süreçte çalışıyorsa bayat kategoriyi o yeniler
+        if (time.time() - entry['fetched_at'] >= Config.DISCOVER_CACHE_TTL
+                and DiscoverService._refresher['pid'] != os.getpid()):
+            DiscoverService._submit_refresh(category)
+        return entry['data']
+
+    @staticmethod
+    def store(category, result):
+        get_cache().set(
+            DiscoverService._cache_key(category),
+            {'fetched_at': time.time(), 'data': result},
+            ttl=Config.DISCOVER_CACHE_TTL + Config.DISCOVER_STALE_TTL
+        )
+
+    @staticmethod
+    def fetch(category, priority=PRIORITY_INTERACTIVE, force=False):
+        """
+        Kategorinin son makalelerini Scopus'tan çeker ve önbelleğe yazar.
+        `force` olmadan, beklerken başka bir çağrının yazdığı taze sonuç döner.
+        """
+        return DiscoverService._flight.do(DiscoverService._cache_key(category), DiscoverService._fetch_once,
+                                          category, priority, force)
+
+    @staticmethod
+    def _fetch_once(category, priority, force):
+        if not force:
+            # Önceki lider, bu istek önbelleğe bakıp buraya gelene kadar sonucu yazmış olabilir
+            entry = DiscoverService._get_entry(category)
+            if entry is not None and time.time() - entry['fetched_at'] < Config.DISCOVER_CACHE_TTL:
+                return entry['data']
+
+        url, headers, params = DiscoverService.build_request(category)
+
+        logger.debug("API isteği: kategori=%s, sorgu=%s", category, params['query'])
+        response = HTTPClient.get(url, headers=headers, params=params, upstream='scopus_search', priority=priority)
+        response.raise_for_status()
+
+        data = loads(response.content)
+        logger.debug("API yanıtı: %s", LazyJSON(data))
+
+        result = DiscoverService.parse(data)
+        DiscoverService.store(category, result)
+        return result
+
+    @staticmethod
+    def get_all():
+        """
+        Tüm kategorileri döndürür: ({kategori: sonuç}, {kategori: hata}).
+        Önbellekte olmayanlar paralel olarak çekilir.
+        """
+        results, errors = {}, {}
+        missing = []
+        for category in CATEGORY_MAPPING:
+            cached = DiscoverService.get_cached(category)
+            if cached is not None:
+                results[category] = cached
+            else:
+                missing.append(category)
+
+        if missing:
+            futures = {category: DiscoverService._get_executor().submit(DiscoverService.fetch, category)
+                       for category in missing}
+            for category, future in futures.items():
+                try:
+                    results[category] = future.result()
+                except RateLimitExceeded as e:
+                    errors[category] = {'error': 'API istek limiti aşıldı', 'retry_after': e.retry_after}
+                except Exception as e:
+                    logger.warning("Kategori alınamadı (%s): %s", category, e)
+                    errors[category] = {'error': str(e)}
+
+        # Yanıt kategori sırasını korusun
+        return {category: results[category] for category in CATEGORY_MAPPING if category in results}, errors
+
+    @staticmethod
+    def refresh_due(priority=PRIORITY_BACKGROUND):
+        """
+        Yaşı DISCOVER_REFRESH_AFTER'ı geçen (ya da hiç çekilmemiş) kategorileri en
+        eskiden başlayarak yeniler. Bir sonraki yenilemeye kalan saniyeyi döndürür.
+        """
+        now = time.time()
+        ages = {}
+        for category in CATEGORY_MAPPING:
+            entry = DiscoverService._get_entry(category)
+            ages[category] = now - entry['fetched_at'] if entry is not None else float('inf')
+
+        next_due = Config.DISCOVER_REFRESH_AFTER
+        for category in sorted(ages, key=ages.get, reverse=True):
+            remaining = Config.DISCOVER_REFRESH_AFTER - ages[category]
+            if remaining > 0:
+                next_due = min(next_due, remaining)
+                continue
+            try:
+                DiscoverService.fetch(category, priority=priority, force=True)
+            except RateLimitExceeded as e:
+                # Bütçe dolu: kalan kategoriler bütçe açılınca denenir
+                logger.info("Kategori yenileme ertelendi, istek limiti (%s sn)", e.retry_after)
+                return e.retry_after
+            except Exception as e:
+                logger.warning("Kategori yenilenemedi (%s): %s", category, e)
+                next_due = min(next_due, Config.DISCOVER_REFRESH_RETRY)
+        return next_due
+
+    @staticmethod
+    def _submit_refresh(category):
+        def run():
+            try:
+                DiscoverService.fetch(category, priority=PRIORITY_BACKGROUND, force=True)
+            except Exception as e:
+                logger.warning("Kategori yenilenemedi (%s): %s", category, e)
+
+        # Aynı kategori için süren bir yenileme varsa single-flight ona katar
+        DiscoverService._get_executor().submit(run)
+
+    @staticmethod
+    def _get_executor():
+        if DiscoverService._executor is None:
+            with DiscoverService._lock:
+                if DiscoverService._executor is None:
+                    DiscoverService._executor = ThreadPoolExecutor(
+                        max_workers=Config.DISCOVER_FETCH_WORKERS,
+                        thread_name_prefix='discover-fetch'
+                    )
+        return DiscoverService._executor
+
+    @staticmethod
+    def start_refresher():
+        """Bu süreçte arka plan yenileyicisini başlatır (süreç başına bir kez)"""
+        if not Config.DISCOVER_REFRESH_ENABLED:
+            return
+        refresher = DiscoverService._refresher
+        with DiscoverService._lock:
+            # Fork ile gelen thread çocuk süreçte çalışmaz; pid değiştiyse yeniden başlatılır
+            if refresher['pid'] == os.getpid():
+                return
+            refresher['pid'] = os.getpid()
+            refresher['stop'] = threading.Event()
+            refresher['lock_file'] = None
+            refresher['thread'] = threading.Thread(target=DiscoverService._refresh_loop, args=(refresher['stop'],),
+                                                   name='discover-refresher', daemon=True)
+            refresher['thread'].start()
+
+    @staticmethod
+    def _refresh_loop(stop):
+        logger.info("Kategori yenileyicisi başladı (pid %s)", os.getpid())
+        while not stop.is_set():
+            wait = Config.DISCOVER_REFRESH_RETRY
+            if DiscoverService._is_refresh_leader():
+                try:
+                    wait = DiscoverService.refresh_due()
+                except Exception as e:
+                    logger.exception("Kategori yenileyicisi hatası: %s", e)
+            # Lider olmayan süreçler liderin kilidi bırakıp bırakmadığını düzenli kontrol eder
+            stop.wait(min(max(wait, 1), Config.DISCOVER_REFRESH_RETRY))
+
+    @staticmethod
+    def _is_refresh_leader():
+        """SQLite önbellekte yenilemeyi yalnızca kilidi tutan süreç yapar"""
+        if Config.CACHE_BACKEND != 'sqlite' or fcntl is None:
+            return True
+        refresher = DiscoverService._refresher
+        if refresher['lock_file'] is not None:
+            return True
+
+        try:
+            lock_file = open(Config.CACHE_SQLITE_PATH + '.discover.lock', 'a')
+        except OSError as e:
+            logger.warning("Yenileme kilidi açılamadı: %s", e)
+            return False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Dosya süreç yaşadıkça açık kalır; süreç ölünce kilit bırakılır
+        refresher['lock_file'] = lock_file
+        return True
+
+    @staticmethod
+    def shutdown():
+        """Yenileyiciyi durdurur ve bekleyen kategori çekimlerini iptal eder"""
+        refresher = DiscoverService._refresher
+        with DiscoverService._lock:
+            if refresher['stop'] is not None:
+                refresher['stop'].set()
+            if refresher['lock_file'] is not None:
+                refresher['lock_file'].close()
+                refresher['lock_file'] = None
+            refresher['pid'] = None
+            executor, DiscoverService._executor = DiscoverService._executor, None
+        if executor is not None:
+            shutdown_executor(executor)
@@ -0,0 +1,39 @@
+"""
+Executor yardımcıları.
+
+`Executor.shutdown(cancel_futures=True)` Python 3.9'da geldi; desteklenen en
+eski sürüm (3.8) için kuyrukta bekleyen işler aynı şekilde elle iptal edilir.
+"""
+import queue
+import sys
+
+_HAS_CANCEL_FUTURES = sys.version_info >= (3, 9)
+
+
+def shutdown_executor(executor, wait=False, cancel_futures=True):
+    """
+    Executor'ı kapatır. `cancel_futures` ile henüz başlamamış işler iptal
+    edilir; çalışmakta olanlar tamamlanır.
+    """
+    if _HAS_CANCEL_FUTURES:
+        executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        return
+    if cancel_futures:
+        _cancel_pending(executor)
+    executor.shutdown(wait=wait)
+
+
+def _cancel_pending(executor):
+    # ThreadPoolExecutor: kuyruktaki iş öğeleri (3.9'daki cancel_futures ile aynı yol)
+    work_queue = getattr(executor, '_work_queue', None)
+    if work_queue is not None:
+        while True:
+            try:
+                item = work_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item.future.cancel()
+    # ProcessPoolExecutor: alt sürece gönderilmemiş işler iptal edilebilir, gönderilmişler çalışır
+    for item in list(getattr(executor, '_pending_work_items', {}).values()):
+        item.future.cancel()
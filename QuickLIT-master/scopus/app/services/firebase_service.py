@@ -0,0 +1,51 @@
+import logging
+import os
+import threading
+import firebase_admin
+from firebase_admin import credentials, firestore
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {'pid': None, 'db': None}
+
+
+def get_firestore():
+    """
+    Bu süreç için Firestore istemcisini döndürür; başlatılamazsa None.
+
+    Firebase Admin SDK ve Firestore'un gRPC kanalları fork sonrasında
+    güvenli değildir. Bu yüzden SDK uygulama oluşturulurken değil, her
+    worker sürecinde ilk kullanımda başlatılır; preload ile çalışan ana
+    süreç Firebase'e hiç dokunmaz.
+    """
+    pid = os.getpid()
+    if _state['pid'] == pid:
+        return _state['db']
+
+    with _lock:
+        if _state['pid'] != pid:
+            _state['db'] = _connect()
+            _state['pid'] = pid
+    return _state['db']
+
+
+def _connect():
+    try:
+        if not firebase_admin._apps:
+            cred_dict = Config.get_firebase_credentials()
+            if not cred_dict:
+                raise ValueError("Firebase credentials yüklenemedi")
+            firebase_admin.initialize_app(credentials.Certificate(cred_dict))
+            logger.info("Firebase Admin SDK başarıyla başlatıldı (pid %s)", os.getpid())
+    except Exception as e:
+        logger.error("Firebase Admin SDK başlatma hatası: %s", e)
+        return None
+
+    # Firestore veritabanı referansı
+    try:
+        return firestore.client()
+    except Exception as e:
+        logger.error("Firestore bağlantı hatası: %s", e)
+        return None
@@ -0,0 +1,348 @@
+"""
+Bir Scopus sorgusunun tüm sonuçlarının dosyaya aktarılması (harvest).
+
+Offset sayfalama (`start=`) Scopus'ta 5.000 sonuçla sınırlıdır ve derin
+sayfalarda yavaşlar. Harvest `cursor=*` ile başlar ve her yanıtın
+`cursor.@next` değeriyle devam eder; sayfa boyutu `HARVEST_PAGE_SIZE`'dır.
+Sonraki sayfanın imleci ancak önceki yanıtla geldiği için sayfalar sırayla
+istenir: ayrı bir thread sonraki sayfayı çekerken önceki sayfa dosyaya
+yazılır. İstekler `scopus_search` bütçesinden arka plan önceliğiyle token
+harcar; bütçe dolunca Retry-After kadar beklenir.
+
+Kayıtlar sayfa sayfa NDJSON, CSV ya da Parquet (`pyarrow` gerekir) olarak
+yazılır; sonuçların tamamı hiçbir zaman bellekte tutulmaz. Her sayfadan
+sonra `<çıktı>.checkpoint.json` güncellenir (sonraki imleç, yazılan kayıt
+sayısı, dosyanın geçerli boyutu). `resume=True` ile yarıda kalan harvest
+kaldığı yerden sürer; checkpoint'ten sonra yazılmış yarım veri atılır.
+"""
+import csv
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import requests
+from ..config import Config
+from .articles import Article, dumps
+from .rate_limiter import RateLimitExceeded
+from .scopus_service import ScopusService
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+_EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson', '.csv': 'csv', '.parquet': 'parquet'}
+# Yeniden denenebilecek upstream yanıtları
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HarvestError(Exception):
+    """Harvest tamamlanamadı; checkpoint korunur ve resume ile devam edilebilir"""
+
+
+class _Done:
+    """Sayfa kuyruğunda akışın sonu (ya da hatası)"""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+class NDJSONWriter:
+    """Her satırda bir JSON kayıt"""
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self._file = _open_at(path, offset, 'b')
+
+    def write(self, articles):
+        self._file.write(b''.join(dumps(_record(article)) + b'\n' for article in articles))
+
+    def checkpoint(self, final=False):
+        """Yazılanları diske kalıcı olarak yazar; checkpoint'e eklenecek durumu döndürür"""
+        return {'offset': _sync(self._file)}
+
+    def close(self):
+        self._file.close()
+
+
+class CSVWriter:
+    """Başlık satırlı CSV; sütunlar Article alanlarıdır"""
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self._file = _open_at(path, offset, '')
+        self._writer = csv.writer(self._file)
+        if not offset:
+            self._writer.writerow(Article.__slots__)
+
+    def write(self, articles):
+        self._writer.writerows(article.to_row() for article in articles)
+
+    def checkpoint(self, final=False):
+        return {'offset': _sync(self._file)}
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Parquet veri kümesi: `path` dizini altında `part-00000.parquet`, ...
+    Parquet dosyası kapatılmadan geçerli olmadığı için checkpoint yalnızca
+    `HARVEST_PARQUET_PART_ROWS` kayıtta bir parça kapatılınca alınır; yarım
+    kalan parça resume sırasında silinir ve o parçanın sayfaları yeniden çekilir.
+    """
+
+    def __init__(self, path, parts=0):
+        if pyarrow is None:
+            raise HarvestError('Parquet çıktısı için pyarrow gerekli (pip install pyarrow)')
+        self.path = path
+        self.parts = parts
+        self.part_rows = Config.HARVEST_PARQUET_PART_ROWS
+        self._schema = pyarrow.schema([(name, pyarrow.string()) for name in Article.__slots__])
+        self._writer = None
+        self._rows = 0
+        os.makedirs(path, exist_ok=True)
+        # Önceki çalıştırmadan kalan, checkpoint'e girmemiş parçalar
+        for name in os.listdir(path):
+            if name.startswith('part-') and name.endswith('.parquet') and _part_index(name) >= parts:
+                os.remove(os.path.join(path, name))
+
+    def write(self, articles):
+        if self._writer is None:
+            part_path = os.path.join(self.path, f'part-{self.parts:05d}.parquet')
+            self._writer = pyarrow.parquet.ParquetWriter(part_path, self._schema)
+        columns = zip(*(article.to_row() for article in articles))
+        self._writer.write_table(pyarrow.table(
+            [pyarrow.array(column, pyarrow.string()) for column in columns], schema=self._schema
+        ))
+        self._rows += len(articles)
+
+    def checkpoint(self, final=False):
+        if self._writer is None or (self._rows < self.part_rows and not final):
+            return None
+        self._writer.close()
+        self._writer = None
+        self._rows = 0
+        self.parts += 1
+        return {'parts': self.parts}
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class HarvestService:
+    @staticmethod
+    def detect_format(output, format=None):
+        """Biçim verilmemişse dosya uzantısından çıkarılır"""
+        format = format or _EXTENSIONS.get(os.path.splitext(output)[1].lower())
+        if format not in FORMATS:
+            raise HarvestError(f"Çıktı biçimi belirlenemedi: {output} ({', '.join(FORMATS)})")
+        return format
+
+    @staticmethod
+    def checkpoint_path(output):
+        return f'{output.rstrip(os.sep)}.checkpoint.json'
+
+    @staticmethod
+    def run(query, output, format=None, resume=False, max_records=None, page_size=None, progress=None):
+        """
+        Sorgunun sonuçlarını `output`'a yazar ve özet döndürür. `progress`
+        verilirse her sayfadan sonra `progress(yazılan, toplam)` çağrılır.
+        Hata ya da kesintide checkpoint'e kadar yazılanlar korunur.
+        """
+        format = HarvestService.detect_format(output, format)
+        page_size = page_size or Config.HARVEST_PAGE_SIZE
+        checkpoint_file = HarvestService.checkpoint_path(output)
+
+        state = {'query': query, 'format': format, 'cursor': '*', 'written': 0, 'total': None, 'pages': 0,
+                 'offset': 0, 'parts': 0, 'complete': False}
+        if resume:
+            saved = _load_checkpoint(checkpoint_file)
+            if saved is not None:
+                if saved.get('query') != query or saved.get('format') != format:
+                    raise HarvestError('Checkpoint farklı bir sorguya ya da biçime ait; resume kullanmadan başlatın')
+                state.update(saved)
+                if state['complete']:
+                    return HarvestService._summary(state, output)
+                logger.info("Harvest kaldığı yerden sürüyor: %d kayıt yazılmış", state['written'])
+
+        if format == 'parquet':
+            writer = ParquetWriter(output, state['parts'])
+        elif format == 'csv':
+            writer = CSVWriter(output, state['offset'])
+        else:
+            writer = NDJSONWriter(output, state['offset'])
+
+        pages = HarvestService.iter_pages(query, state['cursor'], page_size)
+        try:
+            for page, next_cursor in pages:
+                articles = page.articles
+                if max_records is not None:
+                    articles = articles[:max(0, max_records - state['written'])]
+                if articles:
+                    writer.write(articles)
+                state['written'] += len(articles)
+                state['total'] = page.total
+                state['pages'] += 1
+                state['cursor'] = next_cursor
+                state['complete'] = (not page.articles or not next_cursor or state['written'] >= page.total
+                                     or (max_records is not None and state['written'] >= max_records))
+
+                committed = writer.checkpoint(final=state['complete'])
+                if committed is not None:
+                    state.update(committed)
+                    _save_checkpoint(checkpoint_file, state)
+                if progress is not None:
+                    progress(state['written'], state['total'])
+                if state['complete']:
+                    break
+        finally:
+            pages.close()
+            writer.close()
+        return HarvestService._summary(state, output)
+
+    @staticmethod
+    def iter_pages(query, cursor='*', page_size=None):
+        """
+        (SearchPage, sonraki imleç) çiftlerini üretir. Sayfalar ayrı bir
+        thread'de en fazla `HARVEST_PREFETCH` sayfa önden çekilir; üretici
+        kapatılınca thread de durur.
+        """
+        page_size = page_size or Config.HARVEST_PAGE_SIZE
+        pages = queue.Queue(maxsize=max(1, Config.HARVEST_PREFETCH))
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch():
+            current = cursor
+            try:
+                while not stop.is_set():
+                    page, next_cursor = HarvestService.fetch_page(query, current, page_size, stop)
+                    if not put((page, next_cursor)) or not page.articles or not next_cursor:
+                        break
+                    current = next_cursor
+                put(_Done())
+            except Exception as e:
+                put(_Done(e))
+
+        thread = threading.Thread(target=fetch, name='harvest-fetch', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = pages.get()
+                if isinstance(item, _Done):
+                    if item.error is not None:
+                        raise item.error
+                    return
+                yield item
+        finally:
+            stop.set()
+
+    @staticmethod
+    def fetch_page(query, cursor, page_size, stop=None):
+        """
+        Tek bir imleçli sayfa. Yerel istek bütçesi dolarsa Retry-After kadar,
+        geçici upstream hatalarında artan sürelerle bekleyip yeniden dener.
+        """
+        for attempt in range(Config.HARVEST_MAX_RETRIES + 1):
+            try:
+                return ScopusService.search_cursor(query, page_size, cursor)
+            except RateLimitExceeded as e:
+                delay = e.retry_after
+                error = e
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code not in _RETRY_STATUSES:
+                    raise HarvestError(f'Scopus araması başarısız: {e}') from e
+                delay = min(60, 2 ** attempt)
+                error = e
+            except requests.RequestException as e:
+                delay = min(60, 2 ** attempt)
+                error = e
+            logger.warning("Harvest sayfası alınamadı (deneme %d), %d sn sonra tekrar: %s", attempt + 1, delay, error)
+            if stop is not None:
+                if stop.wait(delay):
+                    break
+            else:
+                time.sleep(delay)
+        raise HarvestError(f'Scopus sayfası {Config.HARVEST_MAX_RETRIES + 1} denemede alınamadı: {error}')
+
+    @staticmethod
+    def _summary(state, output):
+        return {
+            'query': state['query'],
+            'output': output,
+            'format': state['format'],
+            'written': state['written'],
+            'total': state['total'],
+            'pages': state['pages'],
+            'complete': state['complete']
+        }
+
+
+def _record(article):
+    return dict(zip(Article.__slots__, article.to_row()))
+
+
+def _open_at(path, offset, mode):
+    """
+    Çıktıyı `offset` baytından itibaren yazmak üzere açar; checkpoint'ten
+    sonra yazılmış yarım veri kesilir.
+    """
+    if not offset:
+        return open(path, 'w' + mode, **({} if mode else {'encoding': 'utf-8', 'newline': ''}))
+    if not os.path.exists(path) or os.path.getsize(path) < offset:
+        raise HarvestError(f'Çıktı dosyası checkpoint ile uyuşmuyor: {path}')
+    os.truncate(path, offset)
+    return open(path, 'a' + mode, **({} if mode else {'encoding': 'utf-8', 'newline': ''}))
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+    return f.tell()
+
+
+def _part_index(name):
+    try:
+        return int(name[len('part-'):-len('.parquet')])
+    except ValueError:
+        return -1
+
+
+def _load_checkpoint(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        raise HarvestError(f'Checkpoint okunamadı ({path}): {e}')
+
+
+def _save_checkpoint(path, state):
+    # Yarım yazılmış checkpoint bırakmamak için geçici dosya üzerinden değiştirilir
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
@@ -0,0 +1,103 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import Config
+from .. import metrics
+from .rate_limiter import rate_limiter, PRIORITY_INTERACTIVE
+
+
+class HTTPClient:
+    """
+    Elsevier ve Cohere çağrıları için paylaşılan, keep-alive destekli HTTP istemcisi.
+
+    Tüm thread'ler tek bir HTTPAdapter'ı (yani tek bir urllib3 PoolManager'ı)
+    paylaşır; böylece aynı host'a yapılan istekler açık TCP+TLS bağlantılarını
+    yeniden kullanır. requests.Session thread-safe olmadığı için her thread'e
+    ayrı bir Session verilir, fakat hepsi aynı bağlantı havuzuna bağlanır.
+    """
+
+    _adapter = None
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @classmethod
+    def _get_adapter(cls):
+        if cls._adapter is None:
+            with cls._lock:
+                if cls._adapter is None:
+                    cls._adapter = HTTPAdapter(
+                        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                        pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                        pool_block=Config.HTTP_POOL_BLOCK
+                    )
+        return cls._adapter
+
+    @classmethod
+    def session(cls):
+        """Geçerli thread'e ait, paylaşılan havuza bağlı Session'ı döndürür"""
+        session = getattr(cls._local, 'session', None)
+        if session is None:
+            adapter = cls._get_adapter()
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            cls._local.session = session
+        return session
+
+    @classmethod
+    def request(cls, method, url, timeout=None, upstream=None, priority=PRIORITY_INTERACTIVE,
+                max_wait=None, **kwargs):
+        """
+        `upstream` verilirse istek o upstream'in istek bütçesinden bir token
+        harcar; bütçe yetmezse RateLimitExceeded fırlatılır.
+        """
+        if timeout is None:
+            timeout = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        if upstream:
+            rate_limiter.acquire(upstream, priority=priority, max_wait=max_wait)
+        with metrics.track_upstream(upstream or 'untagged', url) as call:
+            response = cls.session().request(method, url, timeout=timeout, **kwargs)
+            call.status = response.status_code
+        if upstream:
+            rate_limiter.observe(upstream, response)
+        return response
+
+    @classmethod
+    def get(cls, url, **kwargs):
+        return cls.request('GET', url, **kwargs)
+
+    @classmethod
+    def post(cls, url, **kwargs):
+        return cls.request('POST', url, **kwargs)
+
+    @classmethod
+    def stats(cls):
+        """
+        Host bazında açılan yeni bağlantı ve yeniden kullanılan bağlantı sayılarını döndürür.
+        """
+        hosts = {}
+        adapter = cls._adapter
+        if adapter is None:
+            return hosts
+
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+            hosts[host] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(pool.num_requests - pool.num_connections, 0)
+            }
+        return hosts
+
+    @classmethod
+    def reset(cls):
+        """Havuzu kapatır; fork sonrası çocuk süreçlerde yeniden oluşturulur"""
+        with cls._lock:
+            if cls._adapter is not None:
+                cls._adapter.close()
+            cls._adapter = None
+            cls._local = threading.local()
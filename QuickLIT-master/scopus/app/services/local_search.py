@@ -0,0 +1,455 @@
+"""
+İndirilen PDF'ler üzerinde yerel tam metin arama.
+
+PDF metinleri sayfa sayfa bir SQLite FTS5 dizinine yazılır. Dizin, PDF
+deposu gibi dosya içeriğinin SHA-256 özetiyle anahtarlanır; scopus_id / DOI /
+PII eşlemesi aramada PDF deposundan okunur, böylece aynı dosyaya bağlı tüm
+makaleler bulunur ve dosya bir kez dizinlenir.
+
+Dizinleme artımlıdır: süreç başladığında depoda olup dizinde olmayan dosyalar,
+sonrasında yeni indirilen her PDF arka plandaki dizinleyici thread'ine
+verilir. Metin çıkarma süreç havuzunda yapılır (bkz. pdf_text); dizine yazma
+dizinleyici thread'inde yapılır. Aynı dosyayı birden fazla worker'ın
+dizinlemesini `documents` tablosundaki sahiplenme (claim) satırı önler.
+"""
+import html
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, wait
+from ..config import Config
+from .pdf_store import get_pdf_store
+from .metadata_store import get_metadata_store
+from .pdf_text import PDFTextExtractor, read_pages
+
+logger = logging.getLogger(__name__)
+
+# Sayfa satırlarının rowid'si: belge kimliği << 16 | sayfa indeksi
+_PAGE_BITS = 16
+_PAGE_MASK = (1 << _PAGE_BITS) - 1
+# snippet() işaretleri; HTML kaçışından sonra <mark> ile değiştirilir
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+_WORD = re.compile(r'\w+')
+
+
+class InvalidQuery(ValueError):
+    """FTS5 sorgusuna çevrilemeyen arama ifadesi"""
+
+
+def build_match(query):
+    """
+    Kullanıcı sorgusunu güvenli FTS5 MATCH ifadelerine çevirir ve
+    (eşleşme, hariç tutma) döndürür: sözcükler VE ile bağlanır (`AND`
+    yazılabilir, işleç olarak yok sayılır), "tırnaklı ifade" öbek araması,
+    `sözcük*` ön ek araması, `a OR b` alternatif yapar. `-sözcük` hariç tutma
+    ifadesine girer (yoksa None); hariç tutma sayfa değil belge düzeyindedir.
+    """
+    positives, negatives = [], []
+    pending_or = False
+    for match in _TOKEN.finditer(query):
+        negate, phrase, word = match.groups()
+        prefix = False
+        if word is not None:
+            if word == 'OR':
+                pending_or = bool(positives)
+                continue
+            if word == 'AND':
+                pending_or = False
+                continue
+            negate = word.startswith('-') and len(word) > 1
+            word = word[1:] if negate else word
+            prefix = word.endswith('*')
+            terms = _WORD.findall(word)
+        else:
+            terms = _WORD.findall(phrase)
+        if not terms:
+            continue
+
+        term = '"' + ' '.join(terms) + '"' + ('*' if prefix else '')
+        if negate:
+            negatives.append(term)
+        elif pending_or:
+            positives[-1] = f'{positives[-1]} OR {term}'
+        else:
+            positives.append(term)
+        pending_or = False
+
+    if not positives:
+        raise InvalidQuery('Sorguda aranacak sözcük yok')
+    expression = ' AND '.join(f'({term})' if ' OR ' in term else term for term in positives)
+    return expression, ' OR '.join(negatives) or None
+
+
+class SearchIndex:
+    """SQLite FTS5 sayfa dizini (dosya özetine göre)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                sha256 TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL,
+                page_count INTEGER NOT NULL DEFAULT 0,
+                chars INTEGER NOT NULL DEFAULT 0,
+                claimed_at REAL NOT NULL,
+                indexed_at REAL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+                body, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def unindexed(self, hashes):
+        """Verilenlerden dizinlenmemiş ya da yeniden denenmesi gerekenler"""
+        now = time.time()
+        done = set()
+        rows = self._connect().execute("SELECT sha256, status, claimed_at FROM documents")
+        for sha256, status, claimed_at in rows:
+            if (status == 'ok'
+                    or (status == 'error' and claimed_at > now - Config.LOCAL_SEARCH_RETRY_AFTER)
+                    or (status == 'pending' and claimed_at > now - Config.LOCAL_SEARCH_CLAIM_TIMEOUT)):
+                done.add(sha256)
+        return set(hashes) - done
+
+    def claim(self, sha256):
+        """Dosyayı bu süreç adına dizinlemek üzere sahiplenir; başkası sahiplendiyse False"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO documents (sha256, status, claimed_at) VALUES (?, 'pending', ?) "
+            "ON CONFLICT(sha256) DO UPDATE SET status = 'pending', claimed_at = excluded.claimed_at "
+            "WHERE (documents.status = 'error' AND documents.claimed_at < ?) "
+            "OR (documents.status = 'pending' AND documents.claimed_at < ?)",
+            (sha256, now, now - Config.LOCAL_SEARCH_RETRY_AFTER, now - Config.LOCAL_SEARCH_CLAIM_TIMEOUT)
+        )
+        return cursor.rowcount == 1
+
+    def add(self, sha256, pages):
+        """Dosyanın sayfa metinlerini dizine yazar (önceki sayfaların yerine)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id FROM documents WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                doc_id = conn.execute(
+                    "INSERT INTO documents (sha256, status, claimed_at) VALUES (?, 'pending', ?)",
+                    (sha256, time.time())
+                ).lastrowid
+            else:
+                doc_id = row[0]
+            self._delete_pages(conn, doc_id)
+            conn.executemany(
+                "INSERT INTO pages (rowid, body) VALUES (?, ?)",
+                [((doc_id << _PAGE_BITS) | index, text) for index, text in enumerate(pages[:_PAGE_MASK + 1]) if text]
+            )
+            conn.execute(
+                "UPDATE documents SET status = 'ok', page_count = ?, chars = ?, indexed_at = ?, error = NULL "
+                "WHERE id = ?",
+                (len(pages), sum(len(text) for text in pages), time.time(), doc_id)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def mark_failed(self, sha256, error):
+        self._connect().execute(
+            "UPDATE documents SET status = 'error', error = ?, claimed_at = ? WHERE sha256 = ?",
+            (str(error)[:500], time.time(), sha256)
+        )
+
+    def purge(self, keep):
+        """Depodan silinmiş dosyaların sayfalarını dizinden çıkarır"""
+        conn = self._connect()
+        stale = [(doc_id, sha256) for doc_id, sha256 in conn.execute("SELECT id, sha256 FROM documents")
+                 if sha256 not in keep]
+        for doc_id, sha256 in stale:
+            conn.execute("BEGIN IMMEDIATE")
+            self._delete_pages(conn, doc_id)
+            conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            conn.execute("COMMIT")
+        return len(stale)
+
+    @staticmethod
+    def _delete_pages(conn, doc_id):
+        conn.execute("DELETE FROM pages WHERE rowid BETWEEN ? AND ?",
+                     (doc_id << _PAGE_BITS, (doc_id << _PAGE_BITS) | _PAGE_MASK))
+
+    def search(self, match, limit, offset=0, exclude=None):
+        """
+        MATCH ifadesine uyan dosyaları en iyi sayfalarının BM25 skoruna göre
+        döndürür: (toplam dosya sayısı, [{'sha256', 'page', 'hits', 'score', 'snippet'}]).
+        Herhangi bir sayfası `exclude` ifadesine uyan dosyalar sonuçlara girmez.
+        """
+        conn = self._connect()
+        where, params = "pages MATCH ?", (match,)
+        if exclude:
+            where += (f" AND rowid >> {_PAGE_BITS} NOT IN "
+                      f"(SELECT rowid >> {_PAGE_BITS} FROM pages WHERE pages MATCH ?)")
+            params += (exclude,)
+        try:
+            # Gruplu sorguda MIN(rank) ile seçilen satırın rowid'si en iyi sayfadır
+            best = conn.execute(
+                f"SELECT rowid >> {_PAGE_BITS} AS doc_id, rowid, MIN(rank) AS score, COUNT(*) FROM pages "
+                f"WHERE {where} GROUP BY doc_id ORDER BY score LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+            total = conn.execute(
+                f"SELECT COUNT(DISTINCT rowid >> {_PAGE_BITS}) FROM pages WHERE {where}", params
+            ).fetchone()[0]
+            if not best:
+                return total, []
+
+            rowids = [row[1] for row in best]
+            placeholders = ','.join('?' * len(rowids))
+            snippets = dict(conn.execute(
+                f"SELECT rowid, snippet(pages, 0, '{_MARK_START}', '{_MARK_END}', '…', 24) FROM pages "
+                f"WHERE pages MATCH ? AND rowid IN ({placeholders})",
+                (match, *rowids)
+            ))
+            hashes = dict(conn.execute(
+                f"SELECT id, sha256 FROM documents WHERE id IN ({placeholders})", [row[0] for row in best]
+            ))
+        except sqlite3.OperationalError as e:
+            # Ör. çok kısa ön ek ya da tokenizer'ın kabul etmediği ifade
+            raise InvalidQuery(str(e))
+
+        results = []
+        for doc_id, rowid, score, hits in best:
+            if doc_id not in hashes:
+                continue
+            results.append({
+                'sha256': hashes[doc_id],
+                'page': (rowid & _PAGE_MASK) + 1,
+                'hits': hits,
+                'score': round(-score, 4),
+                'snippet': _highlight(snippets.get(rowid, ''))
+            })
+        return total, results
+
+    def stats(self):
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM documents GROUP BY status"))
+        pages, chars = conn.execute(
+            "SELECT COALESCE(SUM(page_count), 0), COALESCE(SUM(chars), 0) FROM documents WHERE status = 'ok'"
+        ).fetchone()
+        return {
+            'documents': counts.get('ok', 0),
+            'pending': counts.get('pending', 0),
+            'failed': counts.get('error', 0),
+            'pages': pages,
+            'chars': chars
+        }
+
+
+def _highlight(snippet):
+    return html.escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Uygulama genelinde paylaşılan arama dizinini döndürür"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex(Config.LOCAL_SEARCH_INDEX_PATH)
+    return _index
+
+
+class LocalSearchService:
+    _SYNC = object()  # Kuyruk işareti: depodaki tüm dosyaları kontrol et
+    _indexer = {'pid': None, 'thread': None, 'stop': None, 'queue': None}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def search(query, limit=20, offset=0):
+        """Yerel dizinde arama; Scopus'a istek yapılmaz"""
+        started = time.perf_counter()
+        limit = max(1, min(limit, Config.LOCAL_SEARCH_MAX_RESULTS))
+        offset = max(0, offset)
+        match, exclude = build_match(query)
+        total, hits = get_search_index().search(match, limit, offset, exclude)
+
+        articles = get_pdf_store().articles_for(hit['sha256'] for hit in hits)
+        metadata_by_id = get_metadata_store().get_many(
+            ids['scopus_id'] for hit in hits for ids in articles.get(hit['sha256'], [])
+        )
+        results = []
+        for hit in hits:
+            for ids in articles.get(hit['sha256'], []):
+                metadata = metadata_by_id.get(ids['scopus_id'])
+                results.append({
+                    **ids,
+                    'title': metadata.title if metadata is not None else None,
+                    'page': hit['page'],
+                    'hits': hit['hits'],
+                    'score': hit['score'],
+                    'snippet': hit['snippet']
+                })
+        return {
+            'query': query,
+            'total': total,
+            'offset': offset,
+            'results': results,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    @staticmethod
+    def start():
+        """Bu süreçte dizinleyiciyi başlatır ve depoyu bir kez tarar (süreç başına bir kez)"""
+        if not Config.LOCAL_SEARCH_ENABLED:
+            return
+        indexer = LocalSearchService._indexer
+        with LocalSearchService._lock:
+            # Fork ile gelen thread çocuk süreçte çalışmaz; pid değiştiyse yeniden başlatılır
+            if indexer['pid'] == os.getpid():
+                return
+            indexer['pid'] = os.getpid()
+            indexer['stop'] = threading.Event()
+            indexer['queue'] = queue.Queue()
+            indexer['queue'].put(LocalSearchService._SYNC)
+            indexer['thread'] = threading.Thread(target=LocalSearchService._index_loop,
+                                                 args=(indexer['stop'], indexer['queue']),
+                                                 name='search-indexer', daemon=True)
+            indexer['thread'].start()
+
+    @staticmethod
+    def schedule(sha256):
+        """Yeni depolanan dosyayı dizinleme kuyruğuna ekler (beklemez)"""
+        if not Config.LOCAL_SEARCH_ENABLED:
+            return
+        LocalSearchService.start()
+        LocalSearchService._indexer['queue'].put(sha256)
+
+    @staticmethod
+    def _index_loop(stop, work):
+        while not stop.is_set():
+            try:
+                items = [work.get(timeout=min(Config.TEXT_EXTRACTION_POOL_IDLE, 60))]
+            except queue.Empty:
+                PDFTextExtractor.release_if_idle()
+                continue
+            while True:
+                try:
+                    items.append(work.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                if any(item is LocalSearchService._SYNC for item in items):
+                    hashes = LocalSearchService.sync()
+                else:
+                    hashes = get_search_index().unindexed(items)
+                LocalSearchService.index_files(hashes, stop)
+            except Exception as e:
+                logger.exception("Dizinleyici hatası: %s", e)
+
+    @staticmethod
+    def sync():
+        """Depodan silinmiş dosyaları dizinden çıkarır; dizinlenmemiş dosyaları döndürür"""
+        index = get_search_index()
+        hashes = get_pdf_store().blob_hashes()
+        removed = index.purge(hashes)
+        if removed:
+            logger.info("Arama dizininden %d silinmiş dosya çıkarıldı", removed)
+        return index.unindexed(hashes)
+
+    @staticmethod
+    def index_files(hashes, stop=None):
+        """
+        Dosyaların metnini süreç havuzunda `<sha>.txt` metin dosyasına çıkarır
+        (özetleme de aynı dosyayı kullanır; varsa PDF yeniden okunmaz) ve
+        dizine yazar. Bellekte aynı anda en fazla havuz boyutunun iki katı
+        kadar belge tutulur. Dizinlenen dosya sayısını döndürür.
+        """
+        if not hashes or not PDFTextExtractor.available():
+            return 0
+        index = get_search_index()
+        store = get_pdf_store()
+        pending = iter(sorted(hashes))
+        window = max(1, Config.TEXT_EXTRACTION_WORKERS * 2)
+        running = {}
+        indexed = 0
+
+        while True:
+            while len(running) < window and (stop is None or not stop.is_set()):
+                sha256 = next(pending, None)
+                if sha256 is None:
+                    break
+                if index.claim(sha256):
+                    running[LocalSearchService._extract(store, sha256)] = sha256
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                sha256 = running.pop(future)
+                try:
+                    future.result()
+                    index.add(sha256, list(read_pages(store.text_path(sha256))))
+                    indexed += 1
+                except CancelledError:
+                    # Kapanışta iptal edildi; sahiplenme zaman aşımıyla düşer ve dosya yeniden denenir
+                    continue
+                except Exception as e:
+                    logger.warning("PDF dizinlenemedi (%s): %s", sha256, e)
+                    index.mark_failed(sha256, e)
+
+        if indexed:
+            logger.info("Arama dizinine %d PDF eklendi", indexed)
+        return indexed
+
+    @staticmethod
+    def _extract(store, sha256):
+        """Metin dosyası hazırsa tamamlanmış, değilse süren çıkarma işinin Future'ı"""
+        target = store.text_path(sha256)
+        if os.path.exists(target):
+            future = Future()
+            future.set_result(None)
+            return future
+        future = PDFTextExtractor.extract_text(store.blob_path(sha256), target)
+        future.add_done_callback(lambda done: store.record_text(sha256))
+        return future
+
+    @staticmethod
+    def stats():
+        return get_search_index().stats()
+
+    @staticmethod
+    def shutdown():
+        """Dizinleyiciyi ve metin çıkarma havuzunu durdurur"""
+        indexer = LocalSearchService._indexer
+        with LocalSearchService._lock:
+            if indexer['stop'] is not None:
+                indexer['stop'].set()
+            indexer['pid'] = None
+        PDFTextExtractor.shutdown()
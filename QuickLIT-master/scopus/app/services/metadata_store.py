@@ -0,0 +1,222 @@
+"""
+Scopus makale meta verilerinin yerel SQLite deposu.
+
+Arama yanıtları ve abstract retrieval yanıtlarından gelen `Article` kayıtları
+scopus_id anahtarıyla tutulur; EID, DOI ve PII ile de aranabilir (DOI büyük/
+küçük harf duyarsız, PII yalnızca harf ve rakamlarıyla karşılaştırılır).
+Aynı makale iki kaynaktan da gelebildiği için yazma boş alanların üzerine
+yazmaz: aramadan gelen yazar/dergi bilgisi, abstract'tan gelen yayıncıyla
+birleşir. Her kaynağın son görülme zamanı (`search_at`, `abstract_at`) ayrı
+tutulur; `ttl`'den eski kayıtlar okunmaz ve Scopus'a yeniden gidilir.
+
+Bir arama sayfasının tüm kayıtları tek işlemde yazılır (`upsert_many`).
+Kayıt sayısı `max_entries`'i aşarsa en uzun süredir güncellenmeyenler silinir.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from ..config import Config
+from .articles import Article
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ('search', 'abstract')
+# Article alanlarının tablo sütunları (aynı sırayla)
+_COLUMNS = Article.__slots__
+_PII_RE = re.compile(r'[^0-9A-Za-z]')
+# SQLite parametre sınırının altında kalmak için IN (...) sorguları parçalara bölünür
+_CHUNK = 500
+
+
+def doi_key(doi):
+    return doi.strip().lower() if doi and doi.strip() else None
+
+
+def pii_key(pii):
+    return (_PII_RE.sub('', pii).upper() or None) if pii else None
+
+
+class MetadataStore:
+    def __init__(self, path, ttl, max_entries, sweep_interval=60):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._upserts = 0
+        self._next_sweep = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        columns = ',\n'.join(f'{name} TEXT' for name in _COLUMNS if name != 'scopus_id')
+        self._connect().executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS articles (
+                scopus_id TEXT PRIMARY KEY,
+                {columns},
+                doi_key TEXT,
+                pii_key TEXT,
+                search_at REAL,
+                abstract_at REAL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_eid ON articles(eid);
+            CREATE INDEX IF NOT EXISTS idx_articles_doi_key ON articles(doi_key);
+            CREATE INDEX IF NOT EXISTS idx_articles_pii_key ON articles(pii_key);
+            CREATE INDEX IF NOT EXISTS idx_articles_updated_at ON articles(updated_at);
+            """
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, scopus_id=None, eid=None, doi=None, pii=None, max_age=None):
+        """
+        Verilen kimliklerden biriyle eşleşen taze kaydı Article olarak döndürür
+        (yoksa ya da `max_age`/`ttl`'den eskiyse None).
+        """
+        conn = self._connect()
+        oldest = time.time() - (self.ttl if max_age is None else max_age)
+        row = None
+        for column, value in (('scopus_id', scopus_id and str(scopus_id)), ('eid', eid),
+                              ('doi_key', doi_key(doi)), ('pii_key', pii_key(pii))):
+            if value:
+                row = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM articles WHERE {column} = ? AND updated_at >= ? "
+                    "ORDER BY updated_at DESC LIMIT 1",
+                    (value, oldest)
+                ).fetchone()
+                if row:
+                    break
+        self._count(row is not None)
+        return Article(*row) if row else None
+
+    def get_many(self, scopus_ids, max_age=None):
+        """Taze kayıtları {scopus_id: Article} olarak döndürür; bulunamayanlar sözlükte yer almaz"""
+        scopus_ids = list(dict.fromkeys(str(scopus_id) for scopus_id in scopus_ids if scopus_id))
+        oldest = time.time() - (self.ttl if max_age is None else max_age)
+        conn = self._connect()
+        result = {}
+        for offset in range(0, len(scopus_ids), _CHUNK):
+            chunk = scopus_ids[offset:offset + _CHUNK]
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM articles "
+                f"WHERE scopus_id IN ({','.join('?' * len(chunk))}) AND updated_at >= ?",
+                (*chunk, oldest)
+            )
+            for row in rows:
+                result[row[0]] = Article(*row)
+        with self._lock:
+            self._hits += len(result)
+            self._misses += len(scopus_ids) - len(result)
+        return result
+
+    def upsert_many(self, articles, source):
+        """
+        Kayıtları tek işlemde ekler ya da günceller; boş gelen alanlar mevcut
+        değerleri silmez. scopus_id'si olmayan kayıtlar atlanır. Yazılan kayıt
+        sayısını döndürür.
+        """
+        if source not in SOURCES:
+            raise ValueError(f'Bilinmeyen kaynak: {source}')
+        now = time.time()
+        rows = [
+            (*article.to_row(), doi_key(article.doi), pii_key(article.pii), now)
+            for article in articles if article.scopus_id
+        ]
+        if not rows:
+            return 0
+
+        names = (*_COLUMNS, 'doi_key', 'pii_key', f'{source}_at')
+        updates = ', '.join(
+            f"{name} = COALESCE(NULLIF(excluded.{name}, ''), articles.{name})"
+            for name in names if name != 'scopus_id'
+        )
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"INSERT INTO articles ({', '.join(names)}, updated_at) VALUES ({', '.join('?' * len(names))}, ?) "
+                f"ON CONFLICT(scopus_id) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+                [(*row, now) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._upserts += len(rows)
+            sweep = now >= self._next_sweep
+            if sweep:
+                self._next_sweep = now + self.sweep_interval
+        if sweep:
+            self.evict()
+        return len(rows)
+
+    def evict(self):
+        """Süresi dolan ve `max_entries`'i aşan (en eski güncellenen) kayıtları siler"""
+        conn = self._connect()
+        removed = conn.execute("DELETE FROM articles WHERE updated_at < ?", (time.time() - self.ttl,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM articles WHERE scopus_id IN "
+                "(SELECT scopus_id FROM articles ORDER BY updated_at ASC LIMIT ?)",
+                (excess,)
+            ).rowcount
+        if removed:
+            logger.debug("Meta veri deposundan %d kayıt silindi", removed)
+        return removed
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def stats(self):
+        conn = self._connect()
+        entries, with_abstract = conn.execute(
+            "SELECT COUNT(*), COUNT(abstract_at) FROM articles"
+        ).fetchone()
+        with self._lock:
+            return {
+                'entries': entries,
+                'with_abstract': with_abstract,
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'upserts': self._upserts
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metadata_store():
+    """Uygulama genelinde paylaşılan meta veri deposunu döndürür"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetadataStore(
+                    Config.METADATA_STORE_PATH,
+                    Config.METADATA_STORE_TTL,
+                    Config.METADATA_STORE_MAX_ENTRIES,
+                    Config.CACHE_SWEEP_INTERVAL
+                )
+    return _store
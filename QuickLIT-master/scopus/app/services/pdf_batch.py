@@ -0,0 +1,206 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from ..config import Config
+from .cache_service import create_cache
+from .executors import shutdown_executor
+from .pdf_service import PDFService
+from .rate_limiter import RateLimitExceeded, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class PDFBatchService:
+    """
+    Toplu PDF indirme işleri.
+
+    İşler sınırlı boyutlu bir thread havuzunda arka plan önceliğiyle çalışır;
+    istek thread'i yalnızca işi kuyruğa ekleyip iş kimliğini döndürür. İş durumu
+    CACHE_BACKEND'den bağımsız olarak diskteki SQLite iş deposuna yazıldığı için
+    hangi worker sürecine gelirse gelsin durum sorgusu cevaplanabilir.
+    """
+
+    _executor = None
+    _lock = threading.Lock()
+    _jobs = {}  # Bu süreçte çalışan işler: job_id -> iş durumu
+
+    @staticmethod
+    def create_job(scopus_ids):
+        items = []
+        seen = set()
+        for scopus_id in scopus_ids:
+            scopus_id = str(scopus_id).strip()
+            if scopus_id and scopus_id not in seen:
+                seen.add(scopus_id)
+                items.append({'scopus_id': scopus_id, 'status': 'queued'})
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'created_at': time.time(),
+            'finished_at': None,
+            'items': items
+        }
+        with PDFBatchService._lock:
+            PDFBatchService._jobs[job_id] = job
+            PDFBatchService._save(job)
+
+        executor = PDFBatchService._get_executor()
+        for index in range(len(items)):
+            executor.submit(PDFBatchService._run_item, job_id, index)
+        return PDFBatchService.get_job(job_id)
+
+    @staticmethod
+    def get_job(job_id):
+        """İş durumunu ve ilerleme özetini döndürür (yoksa None)"""
+        job = get_job_store().get(f"pdf_batch:{job_id}")
+        if job is None:
+            return None
+
+        counts = {}
+        for item in job['items']:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        done = sum(count for status, count in counts.items() if status not in ('queued', 'running'))
+        job['progress'] = {
+            'total': len(job['items']),
+            'done': done,
+            'counts': counts
+        }
+        return job
+
+    @staticmethod
+    def _run_item(job_id, index):
+        with PDFBatchService._lock:
+            job = PDFBatchService._jobs[job_id]
+            item = job['items'][index]
+
+        try:
+            with PDFBatchService._lock:
+                item['status'] = 'running'
+                job['status'] = 'running'
+                PDFBatchService._save(job)
+            result = PDFBatchService._download_with_retry(item['scopus_id'])
+        except Exception as e:
+            # Beklenmeyen bir hata işi 'running' durumunda bırakmamalı
+            logger.exception("Toplu indirme öğesi başarısız (%s): %s", item['scopus_id'], e)
+            result = {'status': 'error', 'message': str(e)}
+
+        with PDFBatchService._lock:
+            item['status'] = result['status']
+            for key in ('filename', 'path', 'url', 'message'):
+                if result.get(key):
+                    item[key] = result[key]
+            if all(i['status'] not in ('queued', 'running') for i in job['items']):
+                job['status'] = 'finished'
+                job['finished_at'] = time.time()
+                PDFBatchService._jobs.pop(job_id, None)
+            PDFBatchService._save(job)
+
+    @staticmethod
+    def _download_with_retry(scopus_id):
+        """İstek bütçesi dolduğunda Retry-After kadar bekleyip yeniden dener"""
+        for _ in range(Config.PDF_BATCH_MAX_RETRIES + 1):
+            try:
+                return PDFService.download_pdf(scopus_id, priority=PRIORITY_BACKGROUND)
+            except RateLimitExceeded as e:
+                time.sleep(e.retry_after)
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+        return {'status': 'error', 'message': 'API istek limiti nedeniyle indirilemedi'}
+
+    @staticmethod
+    def _save(job):
+        try:
+            get_job_store().set(f"pdf_batch:{job['job_id']}", job, ttl=Config.PDF_BATCH_JOB_TTL)
+        except sqlite3.Error as e:
+            # Yazılamayan ara durum bir sonraki kayıtta güncellenir
+            logger.warning("Toplu indirme işi kaydedilemedi (%s): %s", job['job_id'], e)
+
+    @staticmethod
+    def _get_executor():
+        if PDFBatchService._executor is None:
+            with PDFBatchService._lock:
+                if PDFBatchService._executor is None:
+                    PDFBatchService._executor = ThreadPoolExecutor(
+                        max_workers=Config.PDF_BATCH_WORKERS,
+                        thread_name_prefix='pdf-batch'
+                    )
+        return PDFBatchService._executor
+
+    @staticmethod
+    def shutdown():
+        """
+        Kapanışta çalışan indirmelerin bitmesini bekler; henüz başlamamış
+        öğeler iptal edilir ve iş durumunda 'queued' olarak kalır.
+        """
+        with PDFBatchService._lock:
+            executor, PDFBatchService._executor = PDFBatchService._executor, None
+        if executor is not None:
+            shutdown_executor(executor, wait=True)
+
+    @staticmethod
+    def iter_zip(job):
+        """
+        İşin tamamlanan PDF'lerini ZIP olarak parça parça üretir.
+        Dosyalar okunurken akıtılır; bellekte tüm arşiv tutulmaz.
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            for item in job['items']:
+                path = item.get('path')
+                if item['status'] != 'success' or not path or not os.path.exists(path):
+                    continue
+                with open(path, 'rb') as source, archive.open(item['filename'], mode='w', force_zip64=True) as target:
+                    for chunk in iter(lambda: source.read(Config.PDF_CHUNK_SIZE), b''):
+                        target.write(chunk)
+                        yield stream.pop()
+                yield stream.pop()
+        yield stream.pop()
+
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """
+    Toplu indirme işlerinin durum deposu. Genel önbellekten ayrı bir SQLite
+    dosyasıdır; böylece CACHE_BACKEND=memory iken de işi başlatan worker'dan
+    farklı bir worker durum ve ZIP isteklerini cevaplayabilir.
+    """
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = create_cache(
+                    'sqlite',
+                    Config.PDF_BATCH_JOBS_PATH,
+                    Config.PDF_BATCH_MAX_JOBS,
+                    default_ttl=Config.PDF_BATCH_JOB_TTL
+                )
+    return _job_store
+
+
+class _ZipStream:
+    """zipfile için yalnızca yazılabilen, seek desteklemeyen tampon"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
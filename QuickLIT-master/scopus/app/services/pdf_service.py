@@ -1,163 +1,583 @@
 import os
-import requests
+import logging
 import mimetypes
+from urllib.parse import quote
 from xml.etree import ElementTree as ET
 from ..config import Config
-import traceback
+from .http_client import HTTPClient
+from .cache_service import get_cache
+from .executors import shutdown_executor
+from .rate_limiter import RateLimitExceeded, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .pdf_store import get_pdf_store
+from .metadata_store import get_metadata_store
+from .local_search import LocalSearchService
+from .single_flight import SingleFlight
+from .articles import Article, ABSTRACT_FIELDS, field_param, loads
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+
+class PDFDownloadAborted(Exception):
+    """Akış halindeki bir indirmenin bilinçli olarak bırakıldığını belirtir"""
+
+
+class PDFEndpointUnavailable(Exception):
+    """Endpoint geçici olarak yanıt veremedi (429/5xx); makalenin PDF'i olmadığı anlamına gelmez"""
+
+
+def is_transient_status(status_code):
+    """Yeniden denendiğinde farklı sonuç verebilecek upstream yanıtı"""
+    return status_code == 429 or status_code >= 500
+
+
+class PDFDownloadSink:
+    """
+    Akış halinde gelen PDF parçalarını geçici bir dosyaya yazar.
+
+    İlk parçada %PDF imzası yoksa (ör. HTML hata sayfası) ya da boyut
+    PDF_MAX_BYTES'ı aşarsa PDFDownloadAborted fırlatır; böylece indirme hemen
+    bırakılır ve bellek kullanımı dosya boyutundan bağımsız kalır.
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(dir=Config.ARTICLES_FOLDER, suffix='.part')
+        self._file = os.fdopen(fd, 'wb')
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self.size = 0
+
+    def write(self, chunk):
+        if not chunk:
+            return
+        if len(self._head) < 1024:
+            self._head += chunk[:1024 - len(self._head)]
+            if len(self._head) >= 5 and b'%PDF' not in self._head:
+                raise PDFDownloadAborted("içerik PDF değil")
+        self.size += len(chunk)
+        if self.size > Config.PDF_MAX_BYTES:
+            raise PDFDownloadAborted(f"boyut sınırı aşıldı ({Config.PDF_MAX_BYTES} bytes)")
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self):
+        """Dosyayı kapatır; geçerli bir PDF ise yolunu, özetini ve boyutunu döndürür"""
+        self._file.close()
+        if self.size <= 1000 or b'%PDF' not in self._head:
+            raise PDFDownloadAborted("içerik geçerli bir PDF değil")
+        logger.debug("İndirilen dosya boyutu: %d bytes", self.size)
+        return {'path': self.path, 'sha256': self._digest.hexdigest(), 'size': self.size}
+
+    def discard(self):
+        self._file.close()
+        PDFService._remove_quietly(self.path)
+
+
+# Abstract retrieval'ın kabul ettiği kimlik türleri (/content/abstract/<tür>/<değer>)
+ID_TYPES = ('scopus_id', 'eid', 'doi', 'pii')
+
 
 class PDFService:
+    _race_executor = None
+    _metadata_executor = None
+    _lock = threading.Lock()
+    # Aynı makale için süren indirme / meta veri isteğine sonradan gelenler katılır
+    _download_flight = SingleFlight('pdf_download')
+    _metadata_flight = SingleFlight('scopus_abstract')
+
+    @staticmethod
+    def download_pdf(scopus_id, priority=PRIORITY_INTERACTIVE):
+        result = PDFService._stored_result(scopus_id)
+        if result is not None:
+            return result
+        return PDFService._download_flight.do(scopus_id, PDFService._download_pdf, scopus_id, priority)
+
     @staticmethod
-    def download_pdf(scopus_id):
+    def _stored_result(scopus_id):
+        """PDF depodaysa ya da kayıtlı negatif sonuç varsa Elsevier'e gitmeden sonucu döndürür"""
+        cached = PDFService.find_stored_pdf(scopus_id)
+        if cached is not None:
+            logger.info("PDF depodan sunuluyor: %s (%d bytes)", scopus_id, cached['size'])
+            return {"status": "success", "filename": f'article_{scopus_id}.pdf', "path": cached['path'],
+                    "cached": True}
+
+        # Daha önce PDF bulunamadıysa, süresi dolana kadar doğrudan yönlendir
+        negative = get_pdf_store().get_negative(scopus_id)
+        if negative is not None:
+            logger.info("Kayıtlı negatif sonuç, yönlendiriliyor: %s", negative['url'])
+            return {"status": "redirect", "url": negative['url'], "message": negative['message']}
+        return None
+
+    @staticmethod
+    def _download_pdf(scopus_id, priority):
+        # Önceki indirme, bu istek depoya bakıp buraya gelene kadar bitmiş olabilir
+        result = PDFService._stored_result(scopus_id)
+        if result is not None:
+            return result
+
         pdf_filename = f'article_{scopus_id}.pdf'
-        
-        # Klasörün varlığını kontrol et ve oluştur
-        if not os.path.exists(Config.ARTICLES_FOLDER):
-            try:
-                os.makedirs(Config.ARTICLES_FOLDER)
-                print(f"ARTICLES_FOLDER oluşturuldu: {Config.ARTICLES_FOLDER}")
-            except Exception as e:
-                print(f"Klasör oluşturma hatası: {e}")
+        store = get_pdf_store()
+        temp_path = None
+        try:
+            # Önce makale meta verilerini al (önbellekte yoksa Scopus API'den)
+            metadata, status_code = PDFService._get_metadata(scopus_id, priority)
+            if metadata is None:
                 return {
                     "status": "error",
-                    "message": f"PDF dosyaları için klasör oluşturulamadı: {str(e)}"
+                    "message": f"Scopus API'den makale bilgileri alınamadı (Kod: {status_code})"
                 }
-        
-        pdf_path = os.path.join(Config.ARTICLES_FOLDER, pdf_filename)
-        print(f"PDF indirilecek yol: {pdf_path}")
 
-        try:
-            # Önce Scopus API üzerinden meta verileri al
-            headers = {
-                "X-ELS-APIKey": Config.API_KEY,
-                "Accept": "application/json"
+            doi = metadata.doi
+            pii = metadata.pii
+
+            logger.debug("Makale bilgileri: DOI=%s, PII=%s, Başlık=%s", doi, pii, metadata.title)
+
+            # Aynı DOI/PII'ye sahip PDF başka bir kimlikle indirilmiş olabilir
+            cached = store.lookup(doi=doi, pii=pii)
+            if cached is not None:
+                store.put_alias(scopus_id, cached['sha256'], doi, pii, cached['source_endpoint'])
+                return {"status": "success", "filename": pdf_filename, "path": cached['path'], "cached": True}
+
+            # Farklı API endpointlerini dene (geçmişte en çok kazanan önce)
+            endpoints = PDFService.candidate_endpoints(scopus_id, metadata)
+
+            if Config.PDF_RACE_ENDPOINTS and len(endpoints) > 1:
+                winner, download, definitive = PDFService._race_endpoints(endpoints, priority)
+            else:
+                winner, download, definitive = PDFService._try_sequential(endpoints, priority)
+
+            if winner is not None:
+                temp_path = download['path']
+                pdf_path = PDFService.save_download(scopus_id, metadata, winner['name'], download)
+                temp_path = None
+                return {"status": "success", "filename": pdf_filename, "path": pdf_path, "cached": False}
+
+            # Hiçbir endpoint çalışmadıysa, makale sayfasına yönlendir
+            return PDFService.redirect_result(scopus_id, metadata, remember=definitive)
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("PDF indirme hatası: %s", e)
+            return {
+                "status": "error",
+                "message": f"PDF indirme hatası: {str(e)}"
             }
-            metadata_url = f"https://api.elsevier.com/content/abstract/scopus_id/{scopus_id}"
-            
-            print(f"Metadata URL: {metadata_url}")
-            metadata_response = requests.get(metadata_url, headers=headers, timeout=30)
-            
-            if metadata_response.status_code != 200:
-                print(f"Metadata API yanıt kodu: {metadata_response.status_code}")
-                print(f"Metadata API yanıtı: {metadata_response.text}")
-                return {
-                    "status": "error",
-                    "message": f"Scopus API'den makale bilgileri alınamadı (Kod: {metadata_response.status_code})"
+        finally:
+            if temp_path is not None:
+                PDFService._remove_quietly(temp_path)
+
+    @staticmethod
+    def candidate_endpoints(scopus_id, metadata):
+        """Denenecek endpoint'leri, yayıncı için geçmişte en çok kazanan önce olacak şekilde döndürür"""
+        endpoints = PDFService._build_endpoints(scopus_id, metadata.doi, metadata.pii)
+        return PDFService._order_endpoints(PDFService._publisher_key(metadata), endpoints)
+
+    @staticmethod
+    def save_download(scopus_id, metadata, endpoint_name, download):
+        """İndirilen geçici dosyayı depoya alır, kazanan endpoint'i kaydeder ve yolu döndürür"""
+        publisher = PDFService._publisher_key(metadata)
+        pdf_path = get_pdf_store().put(
+            download['path'], download['sha256'], scopus_id,
+            metadata.doi, metadata.pii, endpoint_name
+        )
+        PDFService._record_win(publisher, endpoint_name)
+        LocalSearchService.schedule(download['sha256'])
+        logger.info("PDF başarıyla indirildi (%s endpoint'i, yayıncı: %s)", endpoint_name, publisher)
+        return pdf_path
+
+    @staticmethod
+    def redirect_result(scopus_id, metadata, remember=True):
+        """
+        PDF indirilemediğinde yönlendirme sonucunu oluşturur. Yönlendirilecek
+        adres yoksa hata fırlatır. `remember` ile sonuç negatif sonuç olarak
+        kaydedilir; yalnızca tüm endpoint'ler kesin yanıt verdiyse (PDF yok)
+        kullanılmalıdır, geçici hatalarda sonraki istek yeniden dener.
+        """
+        doi = metadata.doi
+        title = metadata.title
+        scopus_url = metadata.scopus_url
+
+        if scopus_url:
+            logger.info("PDF indirilemedi, Scopus URL'sine yönlendirilecek: %s", scopus_url)
+            result = {
+                "status": "redirect",
+                "url": scopus_url,
+                "message": f"'{title}' başlıklı makale için PDF doğrudan indirilemedi. Makale sayfasına yönlendiriliyorsunuz."
+            }
+        elif doi:
+            logger.info("PDF indirilemedi, DOI'ye yönlendirilecek: %s", doi)
+            result = {
+                "status": "redirect",
+                "url": f"https://doi.org/{doi}",
+                "message": f"'{title}' başlıklı makale için PDF doğrudan indirilemedi. DOI sayfasına yönlendiriliyorsunuz."
+            }
+        else:
+            logger.warning("PDF indirilemedi, yönlendirilecek URL bulunamadı: %s", scopus_id)
+            raise Exception("Makale için indirme bağlantısı bulunamadı. Lütfen Scopus üzerinden erişmeyi deneyin.")
+
+        if remember:
+            get_pdf_store().put_negative(scopus_id, result['url'], result['message'])
+        return result
+
+    @staticmethod
+    def find_stored_pdf(scopus_id):
+        """
+        Depodaki PDF'i döndürür. Eski sürümün `article_{scopus_id}.pdf` olarak
+        kaydettiği dosyalar bulunursa depoya taşınır.
+        """
+        store = get_pdf_store()
+        cached = store.lookup(scopus_id=scopus_id)
+        if cached is not None:
+            return cached
+
+        legacy_path = os.path.join(Config.ARTICLES_FOLDER, f'article_{scopus_id}.pdf')
+        if os.path.exists(legacy_path) and PDFService._is_valid_pdf(legacy_path):
+            try:
+                store.import_file(legacy_path, scopus_id)
+                cached = store.lookup(scopus_id=scopus_id)
+                if cached is not None:
+                    LocalSearchService.schedule(cached['sha256'])
+                return cached
+            except OSError as e:
+                logger.warning("Eski PDF depoya taşınamadı (%s): %s", legacy_path, e)
+        return None
+
+    @staticmethod
+    def _get_metadata(scopus_id, priority=PRIORITY_INTERACTIVE):
+        """
+        Makalenin DOI, PII, başlık ve Scopus bağlantısını döndürür.
+        Önce yerel meta veri deposuna bakılır; hata durumunda (None, durum kodu) döner.
+        """
+        return PDFService.lookup_metadata('scopus_id', scopus_id, priority)
+
+    @staticmethod
+    def identifier_type(value):
+        """Makale kimliğinin türü: EID (2-s2.0-...), DOI (10.x/...), Scopus ID (rakam) ya da PII"""
+        if value.startswith('2-s2.0-'):
+            return 'eid'
+        if value.startswith('10.') and '/' in value:
+            return 'doi'
+        if value.isdigit():
+            return 'scopus_id'
+        return 'pii'
+
+    @staticmethod
+    def lookup_metadata(id_type, value, priority=PRIORITY_INTERACTIVE):
+        """
+        `id_type` (scopus_id, eid, doi, pii) ile makale kaydını döndürür:
+        (Article, 200) ya da (None, durum kodu). Abstract retrieval'a yalnızca
+        meta veri deposunda taze kayıt yoksa gidilir.
+        """
+        cached = PDFService.get_cached_metadata(value, id_type)
+        if cached is not None:
+            return cached, 200
+        return PDFService._metadata_flight.do(f'{id_type}:{value}', PDFService._fetch_metadata,
+                                              id_type, value, priority)
+
+    @staticmethod
+    def _fetch_metadata(id_type, value, priority):
+        cached = PDFService.get_cached_metadata(value, id_type)
+        if cached is not None:
+            return cached, 200
+
+        metadata_url, headers = PDFService.build_metadata_request(value, id_type)
+
+        logger.debug("Metadata URL: %s", metadata_url)
+        metadata_response = HTTPClient.get(
+            metadata_url,
+            headers=headers,
+            timeout=30,
+            upstream='scopus_abstract',
+            priority=priority
+        )
+
+        if metadata_response.status_code != 200:
+            logger.warning("Metadata API yanıt kodu: %s", metadata_response.status_code)
+            logger.debug("Metadata API yanıtı: %s", metadata_response.text)
+            return None, metadata_response.status_code
+
+        scopus_id = value if id_type == 'scopus_id' else None
+        return PDFService.store_metadata(scopus_id, loads(metadata_response.content)), 200
+
+    @staticmethod
+    def get_cached_metadata(value, id_type='scopus_id'):
+        """Meta veri deposundaki taze Article kaydı (yoksa None)"""
+        return get_metadata_store().get(**{id_type: value})
+
+    @staticmethod
+    def build_metadata_request(value, id_type='scopus_id'):
+        """Abstract retrieval isteğinin (url, headers) ikilisini döndürür"""
+        headers = {
+            "X-ELS-APIKey": Config.API_KEY,
+            "Accept": "application/json"
+        }
+        url = f"{Config.ELSEVIER_API_URL}/content/abstract/{id_type}/{quote(str(value), safe='/')}"
+        fields = field_param(ABSTRACT_FIELDS)
+        if fields:
+            url += f"?field={fields}"
+        return url, headers
+
+    @staticmethod
+    def store_metadata(scopus_id, response_json):
+        """
+        Abstract retrieval yanıtını Article kaydına çevirir ve meta veri
+        deposuna yazar. Yanıttaki kimlik istenenden farklıysa (birleştirilmiş
+        kayıt) istenen scopus_id de aynı kayda eşlenir.
+        """
+        article = Article.from_abstract(response_json)
+        articles = [article]
+        if scopus_id and str(scopus_id) != article.scopus_id:
+            if article.scopus_id:
+                articles.append(Article(*article.to_row()))
+            articles[0].scopus_id = str(scopus_id)
+        try:
+            get_metadata_store().upsert_many(articles, 'abstract')
+        except sqlite3.Error as e:
+            logger.warning("Makale meta verisi depoya yazılamadı (%s): %s", scopus_id, e)
+        return article
+
+    @staticmethod
+    def prefetch_metadata(scopus_ids):
+        """Depoda olmayan makalelerin meta verisini arka planda, düşük öncelikle getirir"""
+        executor = PDFService._get_metadata_executor()
+        for scopus_id in scopus_ids:
+            executor.submit(PDFService._prefetch_metadata, scopus_id)
+
+    @staticmethod
+    def _prefetch_metadata(scopus_id):
+        try:
+            PDFService._get_metadata(scopus_id, PRIORITY_BACKGROUND)
+        except Exception as e:
+            logger.debug("Meta veri ön yüklemesi başarısız (%s): %s", scopus_id, e)
+
+    @staticmethod
+    def _build_endpoints(scopus_id, doi, pii):
+        endpoints = []
+
+        # 1. Doğrudan PDF endpoint'i
+        if doi:
+            endpoints.append({
+                'name': 'doi',
+                'url': f"{Config.ELSEVIER_API_URL}/content/article/doi/{doi}",
+                'headers': {
+                    "X-ELS-APIKey": Config.API_KEY,
+                    "Accept": "application/pdf"
                 }
-                
-            metadata = metadata_response.json()
-
-            # Makale bilgilerini al
-            abstract_data = metadata.get('abstracts-retrieval-response', {})
-            coredata = abstract_data.get('coredata', {})
-            doi = coredata.get('prism:doi')
-            pii = coredata.get('pii')
-            title = coredata.get('dc:title', 'Unknown Title')
-            
-            print(f"Makale bilgileri: DOI={doi}, PII={pii}, Başlık={title}")
-            
-            # Scopus URL'ini al
-            scopus_url = None
-            links = abstract_data.get('link', [])
-            for link in links:
-                if isinstance(link, dict) and link.get('@rel') == 'scopus':
-                    scopus_url = link.get('@href')
-                    break
-
-            # Farklı API endpointlerini dene
-            endpoints = []
-            
-            # 1. Doğrudan PDF endpoint'i
-            if doi:
-                endpoints.append({
-                    'url': f"https://api.elsevier.com/content/article/doi/{doi}",
-                    'headers': {
-                        "X-ELS-APIKey": Config.API_KEY,
-                        "Accept": "application/pdf"
-                    }
-                })
-            
-            # 2. ScienceDirect API endpoint'i
-            if pii:
-                endpoints.append({
-                    'url': f"https://api.elsevier.com/content/article/pii/{pii}",
-                    'headers': {
-                        "X-ELS-APIKey": Config.API_KEY,
-                        "Accept": "application/pdf"
-                    }
-                })
-            
-            # 3. Scopus ID ile deneme
+            })
+
+        # 2. ScienceDirect API endpoint'i
+        if pii:
             endpoints.append({
-                'url': f"https://api.elsevier.com/content/article/scopus_id/{scopus_id}",
+                'name': 'pii',
+                'url': f"{Config.ELSEVIER_API_URL}/content/article/pii/{pii}",
                 'headers': {
                     "X-ELS-APIKey": Config.API_KEY,
-                    "Accept": "application/pdf",
-                    "X-ELS-ResourceVersion": "FULL"
+                    "Accept": "application/pdf"
                 }
             })
 
-            success = False
-            for endpoint in endpoints:
+        # 3. Scopus ID ile deneme
+        endpoints.append({
+            'name': 'scopus_id',
+            'url': f"{Config.ELSEVIER_API_URL}/content/article/scopus_id/{scopus_id}",
+            'headers': {
+                "X-ELS-APIKey": Config.API_KEY,
+                "Accept": "application/pdf",
+                "X-ELS-ResourceVersion": "FULL"
+            }
+        })
+        return endpoints
+
+    @staticmethod
+    def _fetch_endpoint(endpoint, cancel_event=None, priority=PRIORITY_INTERACTIVE):
+        """
+        Endpoint'ten gelen PDF'i sabit boyutlu parçalar halinde geçici bir dosyaya
+        akıtır. Geçerli bir PDF gelirse geçici dosyanın yolunu, SHA-256 özetini
+        ve boyutunu, endpoint kesin olarak PDF vermediyse (4xx, PDF olmayan
+        içerik, boyut sınırı) None döndürür. 429/5xx yanıtlarında
+        PDFEndpointUnavailable, bağlantı hatalarında requests hatası fırlatır.
+        """
+        logger.debug("Endpoint deneniyor: %s", endpoint['url'])
+        response = HTTPClient.get(
+            endpoint['url'],
+            headers=endpoint['headers'],
+            timeout=30,
+            upstream='scopus_article',
+            priority=priority,
+            stream=True
+        )
+
+        with response:
+            logger.debug("API yanıt kodu: %s", response.status_code)
+            if is_transient_status(response.status_code):
+                raise PDFEndpointUnavailable(f"HTTP {response.status_code}")
+            if response.status_code != 200:
+                return None
+
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > Config.PDF_MAX_BYTES:
+                logger.warning("PDF boyutu sınırı aşıyor: %s bytes", content_length)
+                return None
+
+            sink = PDFDownloadSink()
+            try:
+                for chunk in response.iter_content(chunk_size=Config.PDF_CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise PDFDownloadAborted("başka bir endpoint kazandı")
+                    sink.write(chunk)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PDFDownloadAborted("başka bir endpoint kazandı")
+                return sink.finish()
+            except BaseException as e:
+                sink.discard()
+                if isinstance(e, PDFDownloadAborted):
+                    logger.info("İndirme bırakıldı (%s): %s", endpoint['name'], e)
+                    return None
+                raise
+
+    @staticmethod
+    def _try_sequential(endpoints, priority=PRIORITY_INTERACTIVE):
+        """
+        Endpoint'leri sırayla dener: (kazanan, indirme, kesin) döndürür. `kesin`,
+        kazanan yoksa tüm endpoint'lerin PDF olmadığını kesin olarak bildirip
+        bildirmediğidir (geçici hata alınan endpoint varsa False).
+        """
+        definitive = True
+        for endpoint in endpoints:
+            try:
+                download = PDFService._fetch_endpoint(endpoint, priority=priority)
+                if download is not None:
+                    return endpoint, download, True
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                definitive = False
+                logger.warning("Endpoint hatası (%s): %s", endpoint['url'], e, exc_info=True)
+        return None, None, definitive
+
+    @staticmethod
+    def _race_endpoints(endpoints, priority=PRIORITY_INTERACTIVE):
+        """
+        Tüm endpoint'leri aynı anda dener; geçerli PDF döndüren ilk yanıt kazanır,
+        geri kalan indirmeler bir sonraki parçada bırakılır. _try_sequential
+        gibi (kazanan, indirme, kesin) döndürür.
+        """
+        cancel_event = threading.Event()
+        executor = PDFService._get_race_executor()
+        futures = {executor.submit(PDFService._fetch_endpoint, endpoint, cancel_event, priority): endpoint
+                   for endpoint in endpoints}
+        winner = None
+        rate_limit_error = None
+        definitive = True
+        try:
+            for future in as_completed(futures):
+                endpoint = futures[future]
                 try:
-                    print(f"Endpoint deneniyor: {endpoint['url']}")
-                    response = requests.get(endpoint['url'], headers=endpoint['headers'], timeout=30)
-                    
-                    print(f"API yanıt kodu: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        content_type = response.headers.get('Content-Type', '')
-                        print(f"İçerik türü: {content_type}")
-                        
-                        # PDF içeriğini kaydet
-                        with open(pdf_path, 'wb') as f:
-                            f.write(response.content)
-                        
-                        # Dosya boyutu kontrolü
-                        file_size = os.path.getsize(pdf_path)
-                        print(f"İndirilen dosya boyutu: {file_size} bytes")
-                        
-                        if file_size > 1000 and (content_type.startswith('application/pdf') or PDFService._is_pdf_content(response.content[:5])):
-                            success = True
-                            print("PDF başarıyla indirildi.")
-                            return {"status": "success", "filename": pdf_filename}
-                        else:
-                            print("İndirilen dosya geçerli bir PDF değil.")
-                            if os.path.exists(pdf_path):
-                                os.remove(pdf_path)
-                    
+                    download = future.result()
+                except RateLimitExceeded as e:
+                    rate_limit_error = e
+                    continue
                 except Exception as e:
-                    print(f"Endpoint hatası ({endpoint['url']}): {str(e)}")
-                    traceback.print_exc()
+                    definitive = False
+                    logger.warning("Endpoint hatası (%s): %s", endpoint['url'], e)
                     continue
+                if download is not None:
+                    winner = future
+                    return endpoint, download, True
+        finally:
+            cancel_event.set()
+            for future in futures:
+                if future is not winner and not future.cancel():
+                    future.add_done_callback(PDFService._discard_race_result)
 
-            # Hiçbir endpoint çalışmadıysa, makale sayfasına yönlendir
-            if scopus_url:
-                print(f"PDF indirilemedi, Scopus URL'sine yönlendirilecek: {scopus_url}")
-                return {
-                    "status": "redirect",
-                    "url": scopus_url,
-                    "message": f"'{title}' başlıklı makale için PDF doğrudan indirilemedi. Makale sayfasına yönlendiriliyorsunuz."
-                }
-            elif doi:
-                print(f"PDF indirilemedi, DOI'ye yönlendirilecek: {doi}")
-                return {
-                    "status": "redirect",
-                    "url": f"https://doi.org/{doi}",
-                    "message": f"'{title}' başlıklı makale için PDF doğrudan indirilemedi. DOI sayfasına yönlendiriliyorsunuz."
-                }
-            else:
-                print("PDF indirilemedi, yönlendirilecek URL bulunamadı.")
-                raise Exception("Makale için indirme bağlantısı bulunamadı. Lütfen Scopus üzerinden erişmeyi deneyin.")
+        if rate_limit_error is not None:
+            raise rate_limit_error
+        return None, None, definitive
 
-        except Exception as e:
-            print(f"PDF indirme hatası: {str(e)}")
-            traceback.print_exc()
-            if os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            return {
-                "status": "error",
-                "message": f"PDF indirme hatası: {str(e)}"
-            }
+    @staticmethod
+    def _discard_race_result(future):
+        """Kaybeden bir yarışçının geçici dosyası kaldıysa siler"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result():
+            PDFService._remove_quietly(future.result()['path'])
+
+    @staticmethod
+    def _remove_quietly(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _get_race_executor():
+        if PDFService._race_executor is None:
+            with PDFService._lock:
+                if PDFService._race_executor is None:
+                    PDFService._race_executor = ThreadPoolExecutor(
+                        max_workers=Config.PDF_RACE_WORKERS,
+                        thread_name_prefix='pdf-race'
+                    )
+        return PDFService._race_executor
+
+    @staticmethod
+    def _get_metadata_executor():
+        if PDFService._metadata_executor is None:
+            with PDFService._lock:
+                if PDFService._metadata_executor is None:
+                    PDFService._metadata_executor = ThreadPoolExecutor(
+                        max_workers=Config.METADATA_PREFETCH_WORKERS,
+                        thread_name_prefix='metadata-prefetch'
+                    )
+        return PDFService._metadata_executor
+
+    @staticmethod
+    def shutdown():
+        """Kapanışta süren endpoint yarışlarının bitmesini bekler, meta veri ön yüklemelerini iptal eder"""
+        with PDFService._lock:
+            executor, PDFService._race_executor = PDFService._race_executor, None
+            prefetch, PDFService._metadata_executor = PDFService._metadata_executor, None
+        if prefetch is not None:
+            shutdown_executor(prefetch)
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _publisher_key(metadata):
+        """
+        Endpoint istatistikleri için yayıncı anahtarı. DOI ön eki (ör. 10.1016)
+        yayıncıyı belirler ve arama ile abstract kayıtlarının ikisinde de
+        bulunur; yayıncı adı yalnızca abstract'tan geldiği için yalnızca DOI
+        yoksa kullanılır.
+        """
+        if metadata.doi and metadata.doi.strip():
+            return metadata.doi.strip().split('/')[0].lower()
+        if metadata.publisher:
+            return metadata.publisher.strip().lower()
+        return 'unknown'
+
+    @staticmethod
+    def _order_endpoints(publisher, endpoints):
+        wins = get_cache().get(f"pdf_endpoint_wins:{publisher}") or {}
+        return sorted(endpoints, key=lambda endpoint: -wins.get(endpoint['name'], 0))
+
+    @staticmethod
+    def _record_win(publisher, endpoint_name):
+        cache_key = f"pdf_endpoint_wins:{publisher}"
+        with PDFService._lock:
+            wins = get_cache().get(cache_key) or {}
+            wins[endpoint_name] = wins.get(endpoint_name, 0) + 1
+            get_cache().set(cache_key, wins, ttl=Config.PDF_ENDPOINT_STATS_TTL)
+
+    @staticmethod
+    def endpoint_stats(publisher):
+        """Yayıncı için hangi endpoint'in kaç kez kazandığını döndürür"""
+        return get_cache().get(f"pdf_endpoint_wins:{publisher}") or {}
 
     @staticmethod
     def _is_pdf_content(content):
@@ -172,7 +592,7 @@ class PDFService:
                 header = f.read(1024)
                 return header.startswith(b'%PDF')
         except Exception as e:
-            print(f"PDF doğrulama hatası: {str(e)}")
+            logger.warning("PDF doğrulama hatası: %s", e)
             return False
 
     @staticmethod
@@ -191,5 +611,5 @@ class PDFService:
                 if link.attrib.get('rel') == 'scopus' or link.attrib.get('rel') == 'full-text':
                     return link.attrib.get('{http://www.w3.org/1999/xlink}href')
         except ET.ParseError as e:
-            print(f"XML parse hatası: {str(e)}")
+            logger.warning("XML parse hatası: %s", e)
         return None
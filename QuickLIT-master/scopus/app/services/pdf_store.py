@@ -0,0 +1,271 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from ..config import Config
+
+
+class PDFStore:
+    """
+    İndirilen PDF'ler için SHA-256 içerik adresli disk deposu.
+
+    Dosyalar `<root>/<sha[:2]>/<sha>.pdf` altında tutulur. SQLite dizini
+    scopus_id/DOI/PII'yi dosyaya eşler, boyut, erişim zamanı ve kaynak
+    endpoint'i saklar. PDF'ten çıkarılmış `<sha>.txt` metinleri de kotaya
+    sayılır (`record_text`); toplam boyut `max_bytes`'ı aşarsa en uzun süredir
+    erişilmeyen dosyalar metinleriyle birlikte silinir.
+    PDF'i olmayan makaleler için yönlendirme adresi de ("negatif sonuç")
+    belirli bir süreliğine kaydedilir.
+    """
+
+    def __init__(self, root, index_path, max_bytes, negative_ttl):
+        self.root = root
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self._local = threading.local()
+        self._evict_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                last_access REAL NOT NULL,
+                source_endpoint TEXT,
+                text_size INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access);
+
+            CREATE TABLE IF NOT EXISTS articles (
+                scopus_id TEXT PRIMARY KEY,
+                doi TEXT,
+                pii TEXT,
+                sha256 TEXT NOT NULL REFERENCES blobs(sha256) ON DELETE CASCADE,
+                source_endpoint TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_doi ON articles(doi);
+            CREATE INDEX IF NOT EXISTS idx_articles_pii ON articles(pii);
+            CREATE INDEX IF NOT EXISTS idx_articles_sha256 ON articles(sha256);
+
+            CREATE TABLE IF NOT EXISTS negatives (
+                scopus_id TEXT PRIMARY KEY,
+                url TEXT,
+                message TEXT,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(blobs)")}
+        if 'text_size' not in columns:
+            # Eski dizin: metin dosyalarının boyutları bir kez taranıp eklenir
+            conn.execute("ALTER TABLE blobs ADD COLUMN text_size INTEGER NOT NULL DEFAULT 0")
+            for sha256 in self.blob_hashes():
+                self.record_text(sha256, evict=False)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, sha256[:2], f"{sha256}.pdf")
+
+    def text_path(self, sha256):
+        """PDF'ten çıkarılan metnin önbellek dosyası"""
+        return os.path.join(self.root, sha256[:2], f"{sha256}.txt")
+
+    def record_text(self, sha256, evict=True):
+        """Çıkarılan metin dosyasının boyutunu dosyanın kotasına ekler"""
+        try:
+            size = os.path.getsize(self.text_path(sha256))
+        except OSError:
+            return
+        self._connect().execute("UPDATE blobs SET text_size = ? WHERE sha256 = ?", (size, sha256))
+        if evict:
+            self.evict()
+
+    def lookup(self, scopus_id=None, doi=None, pii=None):
+        """
+        Verilen kimliklerden biriyle eşleşen kayıtlı PDF'i döndürür (yoksa None).
+        Dosya diskten silinmişse kayıt da temizlenir.
+        """
+        conn = self._connect()
+        row = None
+        for column, value in (('scopus_id', scopus_id), ('doi', doi), ('pii', pii)):
+            if value:
+                row = conn.execute(
+                    "SELECT a.sha256, b.size, b.mtime, a.source_endpoint FROM articles a "
+                    f"JOIN blobs b ON b.sha256 = a.sha256 WHERE a.{column} = ? LIMIT 1",
+                    (value,)
+                ).fetchone()
+                if row:
+                    break
+        if row is None:
+            return None
+
+        sha256, size, mtime, source_endpoint = row
+        path = self.blob_path(sha256)
+        if not os.path.exists(path):
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            return None
+
+        conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+        return {
+            'path': path,
+            'sha256': sha256,
+            'size': size,
+            'mtime': mtime,
+            'source_endpoint': source_endpoint
+        }
+
+    def put(self, temp_path, sha256, scopus_id, doi=None, pii=None, source_endpoint=None):
+        """
+        Geçici dosyayı depoya taşır ve kimlikleri dizine ekler. Aynı içerik zaten
+        varsa geçici dosya silinir. Dosyanın depodaki yolunu döndürür.
+        """
+        path = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+
+        now = time.time()
+        size = os.path.getsize(path)
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO blobs (sha256, size, mtime, last_access, source_endpoint) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(sha256) DO UPDATE SET last_access = excluded.last_access",
+            (sha256, size, now, now, source_endpoint)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO articles (scopus_id, doi, pii, sha256, source_endpoint, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (str(scopus_id), doi, pii, sha256, source_endpoint, now)
+        )
+        conn.execute("DELETE FROM negatives WHERE scopus_id = ?", (str(scopus_id),))
+        self.evict()
+        return path
+
+    def put_alias(self, scopus_id, sha256, doi=None, pii=None, source_endpoint=None):
+        """Depodaki mevcut bir dosyayı yeni bir scopus_id ile ilişkilendirir"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO articles (scopus_id, doi, pii, sha256, source_endpoint, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (str(scopus_id), doi, pii, sha256, source_endpoint, time.time())
+        )
+
+    def import_file(self, file_path, scopus_id, doi=None, pii=None, source_endpoint='legacy'):
+        """Depo dışındaki mevcut bir PDF'i (kopyalayarak değil taşıyarak) depoya alır"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(Config.PDF_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return self.put(file_path, digest.hexdigest(), scopus_id, doi, pii, source_endpoint)
+
+    def blob_hashes(self):
+        """Depodaki tüm dosyaların SHA-256 özetleri"""
+        return {row[0] for row in self._connect().execute("SELECT sha256 FROM blobs")}
+
+    def articles_for(self, hashes):
+        """Verilen dosyalara bağlı makaleler: {sha256: [{'scopus_id', 'doi', 'pii'}, ...]}"""
+        hashes = list(hashes)
+        result = {}
+        conn = self._connect()
+        # SQLite parametre sınırının altında kalmak için parçalara bölünür
+        for offset in range(0, len(hashes), 500):
+            chunk = hashes[offset:offset + 500]
+            rows = conn.execute(
+                f"SELECT sha256, scopus_id, doi, pii FROM articles WHERE sha256 IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY updated_at DESC",
+                chunk
+            )
+            for sha256, scopus_id, doi, pii in rows:
+                result.setdefault(sha256, []).append({'scopus_id': scopus_id, 'doi': doi, 'pii': pii})
+        return result
+
+    def get_negative(self, scopus_id):
+        row = self._connect().execute(
+            "SELECT url, message, expires_at FROM negatives WHERE scopus_id = ?",
+            (str(scopus_id),)
+        ).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        return {'url': row[0], 'message': row[1]}
+
+    def put_negative(self, scopus_id, url, message, ttl=None):
+        ttl = self.negative_ttl if ttl is None else ttl
+        self._connect().execute(
+            "INSERT OR REPLACE INTO negatives (scopus_id, url, message, expires_at) VALUES (?, ?, ?, ?)",
+            (str(scopus_id), url, message, time.time() + ttl)
+        )
+
+    def evict(self):
+        """Disk kotası aşıldıysa en uzun süredir erişilmeyen dosyaları siler"""
+        with self._evict_lock:
+            conn = self._connect()
+            total = conn.execute("SELECT COALESCE(SUM(size + text_size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+
+            victims = []
+            for sha256, size in conn.execute("SELECT sha256, size + text_size FROM blobs ORDER BY last_access ASC"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(sha256)
+                total -= size
+
+            for sha256 in victims:
+                conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                for path in (self.blob_path(sha256), self.text_path(sha256)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            conn.execute("DELETE FROM negatives WHERE expires_at <= ?", (time.time(),))
+            return len(victims)
+
+    def stats(self):
+        conn = self._connect()
+        blobs, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size + text_size), 0) FROM blobs").fetchone()
+        articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        negatives = conn.execute(
+            "SELECT COUNT(*) FROM negatives WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+        return {
+            'blobs': blobs,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'articles': articles,
+            'negatives': negatives
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pdf_store():
+    """Uygulama genelinde paylaşılan PDF deposunu döndürür"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PDFStore(
+                    os.path.join(Config.ARTICLES_FOLDER, 'pdf'),
+                    Config.PDF_STORE_INDEX_PATH,
+                    Config.PDF_STORE_MAX_BYTES,
+                    Config.PDF_NEGATIVE_TTL
+                )
+    return _store
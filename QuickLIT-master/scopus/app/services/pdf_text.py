@@ -0,0 +1,232 @@
+"""
+PDF metin çıkarma.
+
+Çıkarma CPU yoğun olduğu için web worker'larında değil ayrı bir süreç
+havuzunda yapılır (`PDFTextExtractor.extract_text`). Havuz ilk işte açılır,
+uzun süre boşta kalırsa kapatılır. Metin `pypdf` ile çıkarılır; kurulu
+değilse (`pip install pypdf`) çıkarma devre dışıdır ve `available()` False
+döner.
+
+Çıkarılan metin PDF'in yanında `<sha256>.txt` olarak saklanır; özetleme ve
+yerel arama dizinleyicisi aynı dosyayı kullanır, PDF bir kez okunur. Alt
+süreç sayfaları çıkardıkça dosyaya yazar, okuyucu da dosyayı sayfa sayfa
+okur; büyük PDF'lerin metni hiçbir süreçte bütünüyle bellekte tutulmaz.
+"""
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ..config import Config
+from .executors import shutdown_executor
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Satır sonunda bölünmüş sözcükler ("optimiza-\ntion") ve kontrol karakterleri
+_HYPHENATION = re.compile(r'(\w)-\s*\n\s*(\w)')
+_CONTROL = re.compile(r'[\x00-\x08\x0b-\x1f\x7f]')
+_WHITESPACE = re.compile(r'\s+')
+# Metin dosyasında sayfa ayırıcı; normalize_text sayfa içinden kontrol karakterlerini temizler
+PAGE_SEPARATOR = '\f'
+# ProcessPoolExecutor(max_tasks_per_child=) Python 3.11'de geldi; öncesinde havuz elle yenilenir
+_NATIVE_TASKS_PER_CHILD = sys.version_info >= (3, 11)
+
+
+class ExtractionUnavailable(RuntimeError):
+    """pypdf kurulu değil"""
+
+
+def normalize_text(text):
+    """Sayfa metnini dizinleme ve özetleme için sadeleştirir"""
+    text = _HYPHENATION.sub(r'\1\2', text)
+    text = _CONTROL.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def iter_pages(path, max_pages=None):
+    """
+    PDF'in sayfa metinlerini sırayla üretir. Okunamayan sayfalar boş metin
+    olarak döner; dosya hiç açılamazsa hata fırlatılır.
+    """
+    if PdfReader is None:
+        raise ExtractionUnavailable('pypdf kurulu değil')
+
+    reader = PdfReader(path)
+    if reader.is_encrypted:
+        # Yalnızca parolasız (boş parola) şifrelenmiş dosyalar açılabilir
+        reader.decrypt('')
+
+    for index, page in enumerate(reader.pages):
+        if max_pages and index >= max_pages:
+            break
+        try:
+            text = page.extract_text() or ''
+        except Exception as e:
+            logger.debug("Sayfa metni çıkarılamadı (%s, sayfa %d): %s", path, index + 1, e)
+            text = ''
+        yield normalize_text(text)
+
+
+def extract_to_file(path, target, max_pages=None):
+    """
+    Sayfa metinlerini çıkardıkça `target` dosyasına yazar ve (sayfa, karakter)
+    sayısını döndürür. Dosya yarım kalmasın diye önce geçici adla yazılır.
+    Süreç havuzunda çalıştırılabilmesi için modül düzeyinde tanımlıdır.
+    """
+    pages = chars = 0
+    temp_path = f'{target}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for text in iter_pages(path, max_pages):
+                if pages:
+                    f.write(PAGE_SEPARATOR)
+                f.write(text)
+                pages += 1
+                chars += len(text)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return pages, chars
+
+
+def read_pages(target, block_size=64 * 1024):
+    """extract_to_file'ın yazdığı metin dosyasını sayfa sayfa okur"""
+    with open(target, 'r', encoding='utf-8') as f:
+        pending = ''
+        for block in iter(lambda: f.read(block_size), ''):
+            pending += block
+            *pages, pending = pending.split(PAGE_SEPARATOR)
+            yield from pages
+        yield pending
+
+
+class PDFTextExtractor:
+    """Metin çıkarma süreç havuzu (süreç başına bir tane)"""
+
+    _executor = None
+    _pid = None
+    _in_flight = 0
+    _submitted = 0  # Geçerli havuza gönderilen iş sayısı (elle yenileme için)
+    _last_used = 0.0
+    _lock = threading.Lock()
+    _warned = False
+    _text_jobs = {}  # Hedef dosya -> süren extract_to_file işi
+
+    @staticmethod
+    def available():
+        if PdfReader is None and not PDFTextExtractor._warned:
+            PDFTextExtractor._warned = True
+            logger.warning("pypdf kurulu değil; PDF metin çıkarma devre dışı (pip install pypdf)")
+        return PdfReader is not None
+
+    @staticmethod
+    def extract_text(path, target, max_pages=None):
+        """
+        PDF metnini havuzda `target` dosyasına çıkarır; (sayfa, karakter)
+        sayısını veren bir Future döndürür. Aynı dosya için süren bir iş
+        varsa yenisi başlatılmaz, onun Future'ı döndürülür.
+        """
+        if max_pages is None:
+            max_pages = Config.TEXT_EXTRACTION_MAX_PAGES
+        with PDFTextExtractor._lock:
+            future = PDFTextExtractor._text_jobs.get(target)
+            if future is not None:
+                return future
+            try:
+                future = PDFTextExtractor._get_executor().submit(extract_to_file, path, target, max_pages)
+            except BrokenProcessPool:
+                # Bir alt süreç çöktüyse (ör. bellek yetersizliği) havuz yeniden açılır
+                PDFTextExtractor._executor = None
+                future = PDFTextExtractor._get_executor().submit(extract_to_file, path, target, max_pages)
+            PDFTextExtractor._text_jobs[target] = future
+            PDFTextExtractor._in_flight += 1
+            PDFTextExtractor._last_used = time.monotonic()
+        future.add_done_callback(PDFTextExtractor._done)
+        future.add_done_callback(lambda done: PDFTextExtractor._forget(target, done))
+        return future
+
+    @staticmethod
+    def _forget(target, future):
+        with PDFTextExtractor._lock:
+            if PDFTextExtractor._text_jobs.get(target) is future:
+                del PDFTextExtractor._text_jobs[target]
+
+    @staticmethod
+    def _done(future):
+        with PDFTextExtractor._lock:
+            PDFTextExtractor._in_flight -= 1
+            PDFTextExtractor._last_used = time.monotonic()
+
+    @staticmethod
+    def _get_executor():
+        """Havuzu döndürür; çağıran `_lock`'u tutar ve döndürülen havuza bir iş gönderir"""
+        # Fork ile gelen havuz çocuk süreçte kullanılamaz; pid değiştiyse yenisi açılır
+        if PDFTextExtractor._pid != os.getpid():
+            PDFTextExtractor._executor = None
+            PDFTextExtractor._pid = os.getpid()
+            PDFTextExtractor._in_flight = 0
+            PDFTextExtractor._text_jobs = {}
+        elif PDFTextExtractor._executor is not None and PDFTextExtractor._recycle_due():
+            # Eski havuz elindeki işleri bitirip kapanır; yeni işler taze alt süreçlere gider
+            executor, PDFTextExtractor._executor = PDFTextExtractor._executor, None
+            executor.shutdown(wait=False)
+            logger.debug("Metin çıkarma havuzu %d işten sonra yenilendi", PDFTextExtractor._submitted)
+
+        if PDFTextExtractor._executor is None:
+            options = {}
+            if _NATIVE_TASKS_PER_CHILD and Config.TEXT_EXTRACTION_TASKS_PER_CHILD:
+                options['max_tasks_per_child'] = Config.TEXT_EXTRACTION_TASKS_PER_CHILD
+            # Thread'li bir süreçten fork güvenli olmadığı için alt süreçler 'spawn' ile başlatılır
+            PDFTextExtractor._executor = ProcessPoolExecutor(
+                max_workers=Config.TEXT_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                **options
+            )
+            PDFTextExtractor._submitted = 0
+        PDFTextExtractor._submitted += 1
+        return PDFTextExtractor._executor
+
+    @staticmethod
+    def _recycle_due():
+        """
+        3.11 öncesinde alt süreçler tek tek yenilenemediği için havuz, alt süreç
+        başına `TEXT_EXTRACTION_TASKS_PER_CHILD` işe ulaşınca bütünüyle yenilenir.
+        """
+        limit = Config.TEXT_EXTRACTION_TASKS_PER_CHILD
+        return (not _NATIVE_TASKS_PER_CHILD and bool(limit)
+                and PDFTextExtractor._submitted >= limit * max(1, Config.TEXT_EXTRACTION_WORKERS))
+
+    @staticmethod
+    def release_if_idle(idle=None):
+        """Havuz `idle` saniyedir kullanılmıyorsa alt süreçleri kapatır"""
+        idle = Config.TEXT_EXTRACTION_POOL_IDLE if idle is None else idle
+        with PDFTextExtractor._lock:
+            if (PDFTextExtractor._executor is None or PDFTextExtractor._pid != os.getpid()
+                    or PDFTextExtractor._in_flight
+                    or time.monotonic() - PDFTextExtractor._last_used < idle):
+                return False
+            executor, PDFTextExtractor._executor = PDFTextExtractor._executor, None
+        executor.shutdown(wait=False)
+        logger.debug("Metin çıkarma havuzu boşta olduğu için kapatıldı")
+        return True
+
+    @staticmethod
+    def shutdown():
+        with PDFTextExtractor._lock:
+            executor, PDFTextExtractor._executor = PDFTextExtractor._executor, None
+            owned = PDFTextExtractor._pid == os.getpid()
+        if executor is not None and owned:
+            shutdown_executor(executor)
@@ -0,0 +1,205 @@
+import asyncio
+import itertools
+import math
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from ..config import Config
+from .. import metrics
+
+# İstek öncelikleri: küçük değer önce hizmet alır
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+
+class RateLimitExceeded(Exception):
+    """Upstream için istek bütçesi tükendiğinde fırlatılır"""
+
+    def __init__(self, upstream, retry_after):
+        self.upstream = upstream
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        super().__init__(f"{upstream} için istek limiti aşıldı, {self.retry_after} sn sonra tekrar deneyin")
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)  # saniyede eklenen token
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Upstream'in bildirdiği bekleme süresi (monotonic)
+
+    def refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def delay(self, now, ahead=0):
+        """`ahead` kadar istek önde beklerken bir token için gereken süre"""
+        self.refill(now)
+        needed = ahead + 1 - self.tokens
+        wait = needed / self.rate if needed > 0 else 0.0
+        return max(wait, self.blocked_until - now, 0.0)
+
+
+class RateLimiter:
+    """
+    Upstream başına token bucket tabanlı istek zamanlayıcısı.
+
+    Bekleyen istekler önceliğe ve geliş sırasına göre sıralanır. Bir istek,
+    tahmini bekleme süresi kendi `max_wait` süresini aşacaksa hiç beklemeden
+    RateLimitExceeded fırlatır; böylece worker thread'leri uzun süre bloklanmaz
+    ve istemciye doğru bir Retry-After değeri döndürülebilir.
+    """
+
+    def __init__(self, limits):
+        self._limits = dict(limits)
+        self._buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self._waiters = {name: [] for name in limits}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def divide(self, shares):
+        """
+        Bütçeleri `shares` sürece böler. Bucket'lar süreç belleğinde tutulduğu
+        için her gunicorn worker'ı fork'tan sonra kendi payını alır; böylece
+        toplam istek hızı yapılandırılan limitleri aşmaz. Burst en az 1 kalır.
+        """
+        shares = max(int(shares), 1)
+        with self._cond:
+            for name, (rate, burst) in self._limits.items():
+                self._buckets[name] = TokenBucket(rate / shares, max(burst / shares, 1.0))
+            self._cond.notify_all()
+
+    def acquire(self, upstream, priority=PRIORITY_INTERACTIVE, max_wait=None):
+        """Bir token alır ve beklenen süreyi (saniye) döndürür"""
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            return 0.0
+        if max_wait is None:
+            max_wait = Config.RATE_LIMIT_MAX_WAIT if priority <= PRIORITY_INTERACTIVE else Config.RATE_LIMIT_BACKGROUND_MAX_WAIT
+
+        waiter = (priority, next(self._seq))
+        waiters = self._waiters[upstream]
+        started = time.monotonic()
+        deadline = started + max_wait
+
+        with self._cond:
+            waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    ahead = sum(1 for other in waiters if other < waiter)
+                    delay = bucket.delay(now, ahead)
+                    if delay <= 0 and ahead == 0:
+                        bucket.tokens -= 1
+                        metrics.rate_limit_wait.observe(now - started, upstream=upstream)
+                        return now - started
+                    if now + delay > deadline:
+                        metrics.rate_limit_rejections.inc(upstream=upstream)
+                        raise RateLimitExceeded(upstream, delay)
+                    self._cond.wait(max(delay, 0.01))
+            finally:
+                waiters.remove(waiter)
+                self._cond.notify_all()
+
+    async def acquire_async(self, upstream, priority=PRIORITY_INTERACTIVE, max_wait=None):
+        """
+        acquire'ın event loop'u bloklamayan karşılığı. Async çağrılar thread
+        kuyruğuna girmez; kuyrukta bekleyen thread'ler varsa onların arkasında
+        kalır ve token açılana kadar asyncio.sleep ile bekler.
+        """
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            return 0.0
+        if max_wait is None:
+            max_wait = Config.RATE_LIMIT_MAX_WAIT if priority <= PRIORITY_INTERACTIVE else Config.RATE_LIMIT_BACKGROUND_MAX_WAIT
+
+        started = time.monotonic()
+        deadline = started + max_wait
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                ahead = len(self._waiters[upstream])
+                delay = bucket.delay(now, ahead)
+                if delay <= 0 and ahead == 0:
+                    bucket.tokens -= 1
+                    metrics.rate_limit_wait.observe(now - started, upstream=upstream)
+                    return now - started
+            if now + delay > deadline:
+                metrics.rate_limit_rejections.inc(upstream=upstream)
+                raise RateLimitExceeded(upstream, delay)
+            await asyncio.sleep(max(delay, 0.01))
+
+    def observe(self, upstream, response):
+        """
+        Upstream'in döndürdüğü X-RateLimit-Remaining / X-RateLimit-Reset /
+        Retry-After başlıklarını bucket durumuna yansıtır.
+        """
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            return
+
+        headers = response.headers
+        block_for = None
+        retry_after = _parse_retry_after(headers.get('Retry-After'))
+        remaining = headers.get('X-RateLimit-Remaining')
+
+        if response.status_code == 429 or (remaining is not None and remaining.strip() == '0'):
+            block_for = retry_after
+            if block_for is None:
+                reset = headers.get('X-RateLimit-Reset')
+                try:
+                    block_for = max(float(reset) - time.time(), 0.0)
+                except (TypeError, ValueError):
+                    block_for = Config.RATE_LIMIT_DEFAULT_BACKOFF
+        elif retry_after is not None:
+            block_for = retry_after
+
+        if block_for is not None:
+            with self._cond:
+                now = time.monotonic()
+                bucket.refill(now)
+                bucket.tokens = 0.0
+                bucket.blocked_until = max(bucket.blocked_until, now + block_for)
+
+    def retry_after(self, upstream):
+        """Upstream için yeni bir isteğin kabaca kaç saniye sonra yapılabileceği"""
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            return 0
+        with self._cond:
+            delay = bucket.delay(time.monotonic(), len(self._waiters[upstream]))
+        return max(1, int(math.ceil(delay)))
+
+    def status(self):
+        now = time.monotonic()
+        result = {}
+        with self._cond:
+            for name, bucket in self._buckets.items():
+                bucket.refill(now)
+                result[name] = {
+                    'tokens': round(bucket.tokens, 2),
+                    'rate': bucket.rate,
+                    'capacity': bucket.capacity,
+                    'queued': len(self._waiters[name]),
+                    'blocked_for': round(max(bucket.blocked_until - now, 0.0), 2)
+                }
+        return result
+
+
+def _parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+rate_limiter = RateLimiter(Config.RATE_LIMITS)
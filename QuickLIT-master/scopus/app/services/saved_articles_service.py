@@ -0,0 +1,219 @@
+"""
+Kaydedilen makaleler: `users/{uid}/savedArticles/{makale_id}` alt koleksiyonu.
+
+Her makale ayrı bir belgedir (belge kimliği Scopus ID'si); kullanıcı
+belgesi makale sayısıyla büyümez. Listeler `savedAt`'e göre yeniden eskiye
+sunucu tarafında sıralanır ve imleçle (cursor) sayfalanır; yalnızca
+gösterilen sayfanın belgeleri ve alanları okunur. Dergi, tarih, DOI ve
+Scopus bağlantısı Firestore'a yazılmaz; yerel meta veri deposundan eklenir.
+
+Eski `savedArticles` / `saved_articles` dizi alanları kullanıcının ilk sayfa
+isteğinde `ensure_migrated()` ile (ya da `python -m app.migrate_saved_articles`
+ile toplu olarak) taşınır.
+"""
+import base64
+import json
+import logging
+import sqlite3
+from firebase_admin import firestore
+from ..config import Config
+from .. import metrics
+from .cache_service import get_cache
+from .metadata_store import get_metadata_store
+
+logger = logging.getLogger(__name__)
+
+SUBCOLLECTION = 'savedArticles'
+LEGACY_FIELDS = ('savedArticles', 'saved_articles')
+# Liste görünümlerinin kullandığı alanlar (projeksiyon)
+ARTICLE_FIELDS = ('id', 'title', 'author', 'savedAt', 'notes')
+# Firestore yazma grubu (batch) sınırı
+_BATCH_SIZE = 500
+# Taşınmış (ya da eski alanı olmayan) kullanıcıların hatırlanma süresi
+_MIGRATED_TTL = 24 * 3600
+
+
+class InvalidCursor(ValueError):
+    """Çözülemeyen sayfalama imleci"""
+
+
+class SavedArticlesService:
+    @staticmethod
+    def collection(db, uid):
+        return db.collection('users').document(uid).collection(SUBCOLLECTION)
+
+    @staticmethod
+    def page(db, uid, limit=None, cursor=None):
+        """
+        Bir sayfa kaydedilmiş makale döndürür: {'articles': [...], 'next_cursor': str|None}.
+        `savedAt` eşit olan makaleler belge kimliğiyle sıralanır; imleç bu ikiliyi taşır.
+        """
+        limit = max(1, min(limit or Config.SAVED_ARTICLES_PAGE_SIZE, Config.SAVED_ARTICLES_MAX_PAGE_SIZE))
+        if not cursor:
+            SavedArticlesService.ensure_migrated(db, uid)
+        query = (SavedArticlesService.collection(db, uid)
+                 .select(ARTICLE_FIELDS)
+                 .order_by('savedAt', direction=firestore.Query.DESCENDING)
+                 .order_by('__name__', direction=firestore.Query.DESCENDING))
+        if cursor:
+            saved_at, article_id = SavedArticlesService.decode_cursor(cursor)
+            query = query.start_after({'savedAt': saved_at, '__name__': article_id})
+
+        # Bir fazlası okunur: sonraki sayfa olup olmadığı ek sorgu olmadan anlaşılır
+        with metrics.track_call('firestore'):
+            snapshots = list(query.limit(limit + 1).stream())
+
+        snapshots, extra = snapshots[:limit], snapshots[limit:]
+        metadata = SavedArticlesService._metadata(snapshots)
+        articles = [SavedArticlesService._clean(snapshot, metadata.get(snapshot.id)) for snapshot in snapshots]
+        next_cursor = None
+        if extra:
+            last = snapshots[-1]
+            next_cursor = SavedArticlesService.encode_cursor(last.get('savedAt'), last.id)
+        return {'articles': articles, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def count(db, uid):
+        """Kaydedilmiş makale sayısı (sunucu tarafı sayım); alınamazsa None"""
+        try:
+            with metrics.track_call('firestore'):
+                result = SavedArticlesService.collection(db, uid).count().get()
+            return int(result[0][0].value)
+        except Exception as e:
+            logger.warning("Kaydedilen makale sayısı alınamadı (%s): %s", uid, e)
+            return None
+
+    @staticmethod
+    def encode_cursor(saved_at, article_id):
+        raw = json.dumps([saved_at, article_id], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            saved_at, article_id = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(str(e))
+        if not isinstance(article_id, str) or not article_id:
+            raise InvalidCursor('makale kimliği yok')
+        return saved_at, article_id
+
+    @staticmethod
+    def _metadata(snapshots):
+        """
+        Sayfadaki makalelerin meta veri deposundaki kayıtları {belge kimliği: Article}.
+        Depoda olmayanlar arka planda Scopus'tan alınır; sayfa onları beklemez.
+        """
+        from .pdf_service import PDFService
+
+        ids = [snapshot.id for snapshot in snapshots]
+        try:
+            found = get_metadata_store().get_many(ids)
+        except sqlite3.Error as e:
+            logger.warning("Kaydedilen makalelerin meta verisi okunamadı: %s", e)
+            return {}
+        missing = [article_id for article_id in ids if article_id not in found and article_id.isdigit()]
+        if missing:
+            PDFService.prefetch_metadata(missing)
+        return found
+
+    @staticmethod
+    def _clean(snapshot, metadata=None):
+        article = snapshot.to_dict() or {}
+        cleaned = {
+            'id': article.get('id') or snapshot.id,
+            'title': article.get('title') or (metadata and metadata.title) or 'Başlık yok',
+            'author': article.get('author') or (metadata and metadata.authors) or 'Yazar belirtilmemiş',
+            'savedAt': article.get('savedAt') or '',
+            'notes': article.get('notes')
+        }
+        if metadata is not None:
+            cleaned.update(journal=metadata.journal or None, coverDate=metadata.cover_date or None,
+                           doi=metadata.doi, scopusUrl=metadata.scopus_url)
+        return cleaned
+
+    @staticmethod
+    def ensure_migrated(db, uid):
+        """
+        Kullanıcı belgesinde eski dizi alanları kaldıysa onları alt koleksiyona
+        taşır. Sonuç önbellekte hatırlanır; kullanıcı belgesi her sayfada
+        yeniden okunmaz. Taşıma başarısız olursa sayfa yine de gösterilir ve
+        bir sonraki istekte tekrar denenir.
+        """
+        cache_key = f"saved_articles_migrated:{uid}"
+        if get_cache().get(cache_key):
+            return
+        try:
+            count = SavedArticlesService.migrate_user(db, db.collection('users').document(uid))
+        except Exception as e:
+            logger.warning("Kaydedilen makaleler taşınamadı (%s): %s", uid, e)
+            return
+        if count:
+            logger.info("%s: %d kaydedilmiş makale alt koleksiyona taşındı", uid, count)
+        get_cache().set(cache_key, True, ttl=_MIGRATED_TTL)
+
+    @staticmethod
+    def migrate_user(db, user_ref, dry_run=False, keep_legacy=False):
+        """
+        Kullanıcı belgesindeki eski dizi alanlarını alt koleksiyona taşır.
+        Alt koleksiyonda zaten bulunan makalelerin (taşımadan sonra kaydedilenler)
+        üzerine yazılmaz. Taşınan makale sayısını döndürür.
+        """
+        with metrics.track_call('firestore'):
+            snapshot = user_ref.get()
+        data = snapshot.to_dict() if snapshot.exists else None
+        if not data or not any(field in data for field in LEGACY_FIELDS):
+            return 0
+
+        articles = SavedArticlesService._merge_legacy(data)
+        collection = user_ref.collection(SUBCOLLECTION)
+        with metrics.track_call('firestore'):
+            existing = {ref.id for ref in collection.list_documents()}
+        pending = [article for article in articles if article['id'] not in existing]
+
+        if dry_run:
+            return len(pending)
+
+        for offset in range(0, len(pending), _BATCH_SIZE):
+            batch = db.batch()
+            for article in pending[offset:offset + _BATCH_SIZE]:
+                batch.set(collection.document(article['id']), article)
+            with metrics.track_call('firestore'):
+                batch.commit()
+
+        if not keep_legacy:
+            update = {field: firestore.DELETE_FIELD for field in LEGACY_FIELDS if field in data}
+            update['savedArticlesMigratedAt'] = firestore.SERVER_TIMESTAMP
+            with metrics.track_call('firestore'):
+                user_ref.update(update)
+        return len(pending)
+
+    @staticmethod
+    def _merge_legacy(data):
+        """İki eski alanı makale kimliğine göre birleştirir; aynı makalede yeni kaydedilen kazanır"""
+        merged = {}
+        for field in LEGACY_FIELDS:
+            items = data.get(field)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict) or not item.get('id'):
+                    continue
+                article = {key: item[key] for key in ARTICLE_FIELDS if item.get(key) is not None}
+                article['id'] = str(item['id'])
+                saved_at = article.get('savedAt', '')
+                # Dizi alanına Timestamp olarak yazılmış değerler ISO metne çevrilir
+                if hasattr(saved_at, 'isoformat'):
+                    saved_at = saved_at.isoformat()
+                # savedAt'siz belgeler sıralı sorgulardan düşer; boş metin listenin sonuna gelir
+                article['savedAt'] = saved_at if isinstance(saved_at, str) else ''
+                current = merged.get(article['id'])
+                if current is not None:
+                    newer, older = ((article, current) if article['savedAt'] > current['savedAt']
+                                    else (current, article))
+                    if 'notes' not in newer and 'notes' in older:
+                        newer['notes'] = older['notes']
+                    article = newer
+                merged[article['id']] = article
+        return list(merged.values())
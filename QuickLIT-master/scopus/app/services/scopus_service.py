@@ -1,21 +1,251 @@
-import requests
+import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from ..config import Config
+from .http_client import HTTPClient
+from .cache_service import get_cache
+from .executors import shutdown_executor
+from .rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .single_flight import SingleFlight
+from .metadata_store import get_metadata_store
+from .articles import SearchPage, SEARCH_FIELDS, field_param, loads
+
+logger = logging.getLogger(__name__)
+
+# Sorgu normalizasyonu için belirteçler: tırnaklı ifade, süslü parantezli ifade,
+# alan kodu açılışı (ör. TITLE-ABS-KEY( ), parantezler ve düz kelimeler
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\{[^}]*\}|[A-Za-z0-9_.-]+\(|\(|\)|[^\s(){}"]+')
+_PROXIMITY_RE = re.compile(r'(w|pre)/\d+')
+_BOOLEAN_OPERATORS = {'and', 'or', 'not'}
+
 
 class ScopusService:
+    _executor = None
+    _executor_lock = threading.Lock()
+    _pending = set()  # Arka planda yenilenen/önceden getirilen cache anahtarları
+    _pending_lock = threading.Lock()
+    _flight = SingleFlight('scopus_search')  # Aynı sorgu/sayfa için süren aramalar birleştirilir
+
     @staticmethod
-    def search_articles(query, count, start=0):
+    def build_search_request(query, count, start=0):
+        """Arama isteğinin (url, headers, params) üçlüsünü döndürür"""
         headers = {
             "X-ELS-APIKey": Config.API_KEY,
             "Accept": "application/json"
         }
-        
+
         params = {
             "query": query,
             "count": count,
             "start": start,
             "sort": "relevancy"
         }
-        
-        response = requests.get(Config.SCOPUS_BASE_URL, headers=headers, params=params)
+        fields = field_param(SEARCH_FIELDS)
+        if fields:
+            params["field"] = fields
+        return Config.SCOPUS_BASE_URL, headers, params
+
+    @staticmethod
+    def search_articles(query, count, start=0, priority=PRIORITY_INTERACTIVE):
+        """Arama sonuç sayfasını SearchPage olarak döndürür"""
+        url, headers, params = ScopusService.build_search_request(query, count, start)
+        response = HTTPClient.get(
+            url,
+            headers=headers,
+            params=params,
+            upstream='scopus_search',
+            priority=priority
+        )
+        response.raise_for_status()
+        page = SearchPage.from_response(loads(response.content))
+        ScopusService.remember_articles(page.articles)
+        return page
+
+    @staticmethod
+    def search_cursor(query, count, cursor='*', priority=PRIORITY_BACKGROUND, max_wait=None):
+        """
+        İmleçli (cursor) arama sayfası: (SearchPage, sonraki imleç) döndürür.
+        Offset sayfalamanın aksine derinlik sınırı yoktur; ilk istek `*` ile
+        yapılır, sonraki imleç yanıtın `cursor.@next` alanından okunur.
+        """
+        url, headers, params = ScopusService.build_search_request(query, count)
+        del params['start']
+        params['cursor'] = cursor
+        response = HTTPClient.get(
+            url,
+            headers=headers,
+            params=params,
+            upstream='scopus_search',
+            priority=priority,
+            max_wait=max_wait
+        )
         response.raise_for_status()
-        return response.json()
+        data = loads(response.content)
+        next_cursor = ((data or {}).get('search-results') or {}).get('cursor', {}).get('@next')
+        page = SearchPage.from_response(data)
+        ScopusService.remember_articles(page.articles)
+        return page, next_cursor
+
+    @staticmethod
+    def remember_articles(articles):
+        """
+        Arama sonuçlarını meta veri deposuna yazar; sonraki PDF indirme ve makale
+        istekleri abstract retrieval'a gitmeden bu kayıtları kullanır. Depo
+        yazılamazsa arama yine de sonuç döndürür.
+        """
+        try:
+            get_metadata_store().upsert_many(articles, 'search')
+        except sqlite3.Error as e:
+            logger.warning("Arama sonuçları meta veri deposuna yazılamadı: %s", e)
+
+    @staticmethod
+    def normalize_query(query):
+        """
+        Aynı anlama gelen sorguların aynı cache anahtarını üretmesi için sorguyu
+        normalize eder: boşluklar daraltılır, büyük/küçük harf katlanır, boolean
+        operatörler büyük harfe çevrilir ve örtük AND açık hale getirilir.
+        """
+        normalized = []
+        previous_is_operand = False
+        for token in _QUERY_TOKEN_RE.findall(query or ''):
+            folded = token.casefold()
+            if token[0] in '"{':
+                folded = token[0] + ' '.join(folded[1:-1].split()) + token[-1]
+
+            if folded in _BOOLEAN_OPERATORS or _PROXIMITY_RE.fullmatch(folded):
+                operator = folded.upper()
+                # Scopus'ta "a NOT b", "a AND NOT b" anlamına gelir
+                if operator == 'NOT' and previous_is_operand:
+                    normalized.append('AND')
+                normalized.append(operator)
+                previous_is_operand = False
+                continue
+
+            starts_operand = folded != ')'
+            if starts_operand and previous_is_operand:
+                normalized.append('AND')
+            normalized.append(folded)
+            previous_is_operand = not folded.endswith('(')
+
+        result = ' '.join(normalized)
+        result = re.sub(r'\(\s+', '(', result)
+        return re.sub(r'\s+\)', ')', result)
+
+    @staticmethod
+    def search_articles_cached(query, count, start=0, prefetch_next=True):
+        """
+        search_articles'ın önbellekli hali (stale-while-revalidate).
+
+        Taze sonuçlar doğrudan döner; süresi geçmiş ama bayat penceresindeki
+        sonuçlar da hemen döner ve arka planda yenilenir. İstenirse bir sonraki
+        sayfa da arka planda önceden getirilir.
+        """
+        cache_key = ScopusService._search_cache_key(query, count, start)
+        entry = get_cache().get(cache_key)
+        results = SearchPage.from_cache(entry['data']) if entry is not None else None
+
+        if results is None:
+            results = ScopusService._fetch_and_store(cache_key, query, count, start)
+        else:
+            if time.time() - entry['fetched_at'] >= Config.SEARCH_CACHE_TTL:
+                ScopusService._submit_background(cache_key, query, count, start)
+
+        if prefetch_next and Config.SEARCH_PREFETCH_NEXT_PAGE:
+            ScopusService._prefetch_next_page(results, query, count, start)
+        return results
+
+    @staticmethod
+    def get_cached_search(query, count, start=0):
+        """Önbellekteki taze arama sonucunu döndürür (yoksa veya bayatsa None)"""
+        entry = get_cache().get(ScopusService._search_cache_key(query, count, start))
+        if entry is None or time.time() - entry['fetched_at'] >= Config.SEARCH_CACHE_TTL:
+            return None
+        return SearchPage.from_cache(entry['data'])
+
+    @staticmethod
+    def store_search_results(query, count, start, page):
+        ScopusService.remember_articles(page.articles)
+        ScopusService._store(ScopusService._search_cache_key(query, count, start), page)
+
+    @staticmethod
+    def _search_cache_key(query, count, start):
+        return f"search:{count}:{start}:{ScopusService.normalize_query(query)}"
+
+    @staticmethod
+    def _store(cache_key, page):
+        get_cache().set(
+            cache_key,
+            {'fetched_at': time.time(), 'data': page.to_cache()},
+            ttl=Config.SEARCH_CACHE_TTL + Config.SEARCH_STALE_TTL
+        )
+
+    @staticmethod
+    def _fetch_and_store(cache_key, query, count, start, priority=PRIORITY_INTERACTIVE):
+        # Aynı anahtar için süren bir arama (ör. sonraki sayfa ön yüklemesi) varsa onun sonucu beklenir
+        return ScopusService._flight.do(cache_key, ScopusService._fetch_and_store_once,
+                                        cache_key, query, count, start, priority)
+
+    @staticmethod
+    def _fetch_and_store_once(cache_key, query, count, start, priority):
+        # Önceki lider biz önbelleğe bakıp çağrıya katılana kadar bitirmiş olabilir
+        entry = get_cache().get(cache_key)
+        if entry is not None and time.time() - entry['fetched_at'] < Config.SEARCH_CACHE_TTL:
+            cached = SearchPage.from_cache(entry['data'])
+            if cached is not None:
+                return cached
+
+        results = ScopusService.search_articles(query, count, start, priority=priority)
+        ScopusService._store(cache_key, results)
+        return results
+
+    @staticmethod
+    def _prefetch_next_page(results, query, count, start):
+        next_start = start + count
+        if next_start >= results.total:
+            return
+
+        cache_key = ScopusService._search_cache_key(query, count, next_start)
+        entry = get_cache().get(cache_key)
+        if entry is None or time.time() - entry['fetched_at'] >= Config.SEARCH_CACHE_TTL:
+            ScopusService._submit_background(cache_key, query, count, next_start)
+
+    @staticmethod
+    def _submit_background(cache_key, query, count, start):
+        """Aynı anahtar için en fazla bir arka plan isteği çalıştırır"""
+        with ScopusService._pending_lock:
+            if cache_key in ScopusService._pending:
+                return
+            ScopusService._pending.add(cache_key)
+
+        def run():
+            try:
+                ScopusService._fetch_and_store(cache_key, query, count, start, priority=PRIORITY_BACKGROUND)
+            except Exception as e:
+                logger.warning("Arka plan arama hatası (%s): %s", cache_key, e)
+            finally:
+                with ScopusService._pending_lock:
+                    ScopusService._pending.discard(cache_key)
+
+        ScopusService._get_executor().submit(run)
+
+    @staticmethod
+    def _get_executor():
+        if ScopusService._executor is None:
+            with ScopusService._executor_lock:
+                if ScopusService._executor is None:
+                    ScopusService._executor = ThreadPoolExecutor(
+                        max_workers=Config.SEARCH_PREFETCH_WORKERS,
+                        thread_name_prefix='scopus-prefetch'
+                    )
+        return ScopusService._executor
+
+    @staticmethod
+    def shutdown():
+        """Kapanışta bekleyen ön yüklemeleri iptal eder"""
+        with ScopusService._executor_lock:
+            executor, ScopusService._executor = ScopusService._executor, None
+        if executor is not None:
+            shutdown_executor(executor)
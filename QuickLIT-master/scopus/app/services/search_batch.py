@@ -0,0 +1,148 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..config import Config
+from .articles import Article
+from .discover_service import CATEGORY_MAPPING
+from .executors import shutdown_executor
+from .rate_limiter import RateLimitExceeded
+from .scopus_service import ScopusService
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBatchService:
+    """
+    Birden çok Scopus sorgusunun tek istekte çalıştırılması (/api/search_batch).
+
+    Sorgular sınırlı boyutlu bir thread havuzunda aynı anda çalışır; her biri
+    ana sayfa aramasıyla aynı yoldan (önbellek, single-flight, `scopus_search`
+    istek bütçesi) geçer. Sonuçlar EID ya da DOI'si aynı olan kayıtlar
+    birleştirilerek döner; her kayıt hangi sorgulardan geldiğini (`queries`)
+    taşır. Başarısız sorgular tüm isteği düşürmez, kendi hatasıyla döner.
+    """
+
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def parse_queries(items):
+        """
+        İstek gövdesindeki sorgu listesini doğrular. Öğe bir sorgu metni ya da
+        {"query"|"category", "id", "count", "start"} olabilir. (sorgular, None)
+        ya da (None, hata mesajı) döndürür.
+        """
+        queries, seen = [], set()
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                item = {'query': item}
+            if not isinstance(item, dict):
+                return None, f'{index}. öğe bir sorgu metni ya da nesne olmalı'
+
+            category = item.get('category')
+            if category is not None:
+                if category not in CATEGORY_MAPPING:
+                    return None, f'Bilinmeyen kategori: {category}'
+                query = CATEGORY_MAPPING[category]
+            else:
+                query = item.get('query')
+            if not isinstance(query, str) or not query.strip():
+                return None, f'{index}. öğenin sorgusu boş'
+
+            query_id = str(item.get('id') or category or f'q{index}')
+            if query_id in seen:
+                return None, f'Sorgu kimliği tekrar ediyor: {query_id}'
+            seen.add(query_id)
+
+            try:
+                count = int(item.get('count', Config.SEARCH_BATCH_DEFAULT_COUNT))
+                start = int(item.get('start', 0))
+            except (TypeError, ValueError):
+                return None, f'{query_id}: count ve start tam sayı olmalı'
+            if not 1 <= count <= Config.SEARCH_BATCH_MAX_COUNT or start < 0:
+                return None, f'{query_id}: count 1-{Config.SEARCH_BATCH_MAX_COUNT} arasında, start 0 ya da büyük olmalı'
+
+            queries.append({'id': query_id, 'query': query.strip(), 'count': count, 'start': start})
+        return queries, None
+
+    @staticmethod
+    def run(queries):
+        """
+        Sorguları paralel çalıştırır: (sorgu durumları, birleştirilmiş makaleler).
+        Makaleler sorgu sırasına ve sorgu içindeki sıraya göre ilk görüldükleri
+        yerde durur.
+        """
+        executor = SearchBatchService._get_executor()
+        futures = [executor.submit(ScopusService.search_articles_cached, query['query'], query['count'],
+                                   query['start'], False)
+                   for query in queries]
+
+        statuses, pages = [], []
+        for query, future in zip(queries, futures):
+            status = {'id': query['id'], 'query': query['query'], 'start': query['start']}
+            try:
+                page = future.result()
+            except RateLimitExceeded as e:
+                status.update(status='error', error='API istek limiti aşıldı', retry_after=e.retry_after)
+                page = None
+            except Exception as e:
+                logger.warning("Toplu arama sorgusu başarısız (%s): %s", query['id'], e)
+                status.update(status='error', error=str(e))
+                page = None
+            else:
+                status.update(status='ok', total=page.total, returned=len(page.articles))
+            statuses.append(status)
+            pages.append(page)
+
+        return statuses, SearchBatchService.merge(queries, pages)
+
+    @staticmethod
+    def merge(queries, pages):
+        """
+        Sayfaları EID/DOI'ye göre tekilleştirir. Aynı makale birden çok sorguda
+        geçiyorsa tek kayıt olarak döner; `queries` alanı sorgu kimliklerini,
+        `ranks` her sorgudaki sırasını (1'den başlayarak) içerir.
+        """
+        merged = []
+        by_eid, by_doi = {}, {}
+        for query, page in zip(queries, pages):
+            if page is None:
+                continue
+            for rank, article in enumerate(page.articles, start=1):
+                doi = (article.doi or '').strip().lower() or None
+                record = by_eid.get(article.eid) if article.eid else None
+                if record is None and doi:
+                    record = by_doi.get(doi)
+                if record is None:
+                    record = dict(zip(Article.__slots__, article.to_row()))
+                    record['queries'], record['ranks'] = [], {}
+                    merged.append(record)
+                elif not record['doi'] and article.doi:
+                    record['doi'] = article.doi
+
+                if article.eid:
+                    by_eid.setdefault(article.eid, record)
+                if doi:
+                    by_doi.setdefault(doi, record)
+                if query['id'] not in record['ranks']:
+                    record['queries'].append(query['id'])
+                    record['ranks'][query['id']] = rank
+        return merged
+
+    @staticmethod
+    def _get_executor():
+        if SearchBatchService._executor is None:
+            with SearchBatchService._lock:
+                if SearchBatchService._executor is None:
+                    SearchBatchService._executor = ThreadPoolExecutor(
+                        max_workers=Config.SEARCH_BATCH_WORKERS,
+                        thread_name_prefix='search-batch'
+                    )
+        return SearchBatchService._executor
+
+    @staticmethod
+    def shutdown():
+        with SearchBatchService._lock:
+            executor, SearchBatchService._executor = SearchBatchService._executor, None
+        if executor is not None:
+            shutdown_executor(executor)
@@ -0,0 +1,93 @@
+"""
+Aynı anda yapılan özdeş upstream çağrılarının birleştirilmesi (single-flight).
+
+Bir anahtar için çağrı sürerken gelen diğer istekler yeni bir upstream çağrısı
+yapmaz; ilk çağrının (lider) bitmesini bekler ve onun sonucunu ya da
+istisnasını paylaşır. Anahtar, önbellek anahtarıyla aynı normalize edilmiş
+istektir (ör. `search:10:0:<normalize sorgu>`, `abstract:<scopus_id>`).
+
+Sonuç nesnesi tüm bekleyenler arasında paylaşılır; önbellekten dönen
+nesnelerde olduğu gibi çağıranlar sonucu değiştirmeden önce kopyalamalıdır.
+Birleştirme süreç içidir: gunicorn worker'ları arasında yapılmaz.
+"""
+import asyncio
+import threading
+from .. import metrics
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread'ler arası single-flight (senkron Flask yolu)"""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """`fn(*args, **kwargs)`'ı anahtar başına aynı anda en fazla bir kez çalıştırır"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.singleflight_calls.inc(flight=self.name, role='follower')
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.singleflight_calls.inc(flight=self.name, role='leader')
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight (ASGI yolu). Çağrı ayrı bir task olarak çalışır;
+    bekleyenlerden biri (lider dahil) iptal edilse de diğerleri sonucu alır.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tasks = {}
+
+    async def do(self, key, coro_fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            metrics.singleflight_calls.inc(flight=self.name, role='leader')
+            task = self._tasks[key] = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            metrics.singleflight_calls.inc(flight=self.name, role='follower')
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Kimse beklemiyorsa "never retrieved" uyarısını önler
+
+    def in_flight(self):
+        return len(self._tasks)
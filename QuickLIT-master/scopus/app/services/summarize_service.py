@@ -0,0 +1,677 @@
+"""
+Uzun metinler için parçalı (map-reduce) özetleme.
+
+Metin bölüm başlıkları ve paragraf sınırlarından `SUMMARIZE_CHUNK_CHARS`
+boyutlu parçalara ayrılır. Parçalar Cohere'e aynı anda (istek başına en fazla
+`SUMMARIZE_CONCURRENCY`) gönderilir; her çağrı Cohere istek bütçesinden token
+harcar ve token açılana kadar `SUMMARIZE_RATE_MAX_WAIT` saniye bekleyebilir.
+Parça özetleri sırayla birleştirilip kullanıcının seçtiği uzunluk ve biçimde
+son bir kez özetlenir (birleşim de sığmıyorsa aynı işlem tekrarlanır). Tek
+parçalık metinler eskisi gibi tek çağrıyla özetlenir.
+
+Özetleme olay dizisi olarak üretilir: ('plan', ...), her parça bittikçe
+('partial', ...), birleştirme turlarında ('reduce', ...) ve ('final', ...).
+Route'lar bunları SSE olarak akıtır ya da yalnızca sonucu JSON döndürür.
+
+Sonuçlar diskteki ayrı bir SQLite önbelleğinde (`SUMMARY_CACHE_PATH`)
+saklanır. Anahtar, boşlukları sadeleştirilmiş metnin ve sonucu etkileyen tüm
+seçeneklerin (uzunluk, biçim, prompt, model, parçalama ayarları) SHA-256
+özetidir; aynı metin tekrar istendiğinde Cohere'e gidilmez. Aynı anahtar için
+süren bir özetleme varsa yeni istek onu bekler ve sonucunu paylaşır.
+
+`/summarize/<scopus_id>` metni istemciden almaz: depodaki PDF'in metni süreç
+havuzunda bir kez çıkarılıp PDF'in yanında saklanır ve oradan okunur.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import httpx
+import requests
+from .. import metrics
+from ..config import Config
+from .articles import loads
+from .cache_service import create_cache
+from .executors import shutdown_executor
+from .http_client import HTTPClient
+from .pdf_service import PDFService
+from .pdf_store import get_pdf_store
+from .pdf_text import PDFTextExtractor, read_pages
+from .rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+COHERE_MODEL = 'summarize-xlarge'
+# Cohere summarize uç noktasının kabul ettiği en kısa metin
+MIN_CHUNK_CHARS = 250
+# Parça özetleri bu kadar turda sığmazsa birleşim kırpılarak son kez özetlenir
+MAX_REDUCE_ROUNDS = 3
+# Anahtar biçimi ya da özetleme akışı değişince eski sonuçları geçersiz kılmak için artırılır
+SUMMARY_CACHE_VERSION = 1
+
+_PARAGRAPH = re.compile(r'\n\s*\n')
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE = re.compile(r'(?<=[.!?])\s+')
+# Bölüm başlıkları: "2.1 Methods", "INTRODUCTION", "Sonuç ve Öneriler"
+_NUMBERED_HEADING = re.compile(r'^(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+\S')
+_CAPS_HEADING = re.compile(r'^[A-ZÇĞİÖŞÜ][A-ZÇĞİÖŞÜ0-9 ,&\-]{2,}$')
+_NAMED_HEADING = re.compile(
+    r'^(abstract|introduction|background|related work|methods?|materials and methods|methodology|results?'
+    r'|discussion|conclusions?|references|özet|giriş|yöntem|bulgular|tartışma|sonuç)\b', re.IGNORECASE
+)
+
+
+class SummarizeError(Exception):
+    """İstemciye iletilecek özetleme hatası"""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class SummarizeJob:
+    """Doğrulanmış /summarize isteği"""
+
+    __slots__ = ('text', 'length', 'format', 'prompt', 'chunks', 'cache_key', 'source')
+
+    def __init__(self, text, length='medium', format='paragraph', prompt=None, source=None):
+        self.text = text
+        self.length = length
+        self.format = format
+        self.prompt = prompt
+        self.chunks = SummarizeService.split_text(text)
+        self.cache_key = summary_cache_key(text, length, format, prompt)
+        self.source = source  # Depodaki PDF'ten özetlemede {'scopus_id', 'pages', 'truncated'}
+
+
+class SummarizeService:
+    _executor = None
+    _lock = threading.Lock()
+    _in_flight = {}  # Önbellek anahtarı -> süren özetlemenin sonucunu verecek Future
+    _in_flight_lock = threading.Lock()
+
+    @staticmethod
+    def prepare(data):
+        """
+        /summarize gövdesini doğrular. (SummarizeJob, None) ya da
+        (None, (hata gövdesi, durum kodu)) döndürür.
+        """
+        text = data.get('text')
+        if not text or not isinstance(text, str) or not text.strip():
+            return None, ({'error': 'Metin boş olamaz'}, 400)
+
+        if len(text) > Config.SUMMARIZE_MAX_CHARS:
+            return None, ({'error': f'Metin çok uzun (max: {Config.SUMMARIZE_MAX_CHARS:,} karakter)'}, 400)
+
+        # API key kontrolü
+        if not Config.COHERE_API_KEY:
+            return None, ({'error': 'Cohere API anahtarı bulunamadı'}, 500)
+
+        return SummarizeJob(text, data.get('length', 'medium'), data.get('format', 'paragraph'),
+                            data.get('prompt')), None
+
+    @staticmethod
+    def locate_pdf_text(scopus_id):
+        """
+        Depodaki PDF'in metin dosyası: (yol, None) dosya hazırsa, (yol, Future)
+        metin çıkarılıyorsa. PDF depoda yoksa ya da metin çıkarılamıyorsa
+        SummarizeError fırlatır.
+        """
+        stored = PDFService.find_stored_pdf(scopus_id)
+        if stored is None:
+            raise SummarizeError(f'PDF bulunamadı; önce /download_pdf/{scopus_id} ile indirilmeli', 404)
+        store = get_pdf_store()
+        target = store.text_path(stored['sha256'])
+        if os.path.exists(target):
+            return target, None
+        if not PDFTextExtractor.available():
+            raise SummarizeError('PDF metin çıkarma kullanılamıyor (pypdf kurulu değil)', 503)
+        try:
+            future = PDFTextExtractor.extract_text(stored['path'], target)
+        except Exception as e:
+            # Havuz başlatılamadıysa (ör. süreç açılamadı) istek 500 yerine 503 ile döner
+            logger.exception("Metin çıkarma havuzuna iş gönderilemedi: %s", e)
+            raise SummarizeError('PDF metin çıkarma şu anda kullanılamıyor', 503)
+        future.add_done_callback(lambda done: store.record_text(stored['sha256']))
+        return target, future
+
+    @staticmethod
+    def extraction_error(error):
+        """Metin çıkarma işinin hatasını istemciye iletilecek SummarizeError'a çevirir"""
+        logger.warning("PDF metni çıkarılamadı: %s", error)
+        return SummarizeError(f'PDF okunamadı: {error}', 422)
+
+    @staticmethod
+    def prepare_stored(scopus_id, data):
+        """
+        /summarize/<scopus_id> isteğini hazırlar; metin henüz çıkarılmadıysa
+        en fazla `TEXT_EXTRACTION_TIMEOUT` saniye bekler. prepare gibi
+        (SummarizeJob, None) ya da (None, (hata gövdesi, durum kodu)) döndürür.
+        """
+        try:
+            target, pending = SummarizeService.locate_pdf_text(scopus_id)
+            if pending is not None:
+                try:
+                    pending.result(timeout=Config.TEXT_EXTRACTION_TIMEOUT)
+                except FutureTimeoutError:
+                    # Çıkarma arka planda sürer; sonraki istek hazır dosyayı bulur
+                    raise SummarizeError('PDF metni hâlâ çıkarılıyor, lütfen biraz sonra tekrar deneyin', 503)
+                except Exception as e:
+                    raise SummarizeService.extraction_error(e)
+        except SummarizeError as e:
+            return None, ({'error': e.message}, e.status)
+        return SummarizeService.prepare_text_file(scopus_id, target, data)
+
+    @staticmethod
+    def prepare_text_file(scopus_id, target, data):
+        """
+        Çıkarılmış metin dosyasından SummarizeJob oluşturur. Metin sayfa sayfa
+        okunur ve `SUMMARIZE_MAX_CHARS`'ta kesilir; sayfalar paragraf olarak
+        birleştirilir, böylece parçalar sayfa sınırlarından bölünür.
+        """
+        if not Config.COHERE_API_KEY:
+            return None, ({'error': 'Cohere API anahtarı bulunamadı'}, 500)
+
+        parts, pages, chars, truncated = [], 0, 0, False
+        for page in read_pages(target):
+            pages += 1
+            if not page:
+                continue
+            if chars + len(page) > Config.SUMMARIZE_MAX_CHARS:
+                parts.append(page[:Config.SUMMARIZE_MAX_CHARS - chars])
+                truncated = True
+                break
+            parts.append(page)
+            chars += len(page) + 2
+        text = '\n\n'.join(parts).strip()
+        if not text:
+            return None, ({'error': "PDF'de metin bulunamadı (taranmış bir görüntü olabilir)"}, 422)
+
+        source = {'scopus_id': scopus_id, 'pages': pages, 'truncated': truncated}
+        return SummarizeJob(text, data.get('length', 'medium'), data.get('format', 'paragraph'),
+                            data.get('prompt'), source), None
+
+    @staticmethod
+    def wants_stream(data, accept):
+        """İstemci SSE istiyor mu (`"stream": true` ya da Accept: text/event-stream)"""
+        return bool(data.get('stream')) or 'text/event-stream' in (accept or '')
+
+    @staticmethod
+    def split_text(text, max_chars=None):
+        """
+        Metni en fazla `max_chars` karakterlik parçalara böler. Paragraflar
+        bölünmez (tek başına sığmayanlar cümle sınırından bölünür); bir bölüm
+        başlığı, dolmaya yakın parçayı erken kapatır.
+        """
+        max_chars = max_chars or Config.SUMMARIZE_CHUNK_CHARS
+        text = text.strip()
+        if len(text) <= max_chars:
+            return [text]
+
+        paragraphs = []
+        for paragraph in _PARAGRAPH.split(text):
+            paragraph = paragraph.strip()
+            if paragraph:
+                paragraphs.extend(_split_long(paragraph, max_chars))
+
+        chunks, current, size = [], [], 0
+        for paragraph in paragraphs:
+            heading = _is_heading(paragraph)
+            if current and (size + len(paragraph) + 2 > max_chars or (heading and size >= max_chars // 2)):
+                chunks.append('\n\n'.join(current))
+                current, size = [], 0
+            current.append(paragraph)
+            size += len(paragraph) + 2
+        if current:
+            chunks.append('\n\n'.join(current))
+
+        # Cohere çok kısa metni reddeder; kısa kalan son parça öncekine eklenir
+        if len(chunks) > 1 and len(chunks[-1]) < MIN_CHUNK_CHARS:
+            tail = chunks.pop()
+            chunks[-1] = f'{chunks[-1]}\n\n{tail}'
+        return chunks
+
+    @staticmethod
+    def build_request(text, length, format, prompt):
+        """Cohere isteğinin (url, json, headers) bilgileri"""
+        return {
+            'url': f'{Config.COHERE_API_URL}/v1/summarize',
+            'json': {
+                'text': text,
+                'length': length,
+                'format': format,
+                'model': COHERE_MODEL,
+                'prompt': prompt,
+                'temperature': 0.7,
+                'additional_command': f'Focus on: {prompt}' if prompt else None
+            },
+            'headers': {
+                'Authorization': f'Bearer {Config.COHERE_API_KEY}',
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            }
+        }
+
+    @staticmethod
+    def parse_response(status_code, content):
+        """Cohere yanıtını çözer; hata durumunda SummarizeError fırlatır"""
+        try:
+            data = loads(content) if content else {}
+        except ValueError:
+            data = {}
+        if status_code >= 400:
+            message = data.get('message') if isinstance(data, dict) else None
+            raise SummarizeError(message or f"Cohere API hatası (Kod: {status_code})", status_code)
+        if not isinstance(data, dict) or not isinstance(data.get('summary'), str):
+            raise SummarizeError('Cohere API beklenmeyen bir yanıt döndürdü', 502)
+        return data
+
+    @staticmethod
+    def summarize_text(text, length, format, prompt, max_wait=None):
+        """
+        Tek bir Cohere çağrısı; 429'da (bütçe izin verirse) bir kez yeniden dener.
+        `max_wait` verilmezse kullanıcı isteklerinin bekleme sınırı geçerlidir.
+        """
+        cohere_request = SummarizeService.build_request(text, length, format, prompt)
+        for attempt in range(2):
+            try:
+                response = HTTPClient.post(
+                    cohere_request['url'],
+                    json=cohere_request['json'],
+                    headers=cohere_request['headers'],
+                    timeout=Config.SUMMARIZE_TIMEOUT,
+                    upstream='cohere',
+                    max_wait=max_wait
+                )
+            except requests.Timeout:
+                raise SummarizeError('Zaman aşımı: API yanıt vermedi. Lütfen tekrar deneyin.', 408)
+            except requests.RequestException as e:
+                raise SummarizeError(str(e), 502)
+            if response.status_code == 429 and attempt == 0:
+                continue
+            return SummarizeService.parse_response(response.status_code, response.content)
+
+    @staticmethod
+    async def summarize_text_async(client, text, length, format, prompt, max_wait=None):
+        """summarize_text'in AsyncHTTPClient ile çalışan karşılığı"""
+        cohere_request = SummarizeService.build_request(text, length, format, prompt)
+        for attempt in range(2):
+            try:
+                response = await client.post(
+                    cohere_request['url'],
+                    json=cohere_request['json'],
+                    headers=cohere_request['headers'],
+                    timeout=Config.SUMMARIZE_TIMEOUT,
+                    upstream='cohere',
+                    max_wait=max_wait
+                )
+            except httpx.TimeoutException:
+                raise SummarizeError('Zaman aşımı: API yanıt vermedi. Lütfen tekrar deneyin.', 408)
+            except httpx.HTTPError as e:
+                raise SummarizeError(str(e), 502)
+            if response.status_code == 429 and attempt == 0:
+                continue
+            return SummarizeService.parse_response(response.status_code, response.content)
+
+    @staticmethod
+    def iter_events(job):
+        """
+        Özetleme olaylarını (olay, veri) olarak üretir. Sonuç önbellekteyse
+        doğrudan ('final', ...) döner; aynı anahtar için süren bir özetleme
+        varsa beklenir (`SUMMARIZE_KEEPALIVE` saniyede bir ('ping', None)).
+        Üretici erken kapatılırsa bekleyen parçalar iptal edilir ve bekleyen
+        istekler özetlemeyi kendileri yapar.
+        """
+        plan = {'chunks': len(job.chunks), 'chars': len(job.text)}
+        if job.source:
+            plan['source'] = job.source
+        planned = False
+        while True:
+            future, leader = SummarizeService._claim(job.cache_key)
+            if leader:
+                break
+            if not planned:
+                yield 'plan', plan
+                planned = True
+            result = yield from SummarizeService._follow(future)
+            if result is not None:
+                yield 'final', {**result, 'cached': False, 'shared': True}
+                return
+
+        try:
+            cached = SummarizeService.get_cached(job)
+            if cached is not None:
+                future.set_result(cached)
+                if not planned:
+                    yield 'plan', {**plan, 'cached': True}
+                yield 'final', {**cached, 'cached': True}
+                return
+
+            if not planned:
+                yield 'plan', plan
+            for event, data in SummarizeService._events(job):
+                if event == 'final':
+                    SummarizeService._remember(job, data, future)
+                    data = {**data, 'cached': False}
+                yield event, data
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            SummarizeService._release(job.cache_key, future)
+
+    @staticmethod
+    def _events(job):
+        """Önbelleği kullanmadan özetler; 'plan' dışındaki olayları üretir"""
+        if len(job.chunks) == 1:
+            result = SummarizeService.summarize_text(job.text, job.length, job.format, job.prompt)
+            yield 'final', {**result, 'chunks': 1}
+            return
+
+        chunks = job.chunks
+        for round_number in range(1, MAX_REDUCE_ROUNDS + 1):
+            partials = yield from SummarizeService._map(job, chunks, round_number)
+            combined = SummarizeService._combine(partials, round_number)
+            yield 'reduce', {'round': round_number, 'chunks': len(partials)}
+            if combined is not None:
+                break
+            chunks = SummarizeService.split_text('\n\n'.join(partials))
+
+        result = SummarizeService.summarize_text(combined, job.length, job.format, job.prompt,
+                                                 Config.SUMMARIZE_RATE_MAX_WAIT)
+        yield 'final', {**result, 'chunks': len(job.chunks)}
+
+    @staticmethod
+    def _follow(future):
+        """Süren özetlemenin sonucunu ping üreterek bekler; lider iptal edildiyse None döner"""
+        while True:
+            try:
+                return future.result(timeout=Config.SUMMARIZE_KEEPALIVE)
+            except FutureTimeoutError:
+                yield 'ping', None
+            except CancelledError:
+                return None
+
+    @staticmethod
+    def _map(job, chunks, round_number):
+        """Parçaları pencere boyutu kadar eşzamanlı özetler; sıralı özet listesini döndürür"""
+        executor = SummarizeService._get_executor()
+        pending = iter(enumerate(chunks))
+        running = {}
+        summaries = [None] * len(chunks)
+        try:
+            while True:
+                while len(running) < Config.SUMMARIZE_CONCURRENCY:
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    index, chunk = item
+                    future = executor.submit(SummarizeService.summarize_text, chunk, Config.SUMMARIZE_CHUNK_LENGTH,
+                                             'paragraph', job.prompt, Config.SUMMARIZE_RATE_MAX_WAIT)
+                    running[future] = index
+                if not running:
+                    return summaries
+
+                done, _ = wait(running, timeout=Config.SUMMARIZE_KEEPALIVE, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield 'ping', None
+                for future in done:
+                    index = running.pop(future)
+                    summaries[index] = future.result()['summary']
+                    yield 'partial', {'round': round_number, 'index': index, 'total': len(chunks),
+                                      'summary': summaries[index]}
+        finally:
+            for future in running:
+                future.cancel()
+
+    @staticmethod
+    async def iter_events_async(client, job):
+        """iter_events'in event loop üzerinde çalışan karşılığı"""
+        plan = {'chunks': len(job.chunks), 'chars': len(job.text)}
+        if job.source:
+            plan['source'] = job.source
+        planned = False
+        while True:
+            future, leader = SummarizeService._claim(job.cache_key)
+            if leader:
+                break
+            if not planned:
+                yield 'plan', plan
+                planned = True
+            try:
+                # shield: bu isteğin iptali liderin sonucunu iptal etmemeli
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                continue
+            yield 'final', {**result, 'cached': False, 'shared': True}
+            return
+
+        # Özet önbelleği SQLite/Redis'tir; event loop'u bekletmemek için thread havuzunda kullanılır
+        loop = asyncio.get_running_loop()
+        try:
+            cached = await loop.run_in_executor(None, SummarizeService.get_cached, job)
+            if cached is not None:
+                future.set_result(cached)
+                if not planned:
+                    yield 'plan', {**plan, 'cached': True}
+                yield 'final', {**cached, 'cached': True}
+                return
+
+            if not planned:
+                yield 'plan', plan
+            async for event, data in SummarizeService._events_async(client, job):
+                if event == 'final':
+                    await loop.run_in_executor(None, SummarizeService._remember, job, data, future)
+                    data = {**data, 'cached': False}
+                yield event, data
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            SummarizeService._release(job.cache_key, future)
+
+    @staticmethod
+    async def _events_async(client, job):
+        """_events'in event loop üzerinde çalışan karşılığı"""
+        if len(job.chunks) == 1:
+            result = await SummarizeService.summarize_text_async(client, job.text, job.length, job.format,
+                                                                 job.prompt)
+            yield 'final', {**result, 'chunks': 1}
+            return
+
+        chunks = job.chunks
+        for round_number in range(1, MAX_REDUCE_ROUNDS + 1):
+            partials = [None] * len(chunks)
+            async for index, summary in SummarizeService._map_async(client, job, chunks):
+                partials[index] = summary
+                yield 'partial', {'round': round_number, 'index': index, 'total': len(chunks), 'summary': summary}
+            combined = SummarizeService._combine(partials, round_number)
+            yield 'reduce', {'round': round_number, 'chunks': len(partials)}
+            if combined is not None:
+                break
+            chunks = SummarizeService.split_text('\n\n'.join(partials))
+
+        result = await SummarizeService.summarize_text_async(client, combined, job.length, job.format, job.prompt,
+                                                             Config.SUMMARIZE_RATE_MAX_WAIT)
+        yield 'final', {**result, 'chunks': len(job.chunks)}
+
+    @staticmethod
+    async def _map_async(client, job, chunks):
+        semaphore = asyncio.Semaphore(Config.SUMMARIZE_CONCURRENCY)
+
+        async def run(index, chunk):
+            async with semaphore:
+                result = await SummarizeService.summarize_text_async(client, chunk, Config.SUMMARIZE_CHUNK_LENGTH,
+                                                                     'paragraph', job.prompt,
+                                                                     Config.SUMMARIZE_RATE_MAX_WAIT)
+            return index, result['summary']
+
+        tasks = [asyncio.ensure_future(run(index, chunk)) for index, chunk in enumerate(chunks)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _combine(partials, round_number):
+        """
+        Parça özetlerini sırayla birleştirir. Tek çağrıya sığmıyorsa yeni bir
+        tur için None döner; son turda birleşim kırpılır.
+        """
+        combined = '\n\n'.join(partials)
+        if len(combined) <= Config.SUMMARIZE_CHUNK_CHARS:
+            return combined
+        if round_number >= MAX_REDUCE_ROUNDS:
+            logger.warning("Parça özetleri %d turda sığmadı, birleşim kırpılıyor", round_number)
+            return combined[:Config.SUMMARIZE_CHUNK_CHARS]
+        return None
+
+    @staticmethod
+    def get_cached(job):
+        """Önbellekteki özet sonucu (yoksa ya da önbellek kapalıysa None)"""
+        if not Config.SUMMARY_CACHE_ENABLED:
+            return None
+        return get_summary_cache().get(job.cache_key)
+
+    @staticmethod
+    def _remember(job, result, future):
+        if Config.SUMMARY_CACHE_ENABLED:
+            get_summary_cache().set(job.cache_key, result, ttl=Config.SUMMARY_CACHE_TTL)
+        future.set_result(result)
+
+    @staticmethod
+    def _claim(key):
+        """Anahtarın süren özetlemesini döndürür; yoksa yenisini açar: (Future, lider mi)"""
+        with SummarizeService._in_flight_lock:
+            future = SummarizeService._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = SummarizeService._in_flight[key] = Future()
+        metrics.singleflight_calls.inc(flight='summarize', role='leader' if leader else 'follower')
+        return future, leader
+
+    @staticmethod
+    def _release(key, future):
+        with SummarizeService._in_flight_lock:
+            if SummarizeService._in_flight.get(key) is future:
+                del SummarizeService._in_flight[key]
+        # Lider sonuç üretmeden kapatıldıysa (istemci bağlantıyı kesti) bekleyenler kendileri özetler
+        if not future.done():
+            future.cancel()
+
+    @staticmethod
+    def sse(event, data):
+        """Olayı Server-Sent Events biçiminde kodlar (ping için yorum satırı)"""
+        if event == 'ping':
+            return b': ping\n\n'
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+    @staticmethod
+    def error_event(error):
+        """Akış sırasında oluşan hatanın SSE olayı"""
+        if isinstance(error, RateLimitExceeded):
+            return SummarizeService.sse('error', {
+                'error': 'API istek limiti aşıldı. Lütfen birkaç saniye sonra tekrar deneyin.',
+                'status': 429,
+                'retry_after': error.retry_after
+            })
+        if isinstance(error, SummarizeError):
+            return SummarizeService.sse('error', {'error': error.message, 'status': error.status})
+        return SummarizeService.sse('error', {'error': str(error), 'status': 500})
+
+    @staticmethod
+    def _get_executor():
+        if SummarizeService._executor is None:
+            with SummarizeService._lock:
+                if SummarizeService._executor is None:
+                    SummarizeService._executor = ThreadPoolExecutor(
+                        max_workers=Config.SUMMARIZE_WORKERS,
+                        thread_name_prefix='summarize'
+                    )
+        return SummarizeService._executor
+
+    @staticmethod
+    def shutdown():
+        with SummarizeService._lock:
+            executor, SummarizeService._executor = SummarizeService._executor, None
+        if executor is not None:
+            shutdown_executor(executor)
+
+
+def summary_cache_key(text, length, format, prompt):
+    """
+    Özet önbellek anahtarı. Metin Unicode NFC'ye çevrilip boşlukları
+    sadeleştirilerek özetlenir; böylece yalnızca satır sonu ya da boşluk
+    farkı olan kopyalar aynı sonucu paylaşır.
+    """
+    options = json.dumps([SUMMARY_CACHE_VERSION, COHERE_MODEL, length, format, prompt,
+                          Config.SUMMARIZE_CHUNK_CHARS, Config.SUMMARIZE_CHUNK_LENGTH], ensure_ascii=False)
+    digest = hashlib.sha256(options.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(_WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip().encode('utf-8'))
+    return f'summary:{digest.hexdigest()}'
+
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache():
+    """
+    Özet sonuçlarının kalıcı önbelleği. Genel önbellekten ayrı bir SQLite
+    dosyasıdır: sonuçlar yeniden başlatmalardan sonra da korunur ve boyut
+    sınırı aşılınca en uzun süredir okunmayanlar silinir.
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                _summary_cache = create_cache(
+                    'sqlite',
+                    Config.SUMMARY_CACHE_PATH,
+                    Config.SUMMARY_CACHE_MAX_ENTRIES,
+                    Config.SUMMARY_CACHE_MAX_BYTES,
+                    Config.SUMMARY_CACHE_TTL
+                )
+    return _summary_cache
+
+
+def _is_heading(paragraph):
+    if len(paragraph) > 100 or '\n' in paragraph:
+        return False
+    return bool(_NUMBERED_HEADING.match(paragraph) or _CAPS_HEADING.match(paragraph)
+                or _NAMED_HEADING.match(paragraph))
+
+
+def _split_long(paragraph, max_chars):
+    """Tek başına sığmayan paragrafı cümle sınırlarından, gerekirse sabit uzunlukta böler"""
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    pieces, current = [], ''
+    for sentence in _SENTENCE.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ''
+        current = f'{current} {sentence}' if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
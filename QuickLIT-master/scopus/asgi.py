@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+from app.server import shutdown
+
+# ASGI (asyncio) modu: uvicorn asgi:app --port 3000
+app = create_asgi_app(on_shutdown=shutdown)
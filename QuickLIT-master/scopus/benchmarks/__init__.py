@@ -0,0 +1,11 @@
+"""
+QuickLIT çevrimdışı benchmark araçları.
+
+- `benchmarks.fake_upstreams`: Scopus search/abstract/article ve Cohere summarize
+  uç noktalarını taklit eden yerel sunucu (gecikme, hata ve 429 oranları ayarlanabilir)
+- `benchmarks.stubs/firebase_admin`: ağa çıkmayan Firebase Admin SDK stub'ı
+- `benchmarks.run`: sunucuyu başlatıp senaryoları çalıştırır, sonuçları JSON'a yazar
+- `benchmarks.compare`: iki sonuç dosyasını karşılaştırır
+
+Komutlar scopus dizininden çalıştırılır: `python -m benchmarks.run --help`
+"""
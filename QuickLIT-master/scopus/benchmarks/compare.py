@@ -0,0 +1,78 @@
+"""
+İki benchmark sonucunu karşılaştırır (ör. iki commit arasında).
+
+    python -m benchmarks.compare benchmarks/results/eski.json benchmarks/results/yeni.json
+
+Eşikten (varsayılan %10) fazla kötüleşen metrik varsa çıkış kodu 1'dir.
+"""
+import argparse
+import json
+import sys
+
+# (ad, sonuçtaki yol, büyük değer daha mı iyi)
+METRICS = (
+    ('p50_ms', ('latency_ms', 'p50'), False),
+    ('p95_ms', ('latency_ms', 'p95'), False),
+    ('p99_ms', ('latency_ms', 'p99'), False),
+    ('throughput_rps', ('throughput_rps',), True),
+    ('rss_peak_mb', ('rss_peak_mb',), False),
+    ('errors', ('errors',), False)
+)
+
+
+def _value(result, path):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def compare(baseline, current, threshold=10.0):
+    """Senaryo/metrik bazında satırlar: (senaryo, metrik, önceki, şimdiki, değişim %, gerileme mi)"""
+    rows = []
+    for scenario, result in current.get('scenarios', {}).items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if previous is None:
+            continue
+        for name, path, higher_is_better in METRICS:
+            old, new = _value(previous, path), _value(result, path)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else (0.0 if new == old else float('inf'))
+            worse = -change if higher_is_better else change
+            # Hata sayısında eşik yerine herhangi bir artış gerilemedir
+            regression = new > old if name == 'errors' else worse > threshold
+            rows.append((scenario, name, old, new, change, regression))
+    return rows
+
+
+def print_comparison(baseline, current, threshold=10.0, out=sys.stdout):
+    """Karşılaştırma tablosunu yazar ve gerileme satırlarını döndürür"""
+    rows = compare(baseline, current, threshold)
+    out.write(f"Önceki: {baseline.get('meta', {}).get('git_commit')}  "
+              f"Şimdiki: {current.get('meta', {}).get('git_commit')}\n")
+    out.write(f"{'senaryo':<18}{'metrik':<16}{'önceki':>12}{'şimdiki':>12}{'değişim':>10}\n")
+    for scenario, name, old, new, change, regression in rows:
+        flag = '  GERİLEME' if regression else ''
+        out.write(f'{scenario:<18}{name:<16}{old:>12}{new:>12}{change:>9.1f}%{flag}\n')
+    return [row for row in rows if row[5]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark sonuçlarını karşılaştır')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Gerileme sayılacak yüzde değişim')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    if print_comparison(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Elsevier (Scopus) ve Cohere API'lerini taklit eden yerel HTTP sunucuları.
+
+Sunucular gerçek API'lerin uygulama tarafından kullanılan yanıt biçimlerini
+üretir; gecikme, hata oranı ve 429 (istek limiti) oranı uç nokta bazında
+ayarlanabilir. Böylece benchmark gerçek API kotası harcamadan çalışır.
+
+    python -m benchmarks.fake_upstreams --port 9100 --latency 80 --rate-limit-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ENDPOINTS = ('scopus_search', 'scopus_abstract', 'scopus_article', 'cohere')
+
+_ABSTRACT_RE = re.compile(r'^/content/abstract/(scopus_id|eid|doi|pii)/(.+)$')
+_ARTICLE_RE = re.compile(r'^/content/article/(doi|pii|scopus_id)/(.+)$')
+
+
+class EndpointProfile:
+    """Tek bir uç noktanın davranışı: gecikme (ms), sapma (ms), hata ve 429 oranları"""
+
+    def __init__(self, latency_ms=50, jitter_ms=10, error_rate=0.0, rate_limit_rate=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+
+    def delay(self):
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+
+    def outcome(self):
+        """'ok', 'error' (500) veya 'rate_limited' (429)"""
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 'rate_limited'
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'error'
+        return 'ok'
+
+    def to_dict(self):
+        return {
+            'latency_ms': self.latency_ms,
+            'jitter_ms': self.jitter_ms,
+            'error_rate': self.error_rate,
+            'rate_limit_rate': self.rate_limit_rate
+        }
+
+
+def _seed(value):
+    return int(hashlib.md5(str(value).encode('utf-8')).hexdigest()[:8], 16)
+
+
+def search_entry(scopus_id):
+    """Search API'nin varsayılan (STANDARD) görünümündeki bir entry"""
+    rng = random.Random(_seed(scopus_id))
+    eid = f'2-s2.0-{scopus_id}'
+    return {
+        '@_fa': 'true',
+        'link': [
+            {'@_fa': 'true', '@ref': 'self', '@href': f'https://api.elsevier.com/content/abstract/scopus_id/{scopus_id}'},
+            {'@_fa': 'true', '@ref': 'author-affiliation',
+             '@href': f'https://api.elsevier.com/content/abstract/scopus_id/{scopus_id}?field=author,affiliation'},
+            {'@_fa': 'true', '@ref': 'scopus',
+             '@href': f'https://www.scopus.com/inward/record.uri?partnerID=HzOxMe3b&scp={scopus_id}&origin=inward'},
+            {'@_fa': 'true', '@ref': 'scopus-citedby',
+             '@href': f'https://www.scopus.com/inward/citedby.uri?partnerID=HzOxMe3b&scp={scopus_id}&origin=inward'}
+        ],
+        'prism:url': f'https://api.elsevier.com/content/abstract/scopus_id/{scopus_id}',
+        'dc:identifier': f'SCOPUS_ID:{scopus_id}',
+        'eid': eid,
+        'dc:title': f'Benchmark article {scopus_id}',
+        'dc:creator': f'Author {rng.randint(1, 500)}',
+        'prism:publicationName': f'Journal of Benchmarks {rng.randint(1, 40)}',
+        'prism:issn': f'{rng.randint(1000, 9999)}{rng.randint(1000, 9999)}',
+        'prism:eIssn': f'{rng.randint(1000, 9999)}{rng.randint(1000, 9999)}',
+        'prism:volume': str(rng.randint(1, 120)),
+        'prism:issueIdentifier': str(rng.randint(1, 12)),
+        'prism:pageRange': f'{rng.randint(1, 400)}-{rng.randint(401, 800)}',
+        'prism:coverDate': f'20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-01',
+        'prism:coverDisplayDate': f'{rng.randint(1, 28)} March 20{rng.randint(10, 24)}',
+        'prism:doi': f'10.1016/bench.{scopus_id}',
+        'pii': f'S{scopus_id:0>16}',
+        'citedby-count': str(rng.randint(0, 300)),
+        'affiliation': [
+            {'@_fa': 'true', 'affilname': f'University of Benchmarks {rng.randint(1, 90)}',
+             'affiliation-city': 'Ankara', 'affiliation-country': 'Turkey'}
+            for _ in range(rng.randint(1, 3))
+        ],
+        'prism:aggregationType': 'Journal',
+        'subtype': 'ar',
+        'subtypeDescription': 'Article',
+        'article-number': str(rng.randint(100000, 999999)),
+        'source-id': str(rng.randint(10000, 99999)),
+        'openaccess': '0',
+        'openaccessFlag': False,
+        'freetoread': {'value': [{'$': 'all'}, {'$': 'repository'}]},
+        'freetoreadLabel': {'value': [{'$': 'All Open Access'}, {'$': 'Green'}]}
+    }
+
+
+def select_fields(item, fields):
+    """`field=` parametresi gibi yalnızca istenen alanları bırakır"""
+    if not fields:
+        return item
+    wanted = set(fields.split(','))
+    return {key: value for key, value in item.items() if key in wanted or key == '@_fa'}
+
+
+def search_response(query, count, start, total=5000, fields=None, cursor=None):
+    """`cursor` verilirse (`*` ya da önceki yanıtın `@next`'i) imleçli sayfa döner"""
+    if cursor is not None:
+        start = 0 if cursor == '*' else int(cursor.lstrip('c'))
+    base = _seed(query) % 10 ** 9
+    entries = [select_fields(search_entry(str(base + start + i)), fields)
+               for i in range(max(0, min(count, total - start)))]
+    results = {
+        'opensearch:totalResults': str(total),
+        'opensearch:startIndex': str(start),
+        'opensearch:itemsPerPage': str(len(entries)),
+        'entry': entries
+    }
+    if cursor is not None:
+        results['cursor'] = {'@current': cursor, '@next': f'c{start + len(entries)}'}
+    return {'search-results': results}
+
+
+def abstract_response(scopus_id, fields=None):
+    entry = search_entry(scopus_id)
+    coredata = {
+        'prism:url': entry['prism:url'],
+        'dc:identifier': entry['dc:identifier'],
+        'eid': entry['eid'],
+        'dc:title': entry['dc:title'],
+        'dc:creator': {'author': [{'@auid': '1', 'ce:indexed-name': entry['dc:creator']}]},
+        'prism:publicationName': entry['prism:publicationName'],
+        'prism:coverDate': entry['prism:coverDate'],
+        'prism:doi': entry['prism:doi'],
+        'pii': entry['pii'],
+        'dc:publisher': 'Elsevier B.V.',
+        'citedby-count': entry['citedby-count'],
+        'dc:description': 'Benchmark abstract. ' * 40,
+        'link': [
+            {'@rel': 'self', '@href': entry['prism:url']},
+            {'@rel': 'scopus', '@href': entry['link'][2]['@href']}
+        ]
+    }
+    return {'abstracts-retrieval-response': {'coredata': select_fields(coredata, fields)}}
+
+
+def abstract_scopus_id(id_type, value):
+    """EID/DOI/PII'den sahte kaydın scopus_id'si (search_entry'deki biçimlerin tersi)"""
+    if id_type == 'eid':
+        return value.rpartition('-')[2]
+    if id_type == 'doi':
+        return value.rpartition('bench.')[2]
+    if id_type == 'pii':
+        return str(int(value[1:] or 0))
+    return value
+
+
+def pdf_body(identifier, size):
+    header = f'%PDF-1.4\n% QuickLIT benchmark {identifier}\n'.encode('utf-8')
+    return header + b'0' * max(0, size - len(header) - 6) + b'\n%%EOF'
+
+
+class FakeUpstreamServer:
+    """
+    Tek portta Scopus search/abstract/article ve Cohere summarize uç noktalarını
+    sunan thread'li HTTP sunucusu. `stats()` uç nokta bazında sayaçları verir.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, profiles=None, pdf_size=256 * 1024,
+                 pdf_available_rate=1.0):
+        self.profiles = {name: EndpointProfile() for name in ENDPOINTS}
+        self.profiles.update(profiles or {})
+        self.pdf_size = pdf_size
+        self.pdf_available_rate = pdf_available_rate
+        self._counts = {name: {'ok': 0, 'error': 0, 'rate_limited': 0, 'not_found': 0} for name in ENDPOINTS}
+        self._lock = threading.Lock()
+        self._thread = None
+
+        handler = type('FakeUpstreamHandler', (_Handler,), {'upstream': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 1024
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-upstreams', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, endpoint, outcome):
+        with self._lock:
+            self._counts[endpoint][outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    upstream = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        if parts.path == '/_bench/stats':
+            return self._send_json(self.upstream.stats())
+
+        if parts.path == '/content/search/scopus':
+            return self._respond('scopus_search', lambda: self._send_json(search_response(
+                query.get('query', ''), int(query.get('count', 25)), int(query.get('start', 0)),
+                fields=query.get('field'), cursor=query.get('cursor'))))
+
+        match = _ABSTRACT_RE.match(parts.path)
+        if match:
+            scopus_id = abstract_scopus_id(match.group(1), unquote(match.group(2)))
+            return self._respond('scopus_abstract', lambda: self._send_json(abstract_response(scopus_id, query.get('field'))))
+
+        match = _ARTICLE_RE.match(parts.path)
+        if match:
+            return self._respond('scopus_article', lambda: self._send_pdf(match.group(2)))
+
+        self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if urlsplit(self.path).path != '/v1/summarize':
+            return self._send_json({'message': 'not found'}, 404)
+
+        try:
+            text = json.loads(body or b'{}').get('text') or ''
+        except ValueError:
+            return self._send_json({'message': 'invalid json'}, 400)
+        summary = ' '.join(text.split()[:60])
+        self._respond('cohere', lambda: self._send_json({
+            'id': hashlib.md5(body).hexdigest(),
+            'summary': summary,
+            'meta': {'api_version': {'version': '1'}, 'billed_units': {'input_tokens': len(text.split())}}
+        }))
+
+    def _respond(self, endpoint, send_ok):
+        profile = self.upstream.profiles[endpoint]
+        time.sleep(profile.delay())
+        outcome = profile.outcome()
+        self.upstream.count(endpoint, outcome)
+        if outcome == 'rate_limited':
+            return self._send_json({'message': 'Too Many Requests'}, 429, {'Retry-After': '1'})
+        if outcome == 'error':
+            return self._send_json({'message': 'Internal Server Error'}, 500)
+        send_ok()
+
+    def _send_pdf(self, identifier):
+        # Belirli oranda makale için PDF yok (redirect yolu)
+        if random.Random(_seed(identifier)).random() >= self.upstream.pdf_available_rate:
+            self.upstream.count('scopus_article', 'not_found')
+            return self._send_json({'message': 'Resource not found'}, 404)
+        body = pdf_body(identifier, self.upstream.pdf_size)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def add_profile_arguments(parser):
+    """Uç nokta davranışını ayarlayan ortak argümanlar (benchmark.run ile paylaşılır)"""
+    parser.add_argument('--latency', type=float, default=50, help='Ortalama upstream gecikmesi (ms)')
+    parser.add_argument('--jitter', type=float, default=10, help='Gecikme standart sapması (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500 yanıtı oranı (0-1)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429 yanıtı oranı (0-1)')
+    parser.add_argument('--cohere-latency', type=float, default=None,
+                        help='Cohere için ayrı ortalama gecikme (ms); verilmezse --latency')
+    parser.add_argument('--pdf-size', type=int, default=256 * 1024, help='Sahte PDF boyutu (bayt)')
+    parser.add_argument('--pdf-available-rate', type=float, default=1.0,
+                        help='PDF\'i indirilebilen makale oranı (0-1)')
+    parser.add_argument('--profile', action='append', default=[], metavar='ENDPOINT:KEY=VALUE',
+                        help='Uç nokta bazında ayar, ör. scopus_article:latency_ms=300 (tekrarlanabilir)')
+
+
+def profile_argv(args):
+    """add_profile_arguments ile okunan değerleri ayrı süreçte başlatılacak sunucu için argv'ye çevirir"""
+    argv = ['--latency', str(args.latency), '--jitter', str(args.jitter), '--error-rate', str(args.error_rate),
+            '--rate-limit-rate', str(args.rate_limit_rate), '--pdf-size', str(args.pdf_size),
+            '--pdf-available-rate', str(args.pdf_available_rate)]
+    if args.cohere_latency is not None:
+        argv += ['--cohere-latency', str(args.cohere_latency)]
+    for item in args.profile:
+        argv += ['--profile', item]
+    return argv
+
+
+def profiles_from_args(args):
+    profiles = {}
+    for name in ENDPOINTS:
+        latency = args.cohere_latency if name == 'cohere' and args.cohere_latency is not None else args.latency
+        profiles[name] = EndpointProfile(latency, args.jitter, args.error_rate, args.rate_limit_rate)
+
+    for item in args.profile:
+        endpoint, _, setting = item.partition(':')
+        key, _, value = setting.partition('=')
+        if endpoint not in profiles or not hasattr(profiles[endpoint], key):
+            raise SystemExit(f'Geçersiz --profile değeri: {item}')
+        setattr(profiles[endpoint], key, float(value))
+    return profiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sahte Elsevier/Cohere sunucusu')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeUpstreamServer(args.host, args.port, profiles_from_args(args), args.pdf_size,
+                                args.pdf_available_rate)
+    print(f'Sahte upstream sunucusu: {server.url}')
+    print(f'  ELSEVIER_API_URL={server.url} COHERE_API_URL={server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Scopus yanıt normalizasyonu mikro benchmark'ı (ağ ve sunucu olmadan).
+
+Sahte upstream'in ürettiği arama sayfaları üzerinde sayfa başına yanıt
+boyutunu ve CPU süresini (JSON çözme + makale kayıtlarına çevirme) ölçer:
+
+- legacy: varsayılan görünüm, `json`, eski elle gezinme (`link` taraması dahil)
+- full:   varsayılan görünüm, `Article` kayıtları
+- fields: `field=` ile seçilmiş alanlar, `Article` kayıtları
+
+Her varyant `json` ve (kuruluysa) `orjson` ile çalıştırılır.
+
+    python -m benchmarks.normalize --pages 500 --count 25
+"""
+import argparse
+import json
+import sys
+import time
+from app.services import articles
+from app.services.articles import SearchPage, SEARCH_FIELDS
+from .fake_upstreams import search_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def legacy_parse(data):
+    """Normalizasyon katmanından önceki /discover ayrıştırması (karşılaştırma için)"""
+    result = []
+    for entry in data.get('search-results', {}).get('entry', []):
+        scopus_url = ''
+        for link in entry.get('link', []):
+            if link.get('@ref') == 'scopus':
+                scopus_url = link.get('@href', '')
+                break
+        author = entry.get('dc:creator', '')
+        if isinstance(author, list):
+            author = ', '.join(author)
+        result.append({
+            'id': entry.get('dc:identifier', '').split(':')[-1],
+            'title': entry.get('dc:title', '') or 'Başlık yok',
+            'author': author or 'Yazar belirtilmemiş',
+            'publicationDate': entry.get('prism:coverDate', '') or 'Tarih belirtilmemiş',
+            'journal': entry.get('prism:publicationName', '') or 'Dergi belirtilmemiş',
+            'scopusUrl': scopus_url
+        })
+    return result
+
+
+def record_parse(data):
+    return SearchPage.from_response(data).articles
+
+
+def _measure(bodies, decode, normalize, rounds):
+    """Sayfa başına ortalama çözme ve normalizasyon CPU süresi (µs)"""
+    decode_time = normalize_time = 0.0
+    for _ in range(rounds):
+        for body in bodies:
+            started = time.process_time()
+            data = decode(body)
+            decoded = time.process_time()
+            normalize(data)
+            decode_time += decoded - started
+            normalize_time += time.process_time() - decoded
+    pages = len(bodies) * rounds
+    return decode_time / pages * 1e6, normalize_time / pages * 1e6
+
+
+def _record_bytes(records):
+    """Kayıt başına sığ bellek (dict ya da __slots__ nesnesi)"""
+    return sum(sys.getsizeof(record) for record in records) / max(len(records), 1)
+
+
+def run(pages, count, rounds):
+    full = [json.dumps(search_response(f'bench {i}', count, 0)).encode('utf-8') for i in range(pages)]
+    selected = [json.dumps(search_response(f'bench {i}', count, 0, fields=','.join(SEARCH_FIELDS))).encode('utf-8')
+                for i in range(pages)]
+
+    parsers = [('json', json.loads)]
+    if orjson is not None:
+        parsers.append(('orjson', orjson.loads))
+
+    sample_full = json.loads(full[0])
+    variants = [
+        ('legacy', full, legacy_parse, _record_bytes(legacy_parse(sample_full))),
+        ('full', full, record_parse, _record_bytes(record_parse(sample_full))),
+        ('fields', selected, record_parse, _record_bytes(record_parse(json.loads(selected[0]))))
+    ]
+
+    results = []
+    for name, bodies, normalize, record_bytes in variants:
+        page_bytes = sum(len(body) for body in bodies) / len(bodies)
+        for parser_name, decode in parsers:
+            decode_us, normalize_us = _measure(bodies, decode, normalize, rounds)
+            results.append({
+                'variant': name,
+                'parser': parser_name,
+                'page_bytes': round(page_bytes),
+                'record_bytes': round(record_bytes),
+                'decode_us': round(decode_us, 1),
+                'normalize_us': round(normalize_us, 1),
+                'total_us': round(decode_us + normalize_us, 1)
+            })
+    return results
+
+
+def print_results(results, count):
+    print(f"Sayfa başına ({count} sonuç):")
+    print(f"{'varyant':<8} {'parser':<7} {'bayt':>8} {'kayıt B':>8} {'çözme µs':>10} {'normalize µs':>13} {'toplam µs':>10}")
+    for row in results:
+        print(f"{row['variant']:<8} {row['parser']:<7} {row['page_bytes']:>8} {row['record_bytes']:>8} "
+              f"{row['decode_us']:>10} {row['normalize_us']:>13} {row['total_us']:>10}")
+
+    baseline = results[0]
+    best = min(results, key=lambda row: row['total_us'])
+    print(f"\nlegacy/json -> {best['variant']}/{best['parser']}: "
+          f"bayt x{baseline['page_bytes'] / best['page_bytes']:.2f} azaldı, "
+          f"CPU x{baseline['total_us'] / best['total_us']:.2f} hızlandı")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scopus yanıt normalizasyonu benchmark\'ı')
+    parser.add_argument('--pages', type=int, default=200, help='Farklı sonuç sayfası sayısı')
+    parser.add_argument('--count', type=int, default=25, help='Sayfa başına sonuç')
+    parser.add_argument('--rounds', type=int, default=5, help='Her sayfanın kaç kez işleneceği')
+    parser.add_argument('--output', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.count, args.rounds)
+    print_results(results, args.count)
+    print(f"\nAktif ayrıştırıcı: {'orjson' if articles.orjson is not None else 'json'}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'pages': args.pages, 'count': args.count, 'rounds': args.rounds, 'results': results}, f,
+                      indent=2)
+
+
+if __name__ == '__main__':
+    main()
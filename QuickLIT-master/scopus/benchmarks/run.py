@@ -0,0 +1,393 @@
+"""
+Çevrimdışı benchmark: sahte upstream'lere bağlı gerçek sunucuya yük uygular.
+
+Sahte Elsevier/Cohere sunucusu ve uygulama (`run.py`) ayrı süreçlerde başlatılır;
+`firebase_admin` yerine benchmarks/stubs altındaki stub yüklenir. Seçilen
+senaryolar (`/`, `/api/latest_articles`, `/api/latest_articles/all`,
+`/download_pdf/<id>`, `/summarize`)
+verilen eşzamanlılıkla çalıştırılır; p50/p95/p99, throughput ve sunucu RSS'i
+(worker'lar dahil) JSON olarak kaydedilir.
+
+    python -m benchmarks.run --concurrency 32 --requests 1000
+    python -m benchmarks.run --asgi --latency 200 --rate-limit-rate 0.05
+    python -m benchmarks.run --baseline benchmarks/results/onceki.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import httpx
+from . import compare
+from .fake_upstreams import add_profile_arguments, profile_argv
+
+SCOPUS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS_DIR = os.path.join(SCOPUS_DIR, 'benchmarks', 'stubs')
+RESULTS_DIR = os.path.join(SCOPUS_DIR, 'benchmarks', 'results')
+
+SCENARIOS = ('home', 'latest_articles', 'latest_articles_all', 'download_pdf', 'summarize')
+# app/services/discover_service.py CATEGORY_MAPPING anahtarları
+CATEGORIES = ('computer_science', 'medicine', 'engineering', 'physics',
+              'chemistry', 'biology', 'mathematics', 'social_sciences')
+SUMMARIZE_TEXT = ('Large language models are increasingly used to summarise scientific literature. '
+                  'This benchmark paragraph stands in for an article abstract of typical length. ') * 20
+
+# Benchmark rate limiter'ı değil uygulamayı ölçsün diye bütçeler fiilen kaldırılır
+_UNLIMITED_RATES = {
+    f'RATE_{name}{suffix}': '1000000'
+    for name in ('SCOPUS_SEARCH', 'SCOPUS_ABSTRACT', 'SCOPUS_ARTICLE', 'COHERE')
+    for suffix in ('', '_BURST')
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='QuickLIT çevrimdışı benchmark')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'Virgülle ayrılmış senaryolar ({", ".join(SCENARIOS)})')
+    parser.add_argument('--concurrency', type=int, default=16, help='Eşzamanlı istemci sayısı')
+    parser.add_argument('--requests', type=int, default=500, help='Senaryo başına istek sayısı')
+    parser.add_argument('--unique-queries', type=int, default=50,
+                        help='home senaryosundaki farklı sorgu sayısı (önbellek isabetini belirler)')
+    parser.add_argument('--unique-pdfs', type=int, default=100, help='download_pdf senaryosundaki farklı makale sayısı')
+
+    server = parser.add_argument_group('sunucu')
+    server.add_argument('--asgi', action='store_true', help='Sunucuyu ASGI modunda başlat')
+    server.add_argument('--workers', type=int, default=2)
+    server.add_argument('--threads', type=int, default=8)
+    server.add_argument('--warmup', action='store_true', help='Sunucu başlangıç ısıtmasını açık bırak')
+    server.add_argument('--cache-backend', choices=('memory', 'sqlite'), default='memory')
+    server.add_argument('--keep-rate-limits', action='store_true',
+                        help='Uygulamanın upstream istek bütçelerini kapatma')
+    server.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Sunucuya ek ortam değişkeni (tekrarlanabilir)')
+    server.add_argument('--firebase-latency', type=float, default=0, help='Firebase stub gecikmesi (ms)')
+
+    upstream = parser.add_argument_group('sahte upstream')
+    add_profile_arguments(upstream)
+
+    output = parser.add_argument_group('çıktı')
+    output.add_argument('--output', help='Sonuç JSON dosyası (varsayılan: benchmarks/results/<zaman>-<commit>.json)')
+    output.add_argument('--baseline', help='Karşılaştırılacak önceki sonuç dosyası')
+    output.add_argument('--threshold', type=float, default=10.0,
+                        help='Gerileme sayılacak yüzde değişim (--baseline ile)')
+    return parser
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def _stop(process, timeout=30):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCOPUS_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# --- RSS ölçümü ---------------------------------------------------------------
+
+def _children(pid):
+    children = []
+    try:
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tid}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss(pid):
+    """Sürecin ve tüm alt süreçlerinin (gunicorn worker'ları) toplam RSS'i; /proc yoksa None"""
+    if not os.path.isdir('/proc'):
+        return None
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _rss_bytes(current)
+        pending.extend(_children(current))
+    return total
+
+
+class RSSSampler:
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return {'rss_start_mb': None, 'rss_peak_mb': None, 'rss_end_mb': None}
+        mb = 1024 * 1024
+        return {
+            'rss_start_mb': round(self.samples[0] / mb, 1),
+            'rss_peak_mb': round(max(self.samples) / mb, 1),
+            'rss_end_mb': round(self.samples[-1] / mb, 1)
+        }
+
+
+# --- Yük üretimi --------------------------------------------------------------
+
+def build_request(scenario, i, args):
+    """i. istek için (method, path, json gövdesi)"""
+    if scenario == 'home':
+        return 'GET', f'/?query=benchmark+topic+{i % args.unique_queries}', None
+    if scenario == 'latest_articles':
+        return 'POST', '/api/latest_articles', {'category': CATEGORIES[i % len(CATEGORIES)]}
+    if scenario == 'latest_articles_all':
+        return 'GET', '/api/latest_articles/all', None
+    if scenario == 'download_pdf':
+        return 'GET', f'/download_pdf/{850000000 + i % args.unique_pdfs}', None
+    if scenario == 'summarize':
+        return 'POST', '/summarize', {'text': SUMMARIZE_TEXT, 'length': 'short', 'format': 'paragraph'}
+    raise ValueError(f'Bilinmeyen senaryo: {scenario}')
+
+
+def percentile(sorted_values, p):
+    """En yakın sıra yöntemiyle yüzdelik (sorted_values artan sıralı)"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies, statuses, elapsed, received_bytes):
+    ok = sorted(latency for latency, status in zip(latencies, statuses) if isinstance(status, int) and status < 400)
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'requests': len(latencies),
+        'ok': len(ok),
+        'errors': len(latencies) - len(ok),
+        'status_counts': status_counts,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'received_mb': round(received_bytes / (1024 * 1024), 2),
+        'latency_ms': {
+            'mean': ms(sum(ok) / len(ok)) if ok else None,
+            'p50': ms(percentile(ok, 50)),
+            'p95': ms(percentile(ok, 95)),
+            'p99': ms(percentile(ok, 99)),
+            'max': ms(ok[-1]) if ok else None
+        }
+    }
+
+
+async def run_scenario(base_url, scenario, args):
+    latencies, statuses = [], []
+    received = 0
+    counter = iter(range(args.requests))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal received
+            for i in counter:
+                method, path, body = build_request(scenario, i, args)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = response.status_code
+                    received += len(response.content)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses.append(status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize_latencies(latencies, statuses, elapsed, received)
+
+
+# --- Orkestrasyon -------------------------------------------------------------
+
+def server_env(args, upstream_url, workdir):
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': os.pathsep.join(filter(None, [STUBS_DIR, env.get('PYTHONPATH')])),
+        'ELSEVIER_API_URL': upstream_url,
+        'COHERE_API_URL': upstream_url,
+        'SCOPUS_API_KEY': 'benchmark',
+        'COHERE_API_KEY': 'benchmark',
+        'ARTICLES_FOLDER': os.path.join(workdir, 'articles'),
+        'CACHE_BACKEND': args.cache_backend,
+        'CACHE_SQLITE_PATH': os.path.join(workdir, 'cache.sqlite3'),
+        'SUMMARY_CACHE_PATH': os.path.join(workdir, 'summaries.sqlite3'),
+        'METADATA_STORE_PATH': os.path.join(workdir, 'metadata.sqlite3'),
+        'PDF_BATCH_JOBS_PATH': os.path.join(workdir, 'pdf_batch.sqlite3'),
+        'LOG_LEVEL': 'WARNING',
+        'BENCH_FIREBASE_LATENCY_MS': str(args.firebase_latency)
+    })
+    if not args.keep_rate_limits:
+        env.update(_UNLIMITED_RATES)
+    for item in args.server_env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    return env
+
+
+def run(args):
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f'Bilinmeyen senaryo: {", ".join(sorted(unknown))}')
+
+    workdir = tempfile.mkdtemp(prefix='quicklit-bench-')
+    upstream_port, app_port = _free_port(), _free_port()
+    upstream_url = f'http://127.0.0.1:{upstream_port}'
+    app_url = f'http://127.0.0.1:{app_port}'
+    server_log = open(os.path.join(workdir, 'server.log'), 'wb')
+
+    upstream = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.fake_upstreams', '--port', str(upstream_port)] + profile_argv(args),
+        cwd=SCOPUS_DIR, stdout=subprocess.DEVNULL)
+    command = [sys.executable, 'run.py', '--host', '127.0.0.1', '--port', str(app_port),
+               '--workers', str(args.workers), '--threads', str(args.threads),
+               '--warmup' if args.warmup else '--no-warmup']
+    if args.asgi:
+        command.append('--asgi')
+    server = subprocess.Popen(command, cwd=SCOPUS_DIR, env=server_env(args, upstream_url, workdir),
+                              stdout=server_log, stderr=subprocess.STDOUT)
+
+    try:
+        if not _wait_until_ready(f'{upstream_url}/_bench/stats', upstream):
+            raise SystemExit('Sahte upstream sunucusu başlatılamadı')
+        if not _wait_until_ready(f'{app_url}/api/health', server):
+            server_log.flush()
+            with open(server_log.name, 'rb') as f:
+                sys.stderr.write(f.read()[-4000:].decode('utf-8', 'replace'))
+            raise SystemExit('Uygulama sunucusu başlatılamadı')
+
+        results = {}
+        for scenario in scenarios:
+            print(f'{scenario}: {args.requests} istek, eşzamanlılık {args.concurrency} ...', flush=True)
+            with RSSSampler(server.pid) as sampler:
+                result = asyncio.run(run_scenario(app_url, scenario, args))
+            result.update(sampler.summary())
+            results[scenario] = result
+            latency = result['latency_ms']
+            print(f'  {result["throughput_rps"]} istek/s  p50={latency["p50"]}ms  p95={latency["p95"]}ms  '
+                  f'p99={latency["p99"]}ms  hata={result["errors"]}  rss_peak={result["rss_peak_mb"]}MB',
+                  flush=True)
+
+        upstream_calls = httpx.get(f'{upstream_url}/_bench/stats', timeout=5).json()
+        health = httpx.get(f'{app_url}/api/health', timeout=5).json()
+    finally:
+        _stop(server)
+        _stop(upstream, timeout=5)
+        server_log.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'mode': 'asgi' if args.asgi else 'wsgi',
+            'args': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+        },
+        'scenarios': results,
+        'upstream_calls': upstream_calls,
+        'server_saturation': health.get('saturation')
+    }
+
+
+def save(report, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        path = os.path.join(RESULTS_DIR, f'{stamp}-{report["meta"]["git_commit"] or "nogit"}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run(args)
+    path = save(report, args.output)
+    print(f'Sonuçlar: {path}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare.print_comparison(baseline, report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Benchmark için `firebase_admin` yerine geçen süreç içi stub.
+
+`benchmarks.run` bu dizini PYTHONPATH'in başına ekleyerek sunucuyu başlatır;
+uygulama gerçek SDK yerine bunu içe aktarır. Kimlik bilgisi gerekmez, ağa
+çıkılmaz. Firestore verileri süreç belleğinde tutulur. Çağrılara yapay gecikme
+eklemek için BENCH_FIREBASE_LATENCY_MS kullanılabilir.
+"""
+import os
+import time
+
+__version__ = 'stub'
+
+# Uygulama başlatılmış sayılır; firebase_service kimlik dosyası aramaz
+_apps = {'[DEFAULT]': object()}
+
+
+def initialize_app(credential=None, options=None, name='[DEFAULT]'):
+    _apps[name] = credential
+    return _apps[name]
+
+
+def get_app(name='[DEFAULT]'):
+    return _apps[name]
+
+
+def _simulate_latency():
+    latency = float(os.getenv('BENCH_FIREBASE_LATENCY_MS', 0))
+    if latency > 0:
+        time.sleep(latency / 1000)
@@ -0,0 +1,66 @@
+"""`firebase_admin.auth` stub'ı: token, kullanıcı kimliğinin kendisidir"""
+import threading
+import uuid
+from . import _simulate_latency
+
+
+class UserNotFoundError(ValueError):
+    pass
+
+
+class EmailAlreadyExistsError(ValueError):
+    pass
+
+
+class InvalidIdTokenError(ValueError):
+    pass
+
+
+class UserRecord:
+    def __init__(self, uid, email=None, display_name=None):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+
+
+_users = {}
+_lock = threading.Lock()
+
+
+def _user(uid):
+    with _lock:
+        if uid not in _users:
+            _users[uid] = UserRecord(uid, f'{uid}@bench.local', f'Bench {uid}')
+        return _users[uid]
+
+
+def verify_id_token(id_token, app=None, check_revoked=False):
+    _simulate_latency()
+    if not id_token:
+        raise InvalidIdTokenError('Boş token')
+    user = _user(id_token)
+    return {'uid': user.uid, 'email': user.email, 'exp': 4102444800}
+
+
+def get_user(uid, app=None):
+    _simulate_latency()
+    return _user(uid)
+
+
+def get_user_by_email(email, app=None):
+    _simulate_latency()
+    with _lock:
+        for user in _users.values():
+            if user.email == email:
+                return user
+    raise UserNotFoundError(f'Kullanıcı bulunamadı: {email}')
+
+
+def create_user(email=None, password=None, display_name=None, app=None, **kwargs):
+    _simulate_latency()
+    with _lock:
+        if any(user.email == email for user in _users.values()):
+            raise EmailAlreadyExistsError(email)
+        user = UserRecord(uuid.uuid4().hex[:28], email, display_name)
+        _users[user.uid] = user
+        return user
@@ -0,0 +1,3 @@
+class Certificate:
+    def __init__(self, cert):
+        self.cert = cert
@@ -0,0 +1,198 @@
+"""`firebase_admin.firestore` stub'ı: belge ve koleksiyonlar süreç belleğinde tutulur"""
+import copy
+import threading
+import time
+import uuid
+from . import _simulate_latency
+
+SERVER_TIMESTAMP = object()
+DELETE_FIELD = object()
+
+_store = {}
+_lock = threading.Lock()
+
+
+def _resolve(data):
+    return {key: (time.time() if value is SERVER_TIMESTAMP else value) for key, value in data.items()}
+
+
+def _apply(target, data):
+    for key, value in _resolve(data).items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        else:
+            target[key] = value
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class DocumentReference:
+    def __init__(self, path):
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name):
+        return CollectionReference(f'{self.path}/{name}')
+
+    def get(self, *args, **kwargs):
+        _simulate_latency()
+        with _lock:
+            return DocumentSnapshot(self, copy.deepcopy(_store.get(self.path)))
+
+    def set(self, data, merge=False):
+        _simulate_latency()
+        with _lock:
+            if merge and self.path in _store:
+                _apply(_store[self.path], data)
+            else:
+                _store[self.path] = _resolve(data)
+
+    def update(self, data):
+        _simulate_latency()
+        with _lock:
+            if self.path not in _store:
+                raise ValueError(f'Belge yok: {self.path}')
+            _apply(_store[self.path], data)
+
+    def delete(self):
+        _simulate_latency()
+        with _lock:
+            _store.pop(self.path, None)
+
+
+class Query:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, path, fields=None, orders=(), cursor=None, limit_to=None):
+        self.path = path
+        self._fields = fields
+        self._orders = tuple(orders)
+        self._cursor = cursor
+        self._limit = limit_to
+
+    def _copy(self, **changes):
+        state = {'fields': self._fields, 'orders': self._orders, 'cursor': self._cursor, 'limit_to': self._limit}
+        state.update(changes)
+        return Query(self.path, **state)
+
+    def select(self, field_paths):
+        return self._copy(fields=tuple(field_paths))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def start_after(self, values):
+        return self._copy(cursor=values)
+
+    def limit(self, count):
+        return self._copy(limit_to=count)
+
+    def _documents(self):
+        prefix = self.path + '/'
+        with _lock:
+            return [(path, copy.deepcopy(data)) for path, data in _store.items()
+                    if path.startswith(prefix) and '/' not in path[len(prefix):]]
+
+    def stream(self):
+        _simulate_latency()
+        items = self._documents()
+        for field, direction in reversed(self._orders):
+            key = (lambda item: item[0].rsplit('/', 1)[-1]) if field == '__name__' else (lambda item: item[1].get(field))
+            # Sıralama alanı olmayan belgeler Firestore'daki gibi sonuçtan düşer
+            items = sorted((item for item in items if field == '__name__' or field in item[1]),
+                           key=key, reverse=direction == self.DESCENDING)
+        if self._cursor is not None:
+            cursor = tuple(self._cursor[field] for field, _ in self._orders)
+            position = 0
+            for position, (path, data) in enumerate(items, 1):
+                values = tuple(path.rsplit('/', 1)[-1] if field == '__name__' else data.get(field)
+                               for field, _ in self._orders)
+                if values == cursor:
+                    break
+            else:
+                position = len(items)
+            items = items[position:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        if self._fields is not None:
+            items = [(path, {key: value for key, value in data.items() if key in self._fields}) for path, data in items]
+        return iter([DocumentSnapshot(DocumentReference(path), data) for path, data in items])
+
+    def count(self):
+        return _CountQuery(self)
+
+
+class _AggregationResult:
+    def __init__(self, value):
+        self.value = value
+
+
+class _CountQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def get(self):
+        _simulate_latency()
+        return [[_AggregationResult(len(self._query._documents()))]]
+
+
+class CollectionReference(Query):
+    def __init__(self, path):
+        super().__init__(path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return DocumentReference(f'{self.path}/{document_id or uuid.uuid4().hex[:20]}')
+
+    def list_documents(self):
+        return [DocumentReference(path) for path, _ in self._documents()]
+
+
+class WriteBatch:
+    def __init__(self):
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self._writes.append(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self._writes.append(reference.delete)
+
+    def commit(self):
+        for write in self._writes:
+            write()
+        self._writes = []
+
+
+class Client:
+    def collection(self, name):
+        return CollectionReference(name)
+
+    def document(self, path):
+        return DocumentReference(path)
+
+    def batch(self):
+        return WriteBatch()
+
+
+def client(app=None):
+    return Client()
@@ -1,6 +1,18 @@
-from app import create_app
+from app.server import main
 
-app = create_app()
 
+def __getattr__(name):
+    # Harici sunucular için WSGI uygulaması (gunicorn run:app, flask --app run run).
+    # İstendiğinde oluşturulur: `python run.py` uygulamayı main() içinde bir kez kurar,
+    # metin çıkarma havuzunun spawn ile açtığı süreçler de (run.py'yi __mp_main__
+    # olarak yeniden içe aktarır) uygulama kurmaz.
+    if name == 'app':
+        from app import create_app
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Seçenekler için: python run.py --help
 if __name__ == '__main__':
-    app.run(debug=True, port=3000)
+    main()
@@ -0,0 +1,18 @@
+"""
+Testler ağa ve gerçek depolara dokunmaz: uygulama içe aktarılmadan önce
+önbellek belleğe, makale klasörü geçici bir dizine yönlendirilir.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.update(
+    SCOPUS_API_KEY='test',
+    COHERE_API_KEY='test',
+    CACHE_BACKEND='memory',
+    ARTICLES_FOLDER=tempfile.mkdtemp(prefix='quicklit-test-'),
+    LOCAL_SEARCH_ENABLED='false',
+    DISCOVER_REFRESH_ENABLED='false'
+)
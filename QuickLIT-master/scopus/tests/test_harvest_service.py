@@ -0,0 +1,60 @@
+import json
+import pytest
+from app.services.articles import Article, SearchPage
+from app.services.harvest_service import HarvestError, HarvestService
+
+TOTAL = 6
+
+
+def _pages():
+    """İmleç -> (sayfa, sonraki imleç); sayfa başına iki kayıt"""
+    pages, cursor = {}, '*'
+    for number in range(TOTAL // 2):
+        articles = [Article(scopus_id=str(index), eid=f'2-s2.0-{index}', title=f'Makale {index}')
+                    for index in range(number * 2, number * 2 + 2)]
+        next_cursor = f'c{number + 1}'
+        pages[cursor] = (SearchPage(TOTAL, None, articles), next_cursor)
+        cursor = next_cursor
+    return pages
+
+
+def test_resume_discards_data_written_after_checkpoint(tmp_path, monkeypatch):
+    output = str(tmp_path / 'sonuclar.ndjson')
+    pages = _pages()
+
+    def failing_fetch(query, cursor, page_size, stop=None):
+        if cursor == 'c2':
+            raise HarvestError('bağlantı koptu')
+        return pages[cursor]
+
+    monkeypatch.setattr(HarvestService, 'fetch_page', staticmethod(failing_fetch))
+    with pytest.raises(HarvestError):
+        HarvestService.run('cancer', output, page_size=2)
+
+    with open(HarvestService.checkpoint_path(output), encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert checkpoint['written'] == 4 and checkpoint['cursor'] == 'c2'
+
+    # Kesinti sırasında checkpoint'e girmemiş yarım bir satır yazılmış olsun
+    with open(output, 'ab') as f:
+        f.write(b'{"scopus_id": "yar')
+
+    monkeypatch.setattr(HarvestService, 'fetch_page',
+                        staticmethod(lambda query, cursor, page_size, stop=None: pages[cursor]))
+    summary = HarvestService.run('cancer', output, resume=True, page_size=2)
+
+    assert summary['complete'] and summary['written'] == TOTAL
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['scopus_id'] for record in records] == [str(index) for index in range(TOTAL)]
+
+
+def test_resume_rejects_checkpoint_of_another_query(tmp_path, monkeypatch):
+    output = str(tmp_path / 'sonuclar.ndjson')
+    pages = _pages()
+    monkeypatch.setattr(HarvestService, 'fetch_page',
+                        staticmethod(lambda query, cursor, page_size, stop=None: pages[cursor]))
+    HarvestService.run('cancer', output, page_size=2, max_records=2)
+
+    with pytest.raises(HarvestError):
+        HarvestService.run('diabetes', output, resume=True, page_size=2)
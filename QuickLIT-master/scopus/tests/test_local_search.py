@@ -0,0 +1,64 @@
+import pytest
+from app.services.local_search import InvalidQuery, SearchIndex, build_match
+
+
+def test_build_match_joins_words_with_and():
+    assert build_match('deep learning') == ('"deep" AND "learning"', None)
+    assert build_match('deep AND learning') == ('"deep" AND "learning"', None)
+
+
+def test_build_match_phrase_prefix_or_and_exclusion():
+    assert build_match('"neural network" gen* -survey') == ('"neural network" AND "gen"*', '"survey"')
+    assert build_match('cancer OR tumor therapy') == ('("cancer" OR "tumor") AND "therapy"', None)
+    assert build_match('cancer -"case report" -review') == ('"cancer"', '"case report" OR "review"')
+
+
+def test_build_match_neutralizes_fts_syntax():
+    # FTS5 işleçleri ve sütun filtreleri sözcük olarak aranır
+    assert build_match('body:NEAR(x y)') == ('"body NEAR x" AND "y"', None)
+
+
+@pytest.mark.parametrize('query', ['', '-survey', 'AND OR', '!!!'])
+def test_build_match_rejects_queries_without_terms(query):
+    with pytest.raises(InvalidQuery):
+        build_match(query)
+
+
+def _search(index, query, **kwargs):
+    match, exclude = build_match(query)
+    return index.search(match, exclude=exclude, **kwargs)
+
+
+@pytest.fixture(name='index')
+def _index(tmp_path):
+    search_index = SearchIndex(str(tmp_path / 'search_index.sqlite3'))
+    search_index.add('a' * 64, ['Deep learning for cancer detection', 'Unrelated appendix'])
+    search_index.add('b' * 64, ['Cancer imaging: a survey', 'cancer cancer cancer'])
+    return search_index
+
+
+def test_search_returns_best_page_per_document(index):
+    total, results = _search(index, 'cancer', limit=10)
+    assert total == 2
+    assert {result['sha256'] for result in results} == {'a' * 64, 'b' * 64}
+    by_hash = {result['sha256']: result for result in results}
+    assert by_hash['b' * 64]['hits'] == 2
+    assert by_hash['a' * 64]['page'] == 1
+    assert '<mark>' in by_hash['a' * 64]['snippet']
+
+
+def test_search_excludes_whole_documents(index):
+    # "survey" yalnızca b'nin ilk sayfasında geçer; b'nin diğer sayfası da dışarıda kalır
+    total, results = _search(index, 'cancer -survey', limit=10)
+    assert total == 1
+    assert [result['sha256'] for result in results] == ['a' * 64]
+
+
+def test_search_paginates_and_reindex_replaces_pages(index):
+    total, results = _search(index, 'cancer', limit=1, offset=1)
+    assert total == 2 and len(results) == 1
+
+    index.add('a' * 64, ['Nothing relevant here'])
+    total, results = _search(index, 'cancer', limit=10)
+    assert total == 1
+    assert results[0]['sha256'] == 'b' * 64
@@ -0,0 +1,38 @@
+from app.services.articles import Article, SearchPage
+from app.services.search_batch import SearchBatchService
+
+
+def _page(*articles):
+    return SearchPage(len(articles), 0, list(articles))
+
+
+def test_merge_deduplicates_by_eid_and_doi():
+    queries = [{'id': 'q1'}, {'id': 'q2'}, {'id': 'q3'}]
+    pages = [
+        _page(Article(scopus_id='1', eid='2-s2.0-1', title='A'),
+              Article(scopus_id='2', eid='2-s2.0-2', title='B', doi='10.1/B')),
+        _page(Article(scopus_id='2', eid='2-s2.0-2', title='B'),
+              Article(scopus_id='3', eid='', title='B kopyası', doi=' 10.1/b ')),
+        None  # Başarısız sorgu
+    ]
+    merged = SearchBatchService.merge(queries, pages)
+
+    assert [record['title'] for record in merged] == ['A', 'B']
+    assert merged[0]['queries'] == ['q1'] and merged[0]['ranks'] == {'q1': 1}
+    assert merged[1]['queries'] == ['q1', 'q2']
+    assert merged[1]['ranks'] == {'q1': 2, 'q2': 1}
+    assert merged[1]['doi'] == '10.1/B'
+
+
+def test_merge_fills_missing_doi_and_keeps_first_rank():
+    queries = [{'id': 'q1'}, {'id': 'q2'}]
+    pages = [
+        _page(Article(scopus_id='1', eid='2-s2.0-1', title='A'),
+              Article(scopus_id='1', eid='2-s2.0-1', title='A')),
+        _page(Article(scopus_id='1', eid='2-s2.0-1', title='A', doi='10.1/a'))
+    ]
+    merged = SearchBatchService.merge(queries, pages)
+
+    assert len(merged) == 1
+    assert merged[0]['doi'] == '10.1/a'
+    assert merged[0]['ranks'] == {'q1': 1, 'q2': 1}
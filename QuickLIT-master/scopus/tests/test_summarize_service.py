@@ -0,0 +1,51 @@
+from app.services.summarize_service import SummarizeService, summary_cache_key
+
+
+def test_split_text_keeps_short_text_whole():
+    assert SummarizeService.split_text('  kısa metin \n', max_chars=100) == ['kısa metin']
+
+
+def test_split_text_packs_paragraphs_without_splitting_them():
+    paragraphs = [f'Paragraf {index} ' + 'x' * 290 for index in range(9)]
+    chunks = SummarizeService.split_text('\n\n'.join(paragraphs), max_chars=1000)
+    assert [len(chunk.split('\n\n')) for chunk in chunks] == [3, 3, 3]
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert [p for chunk in chunks for p in chunk.split('\n\n')] == paragraphs
+
+
+def test_split_text_merges_short_tail_into_previous_chunk():
+    paragraphs = ['a' * 600, 'b' * 600, 'c' * 100]
+    chunks = SummarizeService.split_text('\n\n'.join(paragraphs), max_chars=1000)
+    assert chunks == ['a' * 600, 'b' * 600 + '\n\n' + 'c' * 100]
+
+
+def test_split_text_breaks_long_paragraph_at_sentences():
+    sentences = [f'Cümle {index} burada biter.' + ' dolgu' * 10 + '.' for index in range(40)]
+    chunks = SummarizeService.split_text(' '.join(sentences), max_chars=400)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert all(chunk.endswith('.') for chunk in chunks)
+    assert ' '.join(chunks) == ' '.join(sentences)
+
+
+def test_split_text_starts_new_chunk_at_heading():
+    # Yarıdan fazlası dolu parça başlıktan önce kapatılır
+    text = 'a' * 600 + '\n\nINTRODUCTION\n\n' + 'b' * 500
+    chunks = SummarizeService.split_text(text, max_chars=1000)
+    assert chunks == ['a' * 600, 'INTRODUCTION\n\n' + 'b' * 500]
+
+
+def test_summary_cache_key_ignores_whitespace_and_unicode_form():
+    key = summary_cache_key('Özet  metni\n\nburada', 'medium', 'paragraph', None)
+    assert key.startswith('summary:')
+    assert summary_cache_key(' Özet metni burada ', 'medium', 'paragraph', None) == key
+    # Aynı harf, ayrışık (NFD) biçimde
+    assert summary_cache_key('O\u0308zet metni burada', 'medium', 'paragraph', None) == key
+
+
+def test_summary_cache_key_depends_on_options():
+    key = summary_cache_key('metin', 'medium', 'paragraph', None)
+    assert summary_cache_key('metin', 'short', 'paragraph', None) != key
+    assert summary_cache_key('metin', 'medium', 'bullets', None) != key
+    assert summary_cache_key('metin', 'medium', 'paragraph', 'Türkçe yaz') != key
+    assert summary_cache_key('metin!', 'medium', 'paragraph', None) != key